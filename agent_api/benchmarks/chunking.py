@@ -0,0 +1,149 @@
+"""Transcript chunking: offset-array slicing vs the old join-per-chunk chunker.
+
+Builds synthetic transcripts of 1, 5 and 20 hours of speech at ``--wpm`` words
+per minute, with the mixed whitespace a speech-to-text transcript has, and
+chunks each with ``EventTextChunker`` and with ``join_per_chunk``, an inline
+copy of the chunker before it sliced one normalized string. Reports the best
+of ``--repeat`` runs, peak memory allocated while chunking, and whether both
+produce the same chunks (text, raw content and metadata), which keeps chunk
+content hashes, and so stored embeddings, valid.
+
+    python -m benchmarks.chunking --hours 1,5,20 --repeat 5
+"""
+import argparse
+import gc
+import random
+import re
+import time
+import tracemalloc
+from typing import List
+
+from loguru import logger
+
+from benchmarks.common import print_table
+from src.services.indexing.chunking import ChunkMetadata, EventTextChunker, TextChunk
+
+EVENT = {
+    "event_name": "Annual Research Symposium",
+    "event_id": "00000000-0000-0000-0000-000000000001",
+    "event_organizer": "Computer Science Department",
+    "event_chief_guest": "Dr. Ada Lovelace",
+    "event_venue": "Main Auditorium",
+}
+
+
+def join_per_chunk(chunker: EventTextChunker, event_name: str, event_id: str, event_organizer: str,
+                   event_chief_guest: str, event_venue: str, transcription: str) -> List[TextChunk]:
+    """The chunker as it was: regex word split, a fresh join per chunk and Pydantic models per chunk."""
+    words = re.findall(r"\S+", transcription)
+    context_header = chunker._create_context_header(event_name, event_chief_guest, event_venue)
+
+    if len(words) < chunker.min_chunk_size:
+        full_text = " ".join(words)
+        return [TextChunk(
+            text=f"{context_header}{full_text}",
+            event_id=event_id,
+            raw_content=full_text,
+            metadata=ChunkMetadata(
+                chunk_index=0, word_count=len(words), event_name=event_name, chief_guest=event_chief_guest,
+                event_organizer=event_organizer, event_venue=event_venue, overlap_prev=0, overlap_next=0,
+            ),
+        )]
+
+    chunks = []
+    chunk_index = 0
+    current_pos = 0
+    while current_pos < len(words):
+        start = current_pos
+        end = min(current_pos + chunker.chunk_size, len(words))
+        segment_text = " ".join(words[start:end])
+        chunks.append(TextChunk(
+            event_id=event_id,
+            text=f"{context_header} {segment_text}",
+            raw_content=segment_text,
+            metadata=ChunkMetadata(
+                chunk_index=chunk_index,
+                word_count=len(words[start:end]),
+                event_name=event_name,
+                chief_guest=event_chief_guest,
+                event_organizer=event_organizer,
+                event_venue=event_venue,
+                overlap_prev=chunker.overlap_size if start > 0 else 0,
+                overlap_next=chunker.overlap_size if end < len(words) else 0,
+            ),
+        ))
+        current_pos += chunker.chunk_size - chunker.overlap_size
+        chunk_index += 1
+        if end >= len(words):
+            break
+    return chunks
+
+
+def synthetic_transcript(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    vocabulary = [
+        "the", "keynote", "speaker", "research", "students", "question", "award", "panel", "data",
+        "model", "results", "thank", "you", "everyone", "today", "project", "university", "future",
+    ]
+    separators = [" "] * 20 + ["  ", "\n", " \n", "\t"]
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(vocabulary))
+        parts.append(rng.choice(separators))
+    return "".join(parts)
+
+
+def as_tuples(chunks) -> list:
+    return [(chunk.text, chunk.raw_content, chunk.metadata.model_dump()) for chunk in chunks]
+
+
+def measure(run, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        chunks = run()
+        best = min(best, time.perf_counter() - started)
+        del chunks
+
+    gc.collect()
+    tracemalloc.start()
+    chunks = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=lambda value: [float(n) for n in value.split(",")], default=[1, 5, 20])
+    parser.add_argument("--wpm", type=int, default=150, help="spoken words per minute")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    chunker = EventTextChunker(chunk_size=args.chunk_size, overlap_size=args.overlap)
+    rows = []
+    for hours in args.hours:
+        words = int(hours * 60 * args.wpm)
+        transcript = synthetic_transcript(words)
+        old_s, old_peak, old_chunks = measure(lambda: join_per_chunk(chunker, transcription=transcript, **EVENT), args.repeat)
+        new_s, new_peak, new_chunks = measure(lambda: chunker.chunk_event(transcription=transcript, **EVENT), args.repeat)
+        rows.append({
+            "hours": hours,
+            "words": words,
+            "chunks": len(new_chunks),
+            "join_per_chunk_ms": old_s * 1000,
+            "offset_slices_ms": new_s * 1000,
+            "speedup": old_s / new_s,
+            "join_peak_mb": old_peak / 2 ** 20,
+            "slices_peak_mb": new_peak / 2 ** 20,
+            "identical": as_tuples(old_chunks) == as_tuples(new_chunks),
+        })
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
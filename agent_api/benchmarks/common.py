@@ -0,0 +1,116 @@
+"""Helpers shared by the benchmark scripts.
+
+Run a benchmark from ``agent_api`` with ``python -m benchmarks.<name>``. Those
+that need PostgreSQL read ``--database-url`` or ``BENCH_DATABASE_URL`` and exit
+early when neither is set; point them at a scratch database, they create and
+drop their own rows.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.db.factory import _make_config
+from src.db.interfaces.postgres import AsyncPostgreSQLDatabase, PostgreSQLDatabase
+from src.models.events import Event
+from src.schemas.database.config import PostgreSQLSettings
+
+
+def percentile(samples: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``p`` in 0-100)."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: Sequence[float], elapsed: float) -> Dict[str, float]:
+    """p50/p99 latency in milliseconds and throughput in operations per second."""
+    return {
+        "ops": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "ops_per_s": len(samples) / elapsed if elapsed else float("nan"),
+    }
+
+
+def print_table(rows: List[Dict], columns: Optional[Iterable[str]] = None) -> None:
+    """Print result rows as an aligned plain-text table."""
+    columns = list(columns or rows[0].keys())
+    cells = [[_format(row.get(column, "")) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.rjust(width) for cell, width in zip(line, widths)))
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.1f}" if abs(value) >= 10 else f"{value:.3f}"
+    return str(value)
+
+
+def add_database_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCH_DATABASE_URL"),
+        help="SQLAlchemy URL of a scratch PostgreSQL database with pgvector (default: $BENCH_DATABASE_URL)",
+    )
+
+
+def require_database_url(args: argparse.Namespace) -> str:
+    if not args.database_url:
+        print("Skipping: pass --database-url or set BENCH_DATABASE_URL", file=sys.stderr)
+        sys.exit(0)
+    return args.database_url
+
+
+def database_config(database_url: str, **overrides) -> PostgreSQLSettings:
+    """The application's database settings, pointed at ``database_url``."""
+    return _make_config().model_copy(update={"database_url": database_url, **overrides})
+
+
+def bootstrap_database(config: PostgreSQLSettings) -> PostgreSQLDatabase:
+    """Create or upgrade the schema the way application startup does."""
+    # Register every table on Base.metadata before create_all runs.
+    import src.models.embeddings  # noqa: F401
+    import src.models.events  # noqa: F401
+    import src.models.indexing  # noqa: F401
+    import src.models.transcription  # noqa: F401
+
+    database = PostgreSQLDatabase(config)
+    database.startup()
+    return database
+
+
+async def start_async_database(config: PostgreSQLSettings) -> AsyncPostgreSQLDatabase:
+    database = AsyncPostgreSQLDatabase(config)
+    await database.startup()
+    return database
+
+
+def random_unit_vector(rng: random.Random, dimensions: int) -> List[float]:
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def scratch_event(**values) -> Event:
+    """An event row for benchmark data; deleting it cascades to its chunks."""
+    now = datetime.now(timezone.utc)
+    defaults = dict(
+        id=uuid.uuid4(),
+        event_name="benchmark",
+        organizer="benchmark",
+        chief_guest_name="benchmark",
+        venue="benchmark",
+        start_time=now,
+        end_time=now + timedelta(hours=1),
+    )
+    defaults.update(values)
+    return Event(**defaults)
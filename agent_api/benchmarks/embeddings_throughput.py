@@ -0,0 +1,115 @@
+"""Passage embedding throughput: concurrent batches vs one batch at a time.
+
+``JinaEmbeddingsClient`` runs against an in-process embeddings server with a
+fixed per-request latency, a per-item cost and a share of 429 responses carrying
+``Retry-After``. The sequential run is the same client with
+``max_concurrency=1``, which is how batches were sent before they were
+dispatched concurrently.
+
+    python -m benchmarks.embeddings_throughput --passages 5000 --throttle 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from loguru import logger
+
+from benchmarks.common import latency_summary, print_table
+from src.services.embeddings.jina_client import JinaEmbeddingsClient
+
+
+class MockEmbeddingsServer:
+    def __init__(self, latency: float, per_item: float, throttle: float, dimensions: int, seed: int = 0):
+        self.latency = latency
+        self.per_item = per_item
+        self.throttle = throttle
+        self.dimensions = dimensions
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.latencies = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            if self.random.random() < self.throttle:
+                self.throttled += 1
+                await asyncio.sleep(self.latency / 10)
+                return httpx.Response(429, headers={"Retry-After": "0.2"}, json={"detail": "rate limited"})
+
+            payload = json.loads(request.content)
+            await asyncio.sleep(self.latency + self.per_item * len(payload["input"]))
+            vector = [0.0] * self.dimensions
+            return httpx.Response(200, json={
+                "model": payload["model"],
+                "object": "list",
+                "usage": {"total_tokens": 0, "prompt_tokens": 0},
+                "data": [{"object": "embedding", "index": i, "embedding": vector} for i in range(len(payload["input"]))],
+            })
+        finally:
+            self.in_flight -= 1
+            self.latencies.append(time.perf_counter() - started)
+
+
+async def run(mode: str, args: argparse.Namespace) -> dict:
+    server = MockEmbeddingsServer(args.latency, args.per_item, args.throttle, args.dimensions)
+    client = JinaEmbeddingsClient(
+        api_key="bench",
+        base_url="http://embeddings.bench/v1",
+        dimensions=args.dimensions,
+        max_concurrency=1 if mode == "sequential" else args.concurrency,
+        backoff_base=0.05,
+    )
+    await client.client.aclose()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(server.handle))
+
+    rng = random.Random(1)
+    words = ["keynote", "session", "speaker", "question", "answer", "panel", "research", "award"]
+    texts = [" ".join(rng.choice(words) for _ in range(args.words)) + f" #{i}" for i in range(args.passages)]
+
+    started = time.perf_counter()
+    embeddings = await client.embed_passage(texts)
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    assert len(embeddings) == len(texts) and all(embeddings)
+    summary = latency_summary(server.latencies, elapsed)
+    return {
+        "mode": mode,
+        "passages": len(texts),
+        "requests": server.requests,
+        "throttled": server.throttled,
+        "peak_in_flight": server.peak_in_flight,
+        "request_p99_ms": summary["p99_ms"],
+        "seconds": elapsed,
+        "passages_per_s": len(texts) / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passages", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=150, help="words per passage")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds per request")
+    parser.add_argument("--per-item", type=float, default=0.0005, help="extra seconds per passage in a request")
+    parser.add_argument("--throttle", type=float, default=0.1, help="share of requests answered with 429")
+    parser.add_argument("--dimensions", type=int, default=64)
+    args = parser.parse_args()
+
+    logger.remove()
+    rows = [asyncio.run(run(mode, args)) for mode in ("sequential", "concurrent")]
+    print_table(rows)
+    print(f"speedup: {rows[0]['seconds'] / rows[1]['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
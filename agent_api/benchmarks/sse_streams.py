@@ -0,0 +1,166 @@
+"""Concurrent SSE answer streams one API worker sustains.
+
+Starts a single uvicorn worker in a subprocess serving the real ``/stream/groq``
+route, with the LLM router pointed at a fake backend that emits ``--tokens``
+tokens every ``--token-interval`` seconds. For each ``--streams`` level the
+client opens that many streams at once and reads them to the end. It reports
+time to the first frame, total stream time against the ideal
+(``tokens * token-interval``), delivered tokens per second and failures. A
+worker keeps up while p99 stream time stays close to the ideal.
+
+Prompts are distinct per stream so every stream is its own generation; pass
+``--same-prompt`` to measure coalesced streams instead. The client runs in one
+process too, so at the highest levels check that it is not the bottleneck
+(``client_cpu_s`` close to the wall time).
+
+    python -m benchmarks.sse_streams --streams 100,500,1000,2000 --tokens 200 --token-interval 0.02
+"""
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+from loguru import logger
+
+from benchmarks.common import percentile, print_table
+from src.services.llm.backends import BaseLLMBackend
+from src.services.llm.router import LLMRouter
+
+
+class FakeTokenBackend(BaseLLMBackend):
+    def __init__(self, tokens: int, interval: float):
+        super().__init__("groq", "fake-model")
+        self.tokens = tokens
+        self.interval = interval
+
+    async def stream(self, prompt):
+        for index in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            yield f"token{index} "
+
+
+def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+    from fastapi import FastAPI
+
+    from src.routers import ask
+
+    router = LLMRouter(
+        [FakeTokenBackend(args.tokens, args.token_interval)],
+        max_concurrency={"groq": 1_000_000},
+        coalesce=args.same_prompt,
+    )
+    ask.get_llm_router = lambda: router
+    app = FastAPI()
+    app.include_router(ask.router)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, workers=1, log_level="warning", access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"benchmark server did not start on port {port}")
+
+
+async def read_stream(client: httpx.AsyncClient, prompt: str) -> dict:
+    started = time.perf_counter()
+    first_frame = None
+    tokens = 0
+    async with client.stream("POST", "/stream/groq", params={"prompt": prompt}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            if first_frame is None:
+                first_frame = time.perf_counter() - started
+            event = json.loads(line[len("data: "):])
+            if "error" in event:
+                raise RuntimeError(event["error"])
+            tokens += event.get("chunk", "").count("token")
+    return {"first_frame": first_frame, "total": time.perf_counter() - started, "tokens": tokens}
+
+
+async def run_level(port: int, streams: int, args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=streams, max_keepalive_connections=streams)
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(read_stream(client, "same question" if args.same_prompt else f"question {i}") for i in range(streams)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        client_cpu = time.process_time() - cpu_started
+
+    ok = [result for result in results if isinstance(result, dict) and result["tokens"] == args.tokens]
+    first_frames = [result["first_frame"] for result in ok]
+    totals = [result["total"] for result in ok]
+    return {
+        "streams": streams,
+        "completed": len(ok),
+        "failed": streams - len(ok),
+        "first_frame_p50_ms": percentile(first_frames, 50) * 1000,
+        "first_frame_p99_ms": percentile(first_frames, 99) * 1000,
+        "stream_p99_s": percentile(totals, 99),
+        "ideal_s": args.tokens * args.token_interval,
+        "tokens_per_s": sum(result["tokens"] for result in ok) / elapsed,
+        "wall_s": elapsed,
+        "client_cpu_s": client_cpu,
+    }
+
+
+async def run(port: int, args: argparse.Namespace) -> None:
+    rows = []
+    for streams in args.streams:
+        rows.append(await run_level(port, streams, args))
+    print_table(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=lambda value: [int(n) for n in value.split(",")], default=[100, 250, 500, 1000])
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per answer")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between upstream tokens")
+    parser.add_argument("--same-prompt", action="store_true", help="send one prompt so streams are coalesced")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logger.remove()
+    if args.serve:
+        serve(args)
+        return
+
+    port = free_port()
+    command = [
+        sys.executable, "-m", "benchmarks.sse_streams", "--serve", "--port", str(port),
+        "--tokens", str(args.tokens), "--token-interval", str(args.token_interval),
+    ] + (["--same-prompt"] if args.same_prompt else [])
+    server = subprocess.Popen(command)
+    try:
+        wait_for_port(port)
+        asyncio.run(run(port, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,10 +26,119 @@ class Settings(BaseConfigSettings):
     postgres_pool_size: int = 20
     postgres_max_overflow: int = 0
 
+    vector_index_type: Literal["hnsw", "ivfflat", "none"] = "hnsw"
+    vector_hnsw_m: int = 16
+    vector_hnsw_ef_construction: int = 64
+    vector_hnsw_ef_search: int = 40
+    vector_ivfflat_lists: int = 100
+    vector_ivfflat_probes: int = 10
+    # Keep scanning the ANN index until an event filter has enough rows; needs
+    # pgvector >= 0.8, which startup checks.
+    vector_iterative_scan: bool = True
+    # How /ask/rag runs hybrid search: "sequential" runs the BM25 and vector legs
+    # one after the other, "parallel" on two pooled connections at once, "sql" as
+    # one statement with the fusion done in PostgreSQL. All three rank the same.
+    hybrid_search_mode: Literal["sequential", "parallel", "sql"] = "sql"
+
+    # Embedding size shared by the Jina client and the event_chunk.embedding column.
+    embedding_dimensions: int = 1024
+    # "halfvec" stores half-precision vectors; "binary" indexes binary-quantized
+    # vectors and re-ranks the top candidates against the full-precision column.
+    embedding_storage: Literal["vector", "halfvec", "binary"] = "vector"
+    embedding_rerank_multiplier: int = 4
+
+    # Second-stage re-ranking of fused hybrid search results.
+    rerank_enabled: bool = True
+    rerank_candidates: int = 30
+    rerank_latency_budget: float = 0.15
+    rerank_batch_size: int = 16
+    rerank_cache_size: int = 10_000
+
 
     ollama_host:str = "http://localhost:11434"
     ollama_model:str = "gemma3:1b"
     ollama_timeout:int = 300
+    # How long Ollama keeps the model (and its KV cache) loaded after a request.
+    ollama_keep_alive: str = "30m"
+
+    groq_model: str = "openai/gpt-oss-120b"
+    # Seconds; the read timeout also bounds a stall between streamed chunks.
+    groq_connect_timeout: float = 5.0
+    groq_timeout: float = 60.0
+
+    # LLM router: backend preference order for ties, per-backend concurrency
+    # limits and the time a backend gets to produce its first token before failover.
+    # When every backend is saturated the last candidate is waited on for at most
+    # llm_queue_timeout seconds.
+    llm_backends: List[Literal["ollama", "groq"]] = ["ollama", "groq"]
+    llm_ollama_max_concurrency: int = 2
+    llm_groq_max_concurrency: int = 16
+    llm_first_token_timeout: float = 10.0
+    llm_queue_timeout: float = 2.0
+    llm_latency_smoothing: float = 0.2
+    # Share one upstream generation between identical in-flight requests.
+    llm_coalesce_streams: bool = True
+
+    # Connection pool shared by the long-lived Ollama and Groq HTTP clients.
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry: float = 30.0
+    llm_http2: bool = True
+
+    # Background LLM health probes and per-backend circuit breakers.
+    llm_health_interval: float = 15.0
+    llm_health_probe_timeout: float = 5.0
+    llm_breaker_failure_threshold: int = 3
+    llm_breaker_reset_timeout: float = 30.0
+
+    jina_api_key: str = ""
+    jina_max_concurrency: int = 4
+    jina_max_batch_tokens: int = 32_000
+    jina_max_retries: int = 5
+
+    embedding_cache_size: int = 10_000
+    embedding_cache_persistent: bool = True
+
+    azure_speech_key: str = ""
+    azure_speech_region: str = ""
+    azure_speech_endpoint: Optional[str] = None
+    azure_storage_connection_string: str = ""
+    azure_storage_container: str = "audio-blob"
+    azure_upload_block_size: int = 8 * 1024 * 1024
+    azure_upload_max_concurrency: int = 4
+    azure_max_connections: int = 20
+    max_audio_upload_bytes: int = 4 * 1024 * 1024 * 1024
+
+    transcription_poll_interval: float = 10.0
+    transcription_max_poll_interval: float = 120.0
+    transcription_backoff_factor: float = 1.5
+    transcription_job_timeout: int = 7200
+    transcription_max_concurrency: int = 4
+    transcription_scheduler_tick: float = 2.0
+
+    # Retrieval-augmented /ask/rag: context size and per-stage timeouts in seconds.
+    rag_top_k: int = 8
+    rag_context_token_budget: int = 2000
+    rag_embed_timeout: float = 2.0
+    rag_search_timeout: float = 3.0
+    rag_first_token_timeout: float = 20.0
+    rag_generation_timeout: float = 120.0
+
+    # Semantic answer cache in front of the ask routes; ttl in seconds.
+    answer_cache_enabled: bool = True
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl: float = 3600.0
+    answer_cache_max_entries_per_scope: int = 128
+    answer_cache_max_scopes: int = 1024
+
+    # Server-side chat history per session: recent turns within the token budget
+    # are sent verbatim, older ones are summarized; idle sessions expire after ttl seconds.
+    conversation_history_token_budget: int = 1000
+    conversation_summary_token_budget: int = 250
+    conversation_summary_timeout: float = 60.0
+    conversation_max_pending_turns: int = 20
+    conversation_idle_ttl: float = 1800.0
+    conversation_max_sessions: int = 1000
 
 
     @field_validator("postgres_database_url")
@@ -1,8 +1,9 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from src.db.factory import make_database
+from src.db.factory import make_async_database, make_database
 
 _database = None
+_async_database = None
 
 def get_database():
     """Get the database instance, creating it if it doesn't exist."""
@@ -11,9 +12,28 @@ def get_database():
         _database = make_database()
     return _database
 
+async def get_async_database():
+    """Get the async database instance, creating it if it doesn't exist."""
+    global _async_database
+    if _async_database is None:
+        _async_database = await make_async_database()
+    return _async_database
+
+def set_async_database(database) -> None:
+    """Register the async database created in the application lifespan."""
+    global _async_database
+    _async_database = database
+
 @contextmanager
 def get_db_session():
     """Context manager to get a database session."""
     database = get_database()
     with database.get_session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+@asynccontextmanager
+async def get_async_db_session():
+    """Async context manager to get a database session."""
+    database = await get_async_database()
+    async with database.get_session() as session:
+        yield session
@@ -0,0 +1,196 @@
+"""Idempotent schema bootstrap run by ``PostgreSQLDatabase.startup``.
+
+``Base.metadata.create_all`` only creates missing tables; it never alters an
+existing one. Columns and indexes added after a table was first created are
+brought up to date here with ``IF NOT EXISTS`` DDL, so every statement is safe
+to run on each startup.
+"""
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+EXTENSION_STATEMENTS: List[str] = [
+    "CREATE EXTENSION IF NOT EXISTS vector",
+]
+
+
+UPGRADE_STATEMENTS: List[str] = [
+    # Content hash used for incremental re-indexing of event chunks.
+    "ALTER TABLE event_chunk ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "UPDATE event_chunk SET content_hash = encode(sha256(convert_to(search_text, 'UTF8')), 'hex') "
+    "WHERE content_hash IS NULL",
+    "ALTER TABLE event_chunk ALTER COLUMN content_hash SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_event_chunk_content_hash ON event_chunk (content_hash)",
+    # Precomputed tsvector for BM25 search, so queries hit a GIN index instead of
+    # re-tokenizing every row. The config must match SEARCH_TS_CONFIG in src.models.events.
+    "ALTER TABLE event_chunk ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', search_text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_event_chunk_search_vector ON event_chunk USING gin (search_vector)",
+]
+
+
+def ensure_extensions(conn: Connection) -> None:
+    """Create the Postgres extensions the models depend on."""
+    for statement in EXTENSION_STATEMENTS:
+        conn.execute(text(statement))
+
+
+# hnsw.iterative_scan and ivfflat.iterative_scan were added in pgvector 0.8.0.
+ITERATIVE_SCAN_MIN_VERSION = (0, 8, 0)
+
+
+def pgvector_version(conn: Connection) -> Optional[Tuple[int, ...]]:
+    """Installed version of the pgvector extension, e.g. ``(0, 8, 0)``, or None."""
+    version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    if version is None:
+        return None
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+def check_pgvector_features(conn: Connection, iterative_scan: bool = True) -> None:
+    """Refuse to start when the configured vector search needs a newer pgvector.
+
+    Setting ``hnsw.iterative_scan`` on an older server fails inside the search
+    transaction, so every filtered vector search would come back empty.
+    """
+    version = pgvector_version(conn)
+    installed = ".".join(map(str, version)) if version else "not installed"
+    logger.info(f"pgvector {installed}")
+    if iterative_scan and (version is None or version < ITERATIVE_SCAN_MIN_VERSION):
+        raise RuntimeError(
+            f"vector_iterative_scan needs pgvector >= 0.8.0 but the database has {installed}; "
+            "run ALTER EXTENSION vector UPDATE or set VECTOR_ITERATIVE_SCAN=false"
+        )
+
+
+def upgrade_schema(conn: Connection) -> None:
+    """Apply additive schema changes to tables created by older versions."""
+    for statement in UPGRADE_STATEMENTS:
+        conn.execute(text(statement))
+    logger.info(f"Schema bootstrap applied {len(UPGRADE_STATEMENTS)} statements")
+
+
+VECTOR_INDEX_NAMES = {
+    "hnsw": "ix_event_chunk_embedding_hnsw",
+    "ivfflat": "ix_event_chunk_embedding_ivfflat",
+}
+
+
+def _vector_index_target(storage: str, dimensions: int) -> Tuple[str, str]:
+    """Indexed expression and operator class for an embedding storage mode."""
+    if storage == "halfvec":
+        return "embedding", "halfvec_cosine_ops"
+    if storage == "binary":
+        # Full-precision vectors stay in the table for re-ranking; only the index is quantized.
+        return f"(binary_quantize(embedding)::bit({dimensions}))", "bit_hamming_ops"
+    return "embedding", "vector_cosine_ops"
+
+
+def _index_definition(conn: Connection, index_name: str) -> Optional[Tuple[Dict[str, str], str]]:
+    """Return the storage parameters and operator class of an index, or None if it does not exist.
+
+    An index left invalid by an interrupted concurrent build reports no
+    parameters, so it is always rebuilt.
+    """
+    row = conn.execute(
+        text(
+            "SELECT c.reloptions, oc.opcname, i.indisvalid FROM pg_class c "
+            "JOIN pg_index i ON i.indexrelid = c.oid "
+            "JOIN pg_opclass oc ON oc.oid = i.indclass[0] "
+            "WHERE c.relname = :name"
+        ),
+        {"name": index_name},
+    ).first()
+    if row is None:
+        return None
+    if not row.indisvalid:
+        return {}, row.opcname
+    return dict(option.split("=", 1) for option in (row.reloptions or [])), row.opcname
+
+
+def ensure_embedding_column(conn: Connection, storage: str = "vector", dimensions: int = 1024) -> None:
+    """Bring ``event_chunk.embedding`` to the configured type and dimensions.
+
+    Switching between ``vector`` and ``halfvec`` is done in place with a cast. A
+    dimension change needs new embeddings, so it is only applied to an empty
+    table; otherwise startup fails and the events have to be re-indexed.
+    """
+    column_type = "halfvec" if storage == "halfvec" else "vector"
+    expected = f"{column_type}({dimensions})"
+
+    current = conn.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'event_chunk'::regclass AND attname = 'embedding'"
+    )).scalar()
+    if current is None or current == expected:
+        return
+
+    current_dimensions = current[current.find("(") + 1:-1] if "(" in current else None
+    if current_dimensions != str(dimensions) and conn.execute(text("SELECT EXISTS (SELECT 1 FROM event_chunk)")).scalar():
+        raise RuntimeError(
+            f"event_chunk.embedding is {current} but {expected} is configured; "
+            f"clear event_chunk and re-index the events to change embedding dimensions"
+        )
+
+    logger.info(f"Converting event_chunk.embedding from {current} to {expected}")
+    for index_name in VECTOR_INDEX_NAMES.values():
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    conn.execute(text(f"ALTER TABLE event_chunk ALTER COLUMN embedding TYPE {expected} USING embedding::{expected}"))
+
+
+def ensure_vector_index(
+        conn: Connection,
+        index_type: str = "hnsw",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        ivfflat_lists: int = 100,
+        storage: str = "vector",
+        dimensions: int = 1024,
+) -> None:
+    """Create, rebuild or drop the ANN index on ``event_chunk.embedding``.
+
+    Only the index for ``index_type`` is kept; an index of the other type is
+    dropped, and an existing index whose build parameters or operator class
+    differ from the configured ones is rebuilt. ``index_type="none"`` leaves
+    exact scans.
+
+    Indexes are built and dropped ``CONCURRENTLY`` so that a restart against a
+    large table does not block writes, which means ``conn`` must be in
+    autocommit mode.
+    """
+    if index_type == "hnsw":
+        options = {"m": str(hnsw_m), "ef_construction": str(hnsw_ef_construction)}
+    elif index_type == "ivfflat":
+        options = {"lists": str(ivfflat_lists)}
+    elif index_type != "none":
+        raise ValueError(f"Unknown vector index type: {index_type}")
+
+    for other_type, other_name in VECTOR_INDEX_NAMES.items():
+        if other_type != index_type and _index_definition(conn, other_name) is not None:
+            logger.info(f"Dropping vector index {other_name}")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}"))
+
+    if index_type == "none":
+        return
+
+    expression, opclass = _vector_index_target(storage, dimensions)
+    index_name = VECTOR_INDEX_NAMES[index_type]
+    current = _index_definition(conn, index_name)
+    if current == (options, opclass):
+        return
+    if current is not None:
+        logger.info(f"Rebuilding vector index {index_name}: {current} -> {(options, opclass)}")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+    with_clause = ", ".join(f"{key} = {value}" for key, value in options.items())
+    logger.info(f"Building vector index {index_name} ({opclass}, {with_clause})")
+    conn.execute(text(
+        f"CREATE INDEX CONCURRENTLY {index_name} ON event_chunk "
+        f"USING {index_type} ({expression} {opclass}) WITH ({with_clause})"
+    ))
@@ -1,19 +1,35 @@
 from src.config import get_settings
-from src.db.interfaces.postgres import PostgreSQLDatabase
+from src.db.interfaces.postgres import AsyncPostgreSQLDatabase, PostgreSQLDatabase
 from src.schemas.database.config import PostgreSQLSettings
 
 
-def make_database():
-    """Factory function to create a database instance."""
+def _make_config() -> PostgreSQLSettings:
     settings = get_settings()
 
-    config = PostgreSQLSettings(
+    return PostgreSQLSettings(
         database_url=settings.postgres_database_url,
         echo_sql=settings.postgres_echo_sql,
         pool_size=settings.postgres_pool_size,
         max_overflow=settings.postgres_max_overflow,
+        vector_index_type=settings.vector_index_type,
+        vector_iterative_scan=settings.vector_iterative_scan,
+        hnsw_m=settings.vector_hnsw_m,
+        hnsw_ef_construction=settings.vector_hnsw_ef_construction,
+        ivfflat_lists=settings.vector_ivfflat_lists,
+        embedding_storage=settings.embedding_storage,
+        embedding_dimensions=settings.embedding_dimensions,
     )
 
-    database = PostgreSQLDatabase(config=config)
+
+def make_database():
+    """Factory function to create a database instance."""
+    database = PostgreSQLDatabase(config=_make_config())
     database.startup()
-    return database
\ No newline at end of file
+    return database
+
+
+async def make_async_database():
+    """Factory function to create an async database instance."""
+    database = AsyncPostgreSQLDatabase(config=_make_config())
+    await database.startup()
+    return database
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import ContextManager
+from typing import AsyncContextManager, ContextManager
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -17,3 +18,19 @@ class BaseDatabase(ABC):
     @abstractmethod
     def get_session(self) -> ContextManager[Session]:
         """Get a database session."""
+
+
+class BaseAsyncDatabase(ABC):
+    """Base class for async database operations."""
+
+    @abstractmethod
+    async def startup(self) -> None:
+        """Initialize the async database connection."""
+
+    @abstractmethod
+    async def teardown(self) -> None:
+        """Close the async database connection."""
+
+    @abstractmethod
+    def get_session(self) -> AsyncContextManager[AsyncSession]:
+        """Get an async database session."""
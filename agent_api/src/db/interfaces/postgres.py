@@ -1,12 +1,20 @@
 import logging
-from contextlib import contextmanager
-from typing import Generator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
-from src.db.interfaces.base import BaseDatabase
+from src.db.bootstrap import (
+    check_pgvector_features,
+    ensure_embedding_column,
+    ensure_extensions,
+    ensure_vector_index,
+    upgrade_schema,
+)
+from src.db.interfaces.base import BaseAsyncDatabase, BaseDatabase
 from src.schemas.database.config import PostgreSQLSettings
 
 logger = logging.getLogger(__name__)
@@ -48,9 +56,30 @@ class PostgreSQLDatabase(BaseDatabase):
             existing_tables = inspector.get_table_names()
 
             # Create tables if they don't exist (idempotent operation)
-            print(f"DEBUG: Connecting to: {self.engine.url}")
-
-            Base.metadata.create_all(bind=self.engine)
+            logger.debug(f"Connecting to: {self.engine.url}")
+
+            with self.engine.begin() as conn:
+                ensure_extensions(conn)
+                check_pgvector_features(conn, iterative_scan=self.config.vector_iterative_scan)
+                Base.metadata.create_all(bind=conn)
+                upgrade_schema(conn)
+                ensure_embedding_column(
+                    conn,
+                    storage=self.config.embedding_storage,
+                    dimensions=self.config.embedding_dimensions,
+                )
+
+            # The ANN index is built with CONCURRENTLY, which cannot run inside a transaction.
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                ensure_vector_index(
+                    conn,
+                    index_type=self.config.vector_index_type,
+                    hnsw_m=self.config.hnsw_m,
+                    hnsw_ef_construction=self.config.hnsw_ef_construction,
+                    ivfflat_lists=self.config.ivfflat_lists,
+                    storage=self.config.embedding_storage,
+                    dimensions=self.config.embedding_dimensions,
+                )
 
             # Check if any new tables were created
             updated_tables = inspector.get_table_names()
@@ -90,4 +119,59 @@ class PostgreSQLDatabase(BaseDatabase):
             session.rollback()
             raise
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+
+class AsyncPostgreSQLDatabase(BaseAsyncDatabase):
+    """PostgreSQL database implementation backed by asyncpg.
+
+    Tables are created by the sync :class:`PostgreSQLDatabase` on startup; this
+    class only owns the async engine used by request handlers.
+    """
+
+    def __init__(self, config: PostgreSQLSettings):
+        self.config = config
+        self.engine: Optional[AsyncEngine] = None
+        self.session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+    async def startup(self) -> None:
+        """Initialize the async database connection."""
+        try:
+            self.engine = create_async_engine(
+                self.config.async_database_url,
+                connect_args={"server_settings": {"search_path": "public"}},
+                echo=self.config.echo_sql,
+                pool_size=self.config.pool_size,
+                max_overflow=self.config.max_overflow,
+                pool_pre_ping=True,
+            )
+
+            self.session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                logger.info("Async database connection test successful")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize async PostgreSQL database: {e}")
+            raise
+
+    async def teardown(self) -> None:
+        """Close the async database connection."""
+        if self.engine:
+            await self.engine.dispose()
+            logger.info("Async PostgreSQL database connections closed")
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Get an async database session."""
+        if not self.session_factory:
+            raise RuntimeError("Async database not initialized. Call startup() first.")
+
+        session = self.session_factory()
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
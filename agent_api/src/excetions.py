@@ -15,3 +15,27 @@ class OllamaConnectionError(OllamaException):
 
 class OllamaTimeoutError(OllamaException):
     """Exception raised when Ollama service times out."""
+
+
+class LLMUnavailableError(LLMException):
+    """Exception raised when no LLM backend is available to serve a request."""
+
+
+class TranscriptionException(Exception):
+    """Base exception for transcription errors."""
+
+
+class TranscriptionSubmissionError(TranscriptionException):
+    """Exception raised when Azure rejects a transcription job."""
+
+
+class AudioUploadTooLargeError(TranscriptionException):
+    """Exception raised when an uploaded audio file exceeds the size limit."""
+
+
+class RAGException(Exception):
+    """Base exception for retrieval-augmented generation errors."""
+
+
+class RAGStageTimeoutError(RAGException):
+    """Exception raised when a RAG pipeline stage exceeds its timeout."""
@@ -3,7 +3,15 @@ from contextlib import asynccontextmanager
 from loguru import logger
 from fastapi.middleware.cors import CORSMiddleware
 from src.config import get_settings
-from src.db.factory import make_database
+from src.db.factory import make_async_database, make_database
+from src.database import set_async_database
+from src.services.azure.factory import get_transcription_service
+from src.services.conversations.factory import get_conversation_store
+from src.services.embeddings.factory import get_embeddings_client
+from src.services.groq.factory import get_groq_client
+from src.services.llm.factory import get_llm_health_monitor, get_llm_router
+from src.services.ollama.factory import get_ollama_client
+from src.services.transcription.factory import make_transcription_scheduler
 from src.routers import ping, events, ask
 
 
@@ -18,10 +26,58 @@ async def lifespan(app: FastAPI):
     app.state.database = database
     logger.info("Database connected")
 
+    async_database = await make_async_database()
+    app.state.async_database = async_database
+    set_async_database(async_database)
+    logger.info("Async database connected")
+
+    transcription_service = get_transcription_service()
+    app.state.transcription_service = transcription_service
+
+    embeddings_client = get_embeddings_client()
+    app.state.embeddings_client = embeddings_client
+
+    ollama_client = get_ollama_client()
+    app.state.ollama_client = ollama_client
+
+    groq_client = get_groq_client()
+    app.state.groq_client = groq_client
+
+    llm_health_monitor = get_llm_health_monitor()
+    await llm_health_monitor.start()
+    app.state.llm_health_monitor = llm_health_monitor
+
+    app.state.llm_router = get_llm_router()
+
+    transcription_scheduler = make_transcription_scheduler(transcription_service, settings)
+    await transcription_scheduler.start()
+    app.state.transcription_scheduler = transcription_scheduler
+
     yield  
 
     logger.info("Shutting down RAG API...")
 
+    await llm_health_monitor.stop()
+    await get_conversation_store().close()
+    get_conversation_store.cache_clear()
+    get_llm_router.cache_clear()
+    get_llm_health_monitor.cache_clear()
+    await transcription_scheduler.stop()
+    await transcription_service.close()
+    get_transcription_service.cache_clear()
+
+    await embeddings_client.close()
+    get_embeddings_client.cache_clear()
+
+    await ollama_client.close()
+    get_ollama_client.cache_clear()
+
+    await groq_client.close()
+    get_groq_client.cache_clear()
+
+    await async_database.teardown()
+    database.teardown()
+
 
 app = FastAPI(
     title = "KeyNote AI",
@@ -0,0 +1,3 @@
+# Import every model module so all tables are registered on Base.metadata
+# before PostgreSQLDatabase.startup() runs create_all.
+from src.models import events, transcription, embeddings, indexing  # noqa: F401
@@ -1,13 +1,31 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Text, DateTime, CheckConstraint, ForeignKey
+from sqlalchemy import String, Text, DateTime, CheckConstraint, Computed, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.dialects.postgresql import UUID,VECTOR, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from src.db.interfaces.postgres import Base 
 from sqlalchemy.orm import relationship
 from typing import List
 
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
+from src.config import get_settings
+
+# Text search configuration of the generated event_chunk.search_vector column.
+SEARCH_TS_CONFIG = "english"
+
+
+def embedding_column_type():
+    """Column type of ``event_chunk.embedding`` for the configured storage mode.
+
+    ``binary`` keeps full-precision vectors in the table; only the ANN index is
+    built over their binary quantization.
+    """
+    settings = get_settings()
+    if settings.embedding_storage == "halfvec":
+        return HALFVEC(settings.embedding_dimensions)
+    return Vector(settings.embedding_dimensions)
+
+
 def get_utc_now():
     return datetime.now(timezone.utc)
 
@@ -35,7 +53,8 @@ class Event(Base):
     chunks: Mapped[List["EventChunk"]] = relationship(
         "EventChunk", 
         back_populates="event", 
-        cascade="all, delete-orphan" # If you delete Event, delete chunks
+        cascade="all, delete-orphan", # If you delete Event, delete chunks
+        passive_deletes=True # Let ON DELETE CASCADE remove chunks without loading them
     )
 
     __table_args__ = (
@@ -45,7 +64,7 @@ class Event(Base):
 class EventChunk(Base):
     __tablename__ = "event_chunk"
 
-    id = Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
     event_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), 
         ForeignKey("event.id", ondelete="CASCADE"), 
@@ -53,12 +72,22 @@ class EventChunk(Base):
         index=True
     )
 
-    search_text = Mapped[str] = mapped_column(String, nullable=False)
-    raw_text = Mapped[str] = mapped_column(String, nullable=False)
+    search_text: Mapped[str] = mapped_column(String, nullable=False)
+    raw_text: Mapped[str] = mapped_column(String, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_TS_CONFIG}', search_text)", persisted=True),
+        deferred=True
+    )
 
-    embedding: Mapped[List[float]] = mapped_column(Vector(1536))
+    embedding: Mapped[List[float]] = mapped_column(embedding_column_type())
     chunk_metadata: Mapped[dict] = mapped_column(JSONB, nullable=False, default={})
     event: Mapped["Event"] = relationship("Event", back_populates="chunks")
 
+    __table_args__ = (
+        Index("ix_event_chunk_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<EventChunk(id={self.id}, event_id={self.event_id})>"
\ No newline at end of file
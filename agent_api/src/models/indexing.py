@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from src.db.interfaces.postgres import Base
+from src.models.events import get_utc_now
+
+
+class IndexingCheckpoint(Base):
+    __tablename__ = "indexing_checkpoint"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_event_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    events_indexed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    chunks_indexed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=get_utc_now,
+        onupdate=get_utc_now
+    )
+
+    def __repr__(self):
+        return f"<IndexingCheckpoint(name={self.name}, last_event_id={self.last_event_id})>"
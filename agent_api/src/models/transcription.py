@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from src.db.interfaces.postgres import Base
+from src.models.events import get_utc_now
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+ACTIVE_JOB_STATUSES = (JOB_PENDING, JOB_RUNNING)
+
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_job"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("event.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    blob_name: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default=JOB_PENDING, index=True)
+    azure_job_url: Mapped[str | None] = mapped_column(String)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(Text)
+    transcription_length: Mapped[int | None] = mapped_column(Integer)
+
+    next_poll_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=get_utc_now, index=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=get_utc_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=get_utc_now,
+        onupdate=get_utc_now
+    )
+
+    def __repr__(self):
+        return f"<TranscriptionJob(id={self.id}, event_id={self.event_id}, status={self.status})>"
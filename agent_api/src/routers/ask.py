@@ -1,30 +1,92 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from src.services.ollama.factory import get_ollama_client
-from src.services.groq.factory import get_groq_client
-
-import json
+from pydantic import BaseModel
+from loguru import logger
+from src.config import get_settings
+from src.services.conversations.factory import get_conversation_store
+from src.excetions import LLMUnavailableError, RAGStageTimeoutError
+from src.services.embeddings.factory import get_embeddings_client
+from src.services.llm.factory import get_llm_router
+from src.services.prompts.templates import EVENT_ASSISTANT
+from src.services.rag.answer_cache import CachedAnswer
+from src.services.rag.factory import get_answer_cache, make_rag_pipeline
+from src.services.rag.pipeline import StageTimings
+from src.services.sse import TokenBuffer, sse_event, stream_events
+from typing import Any, Dict, List, Optional
+
+import asyncio
+import uuid
 
 router = APIRouter(
     tags=["ask"]
 )
 
-@router.get("/ask")
-async def ask_question(prompt:str):
-    ollama_client = get_ollama_client()
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
 
-    health_check = await ollama_client.health_check()
-    print(health_check)
 
-    
+def replay_cached_answer(
+        cached: CachedAnswer,
+        first_event: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """Replay a cached answer as the same SSE events, written in a single chunk."""
+    frames = [sse_event(first_event)] if first_event else []
+    frames.append(sse_event({"chunk": cached.answer}))
+    frames.append(sse_event({"done": True, "cached": True}))
+    payload = b"".join(frames)
 
-    response = await ollama_client.generate_text(
-        model="gemma3:1b",
-        prompt=prompt,
-        stream=False
-    )
+    async def generate_stream():
+        yield payload
+
+    return StreamingResponse(generate_stream(), media_type="text/event-stream", headers={**SSE_HEADERS, **(headers or {})})
+
+
+async def embed_for_answer_cache(prompt: str) -> Optional[List[float]]:
+    """Query embedding used as the answer cache key, or None to bypass the cache."""
+    if get_answer_cache() is None:
+        return None
+    try:
+        async with asyncio.timeout(get_settings().rag_embed_timeout):
+            return await get_embeddings_client().embed_query(prompt)
+    except Exception as e:
+        logger.warning(f"Skipping answer cache, prompt embedding failed: {e!r}")
+        return None
+
+async def embed_event_question(event_id: Optional[uuid.UUID], question: Optional[str]) -> Optional[List[float]]:
+    """Answer cache key for a prompt about one event: the embedding of the bare question.
+
+    Prompts that carry the same event context embed almost identically whatever
+    the question, so they are never used as keys; without an event id and the
+    question on its own the cache is bypassed.
+    """
+    if event_id is None or not question:
+        return None
+    return await embed_for_answer_cache(question)
+
+
+@router.get("/ask/health")
+async def llm_health(request: Request):
+    """Cached state of every LLM backend, as last seen by the background health monitor."""
+    embedding_cache = get_embeddings_client().cache
+    return {
+        "health": request.app.state.llm_health_monitor.status(),
+        "routing": request.app.state.llm_router.status(),
+        "conversations": get_conversation_store().stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+    }
 
-    return response
+
+@router.get("/ask")
+async def ask_question(prompt:str):
+    try:
+        response = await get_llm_router().generate(prompt, prefer="ollama")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"answer": response.text, "backend": response.backend, "model": response.model}
 
 
 # @router.get("/stream")
@@ -84,101 +146,153 @@ async def ask_question(prompt:str):
 #         generate_stream(), media_type="text/plain", headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
 #     )
 @router.get("/ask/groq")
-async def ask_groq(prompt: str):
-    groq_client = get_groq_client()
+async def ask_groq(prompt: str, event_id: Optional[uuid.UUID] = None, question: Optional[str] = None):
+    """Answer ``prompt``; ``event_id`` and ``question`` (the user's words in it) enable the answer cache."""
+    answer_cache = get_answer_cache()
+    question_embedding = await embed_event_question(event_id, question)
+    if question_embedding is not None:
+        cached = answer_cache.lookup("groq", event_id, question_embedding)
+        if cached is not None:
+            return {"answer": cached.answer, "cached": True}
+
+    try:
+        response = await get_llm_router().generate(prompt, prefer="groq")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if question_embedding is not None and response.text:
+        answer_cache.store(
+            "groq", event_id, question, question_embedding, response.text, depends_on=frozenset({str(event_id)}),
+        )
+    return {"answer": response.text, "backend": response.backend, "model": response.model}
 
-    health = await groq_client.health_check()
-    if health["status"] != "ok":
-        return health
+@router.post("/stream/groq")
+async def stream_groq(
+        request: Request,
+        prompt: str,
+        conversation_id: Optional[str] = None,
+        event_id: Optional[uuid.UUID] = None,
+        question: Optional[str] = None,
+):
+    """Stream an answer to ``prompt``; ``event_id`` and ``question`` enable the answer cache as in ``/ask/groq``."""
+    conversation = get_conversation_store().get(conversation_id, event_id) if conversation_id else None
+    follow_up = conversation is not None and conversation.has_history
+    full_prompt = EVENT_ASSISTANT.render(history=conversation.history() if conversation else [], question=prompt)
+
+    # Follow-up questions depend on the conversation, so they bypass the answer cache.
+    answer_cache = get_answer_cache()
+    question_embedding = None if follow_up else await embed_event_question(event_id, question)
+    if question_embedding is not None:
+        cached = answer_cache.lookup("groq-stream", event_id, question_embedding)
+        if cached is not None:
+            return replay_cached_answer(cached)
+
+    stream = get_llm_router().stream(full_prompt, prefer="groq")
+    try:
+        await stream.start()
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def answer_events():
+        answer = TokenBuffer()
+        try:
+            async for chunk in stream:
+                answer.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+
+        if conversation is not None and answer:
+            # The prompt can carry the whole event context; only the user's words belong in the history.
+            get_conversation_store().record(conversation, question or prompt, answer.text())
+        if question_embedding is not None and answer:
+            answer_cache.store(
+                "groq-stream", event_id, question, question_embedding, answer.text(),
+                depends_on=frozenset({str(event_id)}),
+            )
+        yield {"done": True, "backend": stream.backend}
 
-    response = await groq_client.generate_text(
-        model="openai/gpt-oss-120b",
-        prompt=prompt,
+    return StreamingResponse(
+        stream_events(answer_events(), request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
 
-    return {"answer": response}
-
-@router.post("/stream/groq")
-async def stream_groq(prompt: str):
-    groq_client = get_groq_client()
-
-    system_prompt = """
-<SYSTEM>
-Role:
-You are KeyNote AI, an intelligent event assistant.
-
-Identity:
-KeyNote AI is an AI assistant specialized in understanding, summarizing, 
-and explaining what happened during events. You maintain a friendly, helpful, 
-and professional tone in all interactions.
-
-Core Purpose:
-Your primary function is to analyze event-related information and provide 
-clear, structured answers about events. Help users understand event details, 
-summarize what happened, and answer questions about specific events.
-
-CRITICAL Behavior Guidelines:
-1. ALWAYS prioritize event-related questions and provide detailed, helpful answers.
-2. For COMPLETELY IRRELEVANT questions (e.g., math problems, coding help, general knowledge 
-   unrelated to events): DO NOT ANSWER. Instead, politely decline and redirect to event details.
-   Example: "I'm specifically designed to help with event-related questions. Is there 
-   anything about the event you'd like to know?"
-3. For FRIENDLY CONVERSATIONS or GREETINGS (e.g., "hi", "hello", "how are you"):
-   - Answer politely but VERY BRIEFLY (1-2 sentences max).
-   - IMMEDIATELY redirect to events.
-   Example: "Hey there! I'm doing great, thanks for asking! Now, let me help you 
-   understand more about the event. What would you like to know?"
-4. ALWAYS end every response by nudging users toward event-related questions.
-
-Tone:
-- Be conversational and friendly
-- Show genuine interest in helping users understand their events
-- Use a professional yet approachable tone
-- Never provide long answers to non-event questions
-- Always redirect focus back to event details
-
-Content Scope:
-✓ Answer: Event details, summaries, attendees, timeline, activities
-✗ Don't Answer: Unrelated topics, general knowledge, off-topic requests
-
-<REDIRECTION>
-Remember: Your ONLY expertise is in events. Politely decline irrelevant questions 
-and guide ALL conversations back to event-related topics. Be friendly but firm 
-about your scope.
-</REDIRECTION>
-
-</SYSTEM>
-"""
-
-    full_prompt = f"""{system_prompt}
-
-<USER_INPUT>
-{prompt}
-</USER_INPUT>
-"""
 
-    async def generate_stream():
-        full_response = ""
+def _source_summaries(sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "chunk_id": hit["chunk_id"],
+            "event_id": hit["event_id"],
+            "score": hit["score"],
+            # Re-ranker and fused scores are on different scales; this says which one ``score`` is.
+            "source": hit["source"],
+            "metadata": hit["metadata"],
+        }
+        for hit in sources
+    ]
+
+
+class AskRequest(BaseModel):
+    query: str
+    event_id: uuid.UUID | None = None
+    conversation_id: str | None = None
+
+
+@router.post("/ask/rag")
+async def ask_rag(request: AskRequest, http_request: Request):
+    """Answer from the indexed event chunks, optionally scoped to one event.
+
+    Streams server-sent events: the sources and retrieval timings first, then
+    the answer chunks, then a final event with every stage timing. A cached
+    answer to a near-identical question about the same event is replayed
+    without retrieval or generation. With a ``conversation_id`` the answer
+    follows on from the session's earlier questions.
+    """
+    pipeline = make_rag_pipeline()
+    timings = StageTimings()
+    conversation = (
+        get_conversation_store().get(request.conversation_id, request.event_id) if request.conversation_id else None
+    )
 
+    query_embedding = await pipeline.embed_query(request.query, timings)
+    follow_up = conversation is not None and conversation.has_history
+    cached = None if follow_up else pipeline.cached_answer(request.event_id, query_embedding, timings)
+    if cached is not None:
+        return replay_cached_answer(
+            cached,
+            {
+                "sources": _source_summaries(cached.extra["sources"]),
+                "context_tokens": cached.extra["context_tokens"],
+                "timings": timings.as_dict(),
+                "cached": True,
+            },
+            {"Server-Timing": timings.server_timing()},
+        )
+
+    if not pipeline.llm_router.available_backends():
+        raise HTTPException(status_code=503, detail="No LLM backend is available")
+
+    try:
+        context = await pipeline.retrieve(request.query, query_embedding, request.event_id, timings)
+    except RAGStageTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    async def answer_events():
+        yield {"sources": _source_summaries(context.sources), "context_tokens": context.tokens, "timings": timings.as_dict()}
+
+        answer = pipeline.stream_answer(
+            request.query, context, timings,
+            event_id=request.event_id, query_embedding=query_embedding, conversation=conversation,
+        )
         try:
-            async for chunk in groq_client.stream_generate_text(
-                model="openai/gpt-oss-120b",
-                prompt=full_prompt,
-            ):
-                full_response += chunk
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-
-            yield f"data: {json.dumps({'answer': full_response, 'done': True})}\n\n"
-
-        except Exception as e:
-            yield f"data: {json.dumps({'error': str(e), 'done': True})}\n\n"
+            async for event in answer:
+                yield event
+        finally:
+            await answer.aclose()
 
     return StreamingResponse(
-        generate_stream(),
+        stream_events(answer_events(), http_request),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+        headers={**SSE_HEADERS, "Server-Timing": timings.server_timing()},
     )
-
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from datetime import datetime
-from src.database import get_db_session
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Request
+from datetime import datetime, timezone
+from src.database import get_async_db_session
 from src.models.events import Event
-from src.services.azure.factory import get_transcription_service
+from src.models.transcription import TranscriptionJob
+from src.excetions import AudioUploadTooLargeError
+from src.services.indexing.hybrid_indexing import INDEXED_EVENT_FIELDS, backfill_events, reindex_event
+from src.services.rag.factory import get_answer_cache
 from loguru import logger
 import uuid
 
@@ -10,6 +13,13 @@ router = APIRouter(
     tags=["events"]
 )
 
+def _as_utc(value):
+    """Treat naive datetimes from the request as UTC so they compare with the stored timestamptz values."""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
 @router.get("/events/health")
 async def health_check():
     return {"status": "events router is healthy"}
@@ -31,34 +41,47 @@ class EventResponse(EventCreate):
     created_at: datetime
     updated_at: datetime
     
+    model_config = ConfigDict(from_attributes=True)
+
+class TranscriptionJobResponse(BaseModel):
+    id: uuid.UUID
+    event_id: uuid.UUID
+    status: str
+    attempts: int
+    error: str | None = None
+    transcription_length: int | None = None
+    created_at: datetime
+    updated_at: datetime
+    completed_at: datetime | None = None
+
     model_config = ConfigDict(from_attributes=True)
 from fastapi import APIRouter, HTTPException
 from typing import List
 from sqlalchemy import select, desc
-from src.database import get_db_session
+from src.database import get_async_db_session
 from src.models.events import Event
 
 # 1. GET ALL EVENTS
 @router.get("/events/", response_model=List[EventResponse])
 async def get_all_events():
-    with get_db_session() as session:
+    async with get_async_db_session() as session:
         # select(Event) is the SQLAlchemy 2.0 style
         query = select(Event).order_by(Event.created_at.desc())
-        result = session.execute(query)
+        result = await session.execute(query)
         return result.scalars().all()
 
 # 2. GET RECENT 5 EVENTS
 @router.get("/events/recent", response_model=List[EventResponse])
 async def get_recent_events():
-    with get_db_session() as session:
+    async with get_async_db_session() as session:
         query = select(Event).order_by(desc(Event.created_at)).limit(5)
-        result = session.execute(query)
+        result = await session.execute(query)
         return result.scalars().all()
 
 # 3. CREATE EVENT
 @router.post("/events/", response_model=EventResponse)
-async def create_event(event_data: EventCreate):
-    with get_db_session() as session:
+async def create_event(event_data: EventCreate, background_tasks: BackgroundTasks):
+    async with get_async_db_session() as session:
         # Create new Event instance
         new_event = Event(
             event_name=event_data.event_name,
@@ -70,51 +93,80 @@ async def create_event(event_data: EventCreate):
         )
         
         session.add(new_event)
-        session.commit()
-        session.refresh(new_event)
+        await session.commit()
+        await session.refresh(new_event)
+
+        if new_event.transcription:
+            background_tasks.add_task(reindex_event, new_event.id)
         return new_event
 
 # 4. UPDATE EVENT
 @router.put("/events/{event_id}", response_model=EventResponse)
-async def update_event(event_id: uuid.UUID, update_data: EventCreate):
-    with get_db_session() as session:
+async def update_event(event_id: uuid.UUID, update_data: EventCreate, background_tasks: BackgroundTasks):
+    async with get_async_db_session() as session:
         # Find the event first
-        event = session.get(Event, event_id)
+        event = await session.get(Event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
         
         # Update attributes dynamically
+        changed = set()
         for key, value in update_data.model_dump().items():
-            setattr(event, key, value)
+            value = _as_utc(value)
+            if _as_utc(getattr(event, key)) != value:
+                setattr(event, key, value)
+                changed.add(key)
             
-        session.commit()
-        session.refresh(event)
+        await session.commit()
+        await session.refresh(event)
+
+        # Cached answers may quote any field (e.g. the times), so drop them on every change
+        answer_cache = get_answer_cache()
+        if changed and answer_cache is not None:
+            answer_cache.invalidate(event.id)
+
+        # Re-index in the background, only when a field that goes into the chunk text changed
+        if changed & INDEXED_EVENT_FIELDS:
+            background_tasks.add_task(reindex_event, event.id)
         return event
 
 # 5. DELETE EVENT
 @router.delete("/events/{event_id}")
 async def delete_event(event_id: uuid.UUID):
-    with get_db_session() as session:
-        event = session.get(Event, event_id)
+    async with get_async_db_session() as session:
+        event = await session.get(Event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
         
-        session.delete(event)
-        session.commit()
+        await session.delete(event)
+        await session.commit()
+
+        answer_cache = get_answer_cache()
+        if answer_cache is not None:
+            answer_cache.invalidate(event_id)
         return {"message": f"Event {event_id} deleted successfully"}
 
 
-# 6. TRANSCRIBE AUDIO AND STORE IN EVENT
-@router.post("/events/{event_id}/transcribe")
-async def transcribe_and_store_audio(event_id: uuid.UUID, audio_file: UploadFile = File(...)):
+# 6. RE-INDEX ALL EVENTS
+@router.post("/events/reindex", status_code=202)
+async def reindex_all_events(background_tasks: BackgroundTasks, resume: bool = True):
+    """Start a background backfill that indexes every event with a transcription."""
+    background_tasks.add_task(backfill_events, resume)
+    return {"status": "accepted", "resume": resume}
+
+
+# 7. TRANSCRIBE AUDIO AND STORE IN EVENT
+@router.post("/events/{event_id}/transcribe", status_code=202)
+async def transcribe_and_store_audio(request: Request, event_id: uuid.UUID, audio_file: UploadFile = File(...)):
     """
-    Upload an audio file, transcribe it using Azure Speech Service,
-    and store the transcription in the event's transcription field.
+    Upload an audio file and queue an Azure Speech transcription job for it.
+    The transcription is stored on the event once the job completes; poll
+    the returned job id for its status.
     """
     try:
         # 1. Verify event exists
-        with get_db_session() as session:
-            event = session.get(Event, event_id)
+        async with get_async_db_session() as session:
+            event = await session.get(Event, event_id)
             if not event:
                 raise HTTPException(status_code=404, detail="Event not found")
         
@@ -130,51 +182,36 @@ async def transcribe_and_store_audio(event_id: uuid.UUID, audio_file: UploadFile
                 detail=f"Invalid audio format. Allowed: {', '.join(allowed_formats)}"
             )
         
+        max_size = request.app.state.settings.max_audio_upload_bytes
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_size:
+            raise HTTPException(status_code=413, detail=f"Audio file exceeds the {max_size} byte limit")
+
         logger.info(f"Processing transcription for event {event_id}")
         
         # 3. Get Azure transcription service
-        transcription_service = get_transcription_service()
+        scheduler = request.app.state.transcription_scheduler
+        transcription_service = request.app.state.transcription_service
         
-        # 4. Upload file to Azure Blob Storage
-        file_obj = await audio_file.read()
+        # 4. Stream file to Azure Blob Storage block by block
         blob_filename = f"{event_id}_{audio_file.filename}"
         
-        # Create BytesIO object for upload
-        from io import BytesIO
-        file_bytes_io = BytesIO(file_obj)
-        
-        transcription_service.upload_file(file_bytes_io, blob_filename)
+        try:
+            await transcription_service.upload_stream(audio_file, blob_filename, max_size=max_size)
+        except AudioUploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         logger.info(f"Audio file uploaded: {blob_filename}")
         
-        # 5. Run transcription and get results
-        # Note: run_transcription currently saves to file, we'll modify to return text
-        transcription = await _get_transcription_result(
-            transcription_service, 
-            blob_filename
-        )
-        
-        if not transcription:
-            raise HTTPException(
-                status_code=500, 
-                detail="Transcription failed. No text extracted."
-            )
-        
-        # 6. Update event with transcription
-        with get_db_session() as session:
-            event = session.get(Event, event_id)
-            if event:
-                event.transcription = transcription
-                session.commit()
-                session.refresh(event)
-                logger.info(f"Event {event_id} transcription stored successfully")
-                return {
-                    "event_id": event_id,
-                    "status": "success",
-                    "message": "Audio transcribed and stored successfully",
-                    "transcription_length": len(transcription),
-                    "transcription_preview": transcription[:200] + "..." if len(transcription) > 200 else transcription
-                }
+        # 5. Queue the transcription job; the scheduler submits and polls it
+        job = await scheduler.create_job(event_id, blob_filename)
+
+        return {
+            "event_id": event_id,
+            "job_id": job.id,
+            "status": job.status,
+            "message": "Audio uploaded. Transcription job queued."
+        }
         
     except HTTPException:
         raise
@@ -186,105 +223,11 @@ async def transcribe_and_store_audio(event_id: uuid.UUID, audio_file: UploadFile
         )
 
 
-async def _get_transcription_result(transcription_service, blob_name: str) -> str:
-    """
-    Helper function to run transcription and extract the text result.
-    """
-    import time
-    import requests
-    from io import BytesIO
-    
-    try:
-        # Generate SAS URL
-        file_url = transcription_service._generate_sas_url(blob_name)
-        
-        # Submit transcription job
-        job_data = {
-            "contentUrls": [file_url],
-            "displayName": f"Transcription_{blob_name}",
-            "locale": "en-US",
-            "properties": {
-                "wordLevelTimestampsEnabled": True,
-                "timeToLiveHours": 1,
-                "candidateLocales": ["en-US", "ta-IN"],
-            }
-        }
-        
-        headers = {
-            "Ocp-Apim-Subscription-Key": transcription_service.speech_key,
-            "Content-Type": "application/json"
-        }
-        
-        logger.info(f"Submitting transcription job for {blob_name}...")
-        response = transcription_service.session.post(
-            f"{transcription_service.base_url}/transcriptions", 
-            headers=headers, 
-            json=job_data
-        )
-        
-        if response.status_code != 201:
-            logger.error(f"Job submission failed: {response.text}")
-            return None
-        
-        job_url = response.json()['self']
-        job_id = job_url.split('/')[-1]
-        logger.info(f"Job created: {job_id}")
-        
-        # Poll for completion
-        max_polls = 120  # Max 20 minutes with 10s intervals
-        polls = 0
-        while polls < max_polls:
-            time.sleep(10)
-            polls += 1
-            
-            try:
-                status_res = transcription_service.session.get(job_url, headers=headers)
-                status_data = status_res.json()
-                status = status_data['status']
-                
-                logger.info(f"Job {job_id} status: {status}")
-                
-                if status == "Succeeded":
-                    # Extract transcription text
-                    files_url = status_data['links']['files']
-                    files_data = transcription_service.session.get(files_url, headers=headers).json()
-                    
-                    content_url = next(
-                        v['links']['contentUrl'] 
-                        for v in files_data['values'] 
-                        if v['kind'] == 'Transcription'
-                    )
-                    result_data = transcription_service.session.get(content_url).json()
-                    
-                    # Extract text from result
-                    full_text = ""
-                    if 'combinedRecognizedPhrases' in result_data and result_data['combinedRecognizedPhrases']:
-                        full_text = result_data['combinedRecognizedPhrases'][0]['display']
-                    elif 'combinedPhrases' in result_data and result_data['combinedPhrases']:
-                        full_text = result_data['combinedPhrases'][0]['text']
-                    elif 'phrases' in result_data:
-                        full_text = " ".join([p.get('display', p.get('text', '')) for p in result_data['phrases']])
-                    
-                    # Cleanup
-                    transcription_service._delete_blob(blob_name)
-                    
-                    logger.info(f"Transcription complete for {blob_name}")
-                    return full_text if full_text else None
-                    
-                elif status == "Failed":
-                    err = status_data.get('properties', {}).get('error', 'Unknown error')
-                    logger.error(f"Transcription job failed: {err}")
-                    transcription_service._delete_blob(blob_name)
-                    return None
-                    
-            except requests.exceptions.ConnectionError:
-                logger.warning("Connection lost, retrying...")
-                continue
-        
-        logger.error(f"Transcription job {job_id} timed out")
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error in transcription process: {str(e)}", exc_info=True)
-        return None
-
+# 8. TRANSCRIPTION JOB STATUS
+@router.get("/events/{event_id}/transcribe/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(event_id: uuid.UUID, job_id: uuid.UUID):
+    async with get_async_db_session() as session:
+        job = await session.get(TranscriptionJob, job_id)
+        if not job or job.event_id != event_id:
+            raise HTTPException(status_code=404, detail="Transcription job not found")
+        return job
@@ -1,5 +1,8 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 
 
 class PostgreSQLSettings(BaseSettings):
@@ -11,6 +14,25 @@ class PostgreSQLSettings(BaseSettings):
     echo_sql: bool = Field(default=False, description="Enable SQL query logging")
     pool_size: int = Field(default=20, description="Database connection pool size")
     max_overflow: int = Field(default=0, description="Maximum pool overflow")
+    vector_index_type: Literal["hnsw", "ivfflat", "none"] = Field(
+        default="hnsw", description="ANN index on event_chunk.embedding"
+    )
+    vector_iterative_scan: bool = Field(
+        default=True, description="Scan the ANN index iteratively under event filters (pgvector >= 0.8)"
+    )
+    hnsw_m: int = Field(default=16, description="HNSW max connections per layer")
+    hnsw_ef_construction: int = Field(default=64, description="HNSW candidate list size at build time")
+    ivfflat_lists: int = Field(default=100, description="IVFFlat number of inverted lists")
+    embedding_storage: Literal["vector", "halfvec", "binary"] = Field(
+        default="vector", description="Storage / index format of event_chunk.embedding"
+    )
+    embedding_dimensions: int = Field(default=1024, description="Dimensions of event_chunk.embedding")
+
+    @property
+    def async_database_url(self) -> str:
+        """Same database, addressed through the asyncpg driver."""
+        url = make_url(self.database_url).set(drivername="postgresql+asyncpg")
+        return url.render_as_string(hide_password=False)
 
     class Config:
-        env_prefix = "POSTGRES_"
\ No newline at end of file
+        env_prefix = "POSTGRES_"
@@ -11,7 +11,7 @@ class JinaEmbeddingRequest(BaseModel):
     dimensions: int = 1024
     late_chunking: bool = False
     embedding_type: str = "float"
-    input = List[str]
+    input: List[str]
 
 class JinaEmbeddingResponse(BaseModel):
     """Response Model from the Jina Embeddings API"""
@@ -1,55 +1,128 @@
-import os
-import time
-import requests
+import asyncio
+import httpx
 from datetime import datetime, timedelta
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from azure.storage.blob import BlobBlock, BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 from loguru import logger
+from src.excetions import AudioUploadTooLargeError, TranscriptionSubmissionError
+
+
+def extract_transcription_text(result_data):
+    """Pull the recognised text out of an Azure batch transcription result file."""
+    if 'combinedRecognizedPhrases' in result_data and result_data['combinedRecognizedPhrases']:
+        return result_data['combinedRecognizedPhrases'][0]['display']
+    elif 'combinedPhrases' in result_data and result_data['combinedPhrases']:
+        return result_data['combinedPhrases'][0]['text']
+    elif 'phrases' in result_data:
+        return " ".join([p.get('display', p.get('text', '')) for p in result_data['phrases']])
+    return ""
+
 
 class AzureTranscriptionClient:
-    def __init__(self, speech_key, speech_region, storage_conn_str, container_name="audio-blob"):
+    def __init__(
+            self,
+            speech_key,
+            speech_region,
+            storage_conn_str,
+            container_name="audio-blob",
+            speech_endpoint=None,
+            upload_block_size=8 * 1024 * 1024,
+            upload_max_concurrency=4,
+            max_connections=20,
+    ):
         self.speech_key = speech_key
         self.speech_region = speech_region
         self.storage_conn_str = storage_conn_str
         self.container_name = container_name
-        self.base_url = f"https://{speech_region}.api.cognitive.microsoft.com/speechtotext/v3.2"
-        self.session = self._get_retry_session()
-
-    def _get_retry_session(self):
-        """Creates a requests session with automatic retry logic."""
-        session = requests.Session()
-        retry = Retry(
-            total=5, 
-            backoff_factor=2, 
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "POST"]
+        self.base_url = speech_endpoint or f"https://{speech_region}.api.cognitive.microsoft.com/speechtotext/v3.2"
+        self.upload_block_size = upload_block_size
+        self.upload_max_concurrency = upload_max_concurrency
+        self.http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-        return session
+        self._blob_service_client = None
+        self._async_blob_service_client = None
+
+    @property
+    def blob_service_client(self):
+        """Process-wide sync blob client, built from the connection string on first use."""
+        if self._blob_service_client is None:
+            self._blob_service_client = BlobServiceClient.from_connection_string(self.storage_conn_str)
+        return self._blob_service_client
+
+    @property
+    def async_blob_service_client(self):
+        """Process-wide async blob client sharing one aiohttp connection pool."""
+        if self._async_blob_service_client is None:
+            self._async_blob_service_client = AsyncBlobServiceClient.from_connection_string(self.storage_conn_str)
+        return self._async_blob_service_client
+
+    @property
+    def _speech_headers(self):
+        return {
+            "Ocp-Apim-Subscription-Key": self.speech_key,
+            "Content-Type": "application/json"
+        }
+
+    async def upload_stream(self, file_obj, filename, max_size=None):
+        """Streams an async file-like object (e.g. an UploadFile) to a block blob.
+
+        At most ``upload_max_concurrency`` blocks of ``upload_block_size`` bytes are
+        held in memory at once, and staging of those blocks runs in parallel.
+        Raises AudioUploadTooLargeError as soon as ``max_size`` is exceeded; the
+        staged blocks are never committed in that case.
+        """
+        logger.info(f"Streaming {filename} to Azure Blob Storage in blocks...")
+        blob_client = self.async_blob_service_client.get_blob_client(container=self.container_name, blob=filename)
+
+        slots = asyncio.Semaphore(self.upload_max_concurrency)
+        block_list = []
+        pending = []
+        total_size = 0
+
+        async def stage(block_id, data):
+            try:
+                await blob_client.stage_block(block_id, data)
+            finally:
+                slots.release()
 
-    def upload_file(self, file_obj, filename):
-        """Uploads a file-like object to Azure Blob Storage."""
         try:
-            logger.info(f"Streaming {filename} to Azure Blob Storage...")
-            blob_service_client = BlobServiceClient.from_connection_string(self.storage_conn_str)
-            blob_client = blob_service_client.get_blob_client(container=self.container_name, blob=filename)
-            
-            file_obj.seek(0)
-            blob_client.upload_blob(
-                file_obj, 
-                overwrite=True, 
-                max_concurrency=4, 
-                connection_timeout=600
-            )
-            logger.info(f"Upload complete: {filename}")
-        except Exception as e:
-            logger.error(f"Upload Failed: {str(e)}")
-            raise e
+            while True:
+                await slots.acquire()
+                for task in pending:
+                    if task.done() and task.exception():
+                        slots.release()
+                        raise task.exception()
+
+                data = await file_obj.read(self.upload_block_size)
+                if not data:
+                    slots.release()
+                    break
+
+                total_size += len(data)
+                if max_size is not None and total_size > max_size:
+                    slots.release()
+                    raise AudioUploadTooLargeError(f"Upload exceeds the {max_size} byte limit")
+
+                block_id = f"{len(block_list):08d}"
+                block_list.append(BlobBlock(block_id=block_id))
+                pending.append(asyncio.create_task(stage(block_id, data)))
+
+            await asyncio.gather(*pending)
+            await blob_client.commit_block_list(block_list)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.error(f"Upload Failed: {filename}")
+            raise
+
+        logger.info(f"Upload complete: {filename} ({total_size} bytes in {len(block_list)} blocks)")
+        return total_size
 
     def _generate_sas_url(self, blob_name):
-        blob_service_client = BlobServiceClient.from_connection_string(self.storage_conn_str)
+        blob_service_client = self.blob_service_client
         blob_client = blob_service_client.get_blob_client(container=self.container_name, blob=blob_name)
         
         sas_token = generate_blob_sas(
@@ -62,103 +135,66 @@ class AzureTranscriptionClient:
         )
         return f"{blob_client.url}?{sas_token}"
 
-    def _delete_blob(self, blob_name):
+    async def delete_blob(self, blob_name):
+        """Delete an uploaded blob once its transcription job has finished."""
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(self.storage_conn_str)
-            blob_client = blob_service_client.get_blob_client(container=self.container_name, blob=blob_name)
-            blob_client.delete_blob()
+            blob_client = self.async_blob_service_client.get_blob_client(container=self.container_name, blob=blob_name)
+            await blob_client.delete_blob()
             logger.info(f"Cleanup: Deleted blob {blob_name}")
         except Exception as e:
             logger.error(f"Cleanup Failed: {str(e)}")
 
-    def run_transcription(self, blob_name):
-        """Orchestrates the full transcription workflow."""
-        try:
-            # 1. Generate SAS
-            file_url = self._generate_sas_url(blob_name)
-
-            # 2. Submit Job (Configured for Universal Model + Code Switching)
-            job_data = {
-                "contentUrls": [file_url],
-                "displayName": f"Batch_{blob_name}",
-                "locale": "en-US", # Fallback default
-                "properties": {
-                    "wordLevelTimestampsEnabled": True,
-                    "timeToLiveHours": 1,
-                    # Universal Model Feature: Language Detection
-                    "candidateLocales": ["en-US", "ta-IN"], 
-                }
-            }
-            
-            headers = {
-                "Ocp-Apim-Subscription-Key": self.speech_key, 
-                "Content-Type": "application/json"
+    async def submit_transcription(self, blob_name):
+        """Submit a batch transcription job and return its status URL."""
+        file_url = self._generate_sas_url(blob_name)
+        job_data = {
+            "contentUrls": [file_url],
+            "displayName": f"Transcription_{blob_name}",
+            "locale": "en-US",
+            "properties": {
+                "wordLevelTimestampsEnabled": True,
+                "timeToLiveHours": 1,
+                "candidateLocales": ["en-US", "ta-IN"],
             }
+        }
 
-            logger.info(f"Submitting Universal Job for {blob_name}...")
-            response = self.session.post(f"{self.base_url}/transcriptions", headers=headers, json=job_data)
-
-            if response.status_code != 201:
-                logger.error(f"FATAL: Job Submission Failed. {response.text}")
-                return
-
-            job_url = response.json()['self']
-            job_id = job_url.split('/')[-1]
-            logger.info(f"Job Created. ID: {job_id}. Polling...")
-
-            # 3. Polling Loop
-            while True:
-                time.sleep(10)
-                try:
-                    status_res = self.session.get(job_url, headers=headers)
-                    status_data = status_res.json()
-                    status = status_data['status']
-                    
-                    logger.info(f"Job {job_id} Status: {status}")
-                    
-                    if status == "Succeeded":
-                        self._process_results(status_data, headers, blob_name)
-                        break
-                    elif status == "Failed":
-                        err = status_data.get('properties', {}).get('error', 'Unknown Error')
-                        logger.error(f"Job {job_id} Failed: {err}")
-                        break
-                
-                except requests.exceptions.ConnectionError:
-                    logger.warning("Connection dropped. Reconnecting in 5s...")
-                    time.sleep(5)
-                    continue
-
-            # 4. Cleanup
-            self._delete_blob(blob_name)
-
-        except Exception as e:
-            logger.error(f"Workflow Error: {str(e)}", exc_info=True)
-
-    def _process_results(self, status_data, headers, blob_name):
-        try:
-            files_url = status_data['links']['files']
-            files_data = self.session.get(files_url, headers=headers).json()
-            
-            content_url = next(v['links']['contentUrl'] for v in files_data['values'] if v['kind'] == 'Transcription')
-            result_data = self.session.get(content_url).json()
-
-            full_text = ""
-            if 'combinedRecognizedPhrases' in result_data and result_data['combinedRecognizedPhrases']:
-                full_text = result_data['combinedRecognizedPhrases'][0]['display']
-            elif 'combinedPhrases' in result_data and result_data['combinedPhrases']:
-                full_text = result_data['combinedPhrases'][0]['text']
-            elif 'phrases' in result_data:
-                full_text = " ".join([p.get('display', p.get('text', '')) for p in result_data['phrases']])
-            else:
-                full_text = "[Error: No text found]"
-
-            output_filename = f"{blob_name}.txt"
-            with open(output_filename, "w", encoding="utf-8") as f:
-                f.write(full_text)
-            
-            logger.info("--- TRANSCRIPTION COMPLETE ---")
-            logger.info(f"Saved to: {os.path.abspath(output_filename)}")
-
-        except Exception as e:
-            logger.error(f"Result Processing Error: {str(e)}")
\ No newline at end of file
+        logger.info(f"Submitting transcription job for {blob_name}...")
+        response = await self.http_client.post(
+            f"{self.base_url}/transcriptions",
+            headers=self._speech_headers,
+            json=job_data
+        )
+        if response.status_code != 201:
+            raise TranscriptionSubmissionError(f"Job submission failed: {response.text}")
+        return response.json()['self']
+
+    async def get_transcription_status(self, job_url):
+        """Fetch the current status document of a transcription job."""
+        response = await self.http_client.get(job_url, headers=self._speech_headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_transcription_text(self, status_data):
+        """Download the result file of a succeeded job and return its text."""
+        files_url = status_data['links']['files']
+        files_response = await self.http_client.get(files_url, headers=self._speech_headers)
+        files_response.raise_for_status()
+
+        content_url = next(
+            v['links']['contentUrl']
+            for v in files_response.json()['values']
+            if v['kind'] == 'Transcription'
+        )
+        result_response = await self.http_client.get(content_url)
+        result_response.raise_for_status()
+        return extract_transcription_text(result_response.json())
+
+    async def close(self):
+        """Close the pooled HTTP and blob storage clients."""
+        await self.http_client.aclose()
+        if self._async_blob_service_client is not None:
+            await self._async_blob_service_client.close()
+            self._async_blob_service_client = None
+        if self._blob_service_client is not None:
+            self._blob_service_client.close()
+            self._blob_service_client = None
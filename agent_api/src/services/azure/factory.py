@@ -1,12 +1,21 @@
+from functools import lru_cache
 
+from src.config import get_settings
 from .client import AzureTranscriptionClient
 
 
+@lru_cache(maxsize=1)
 def get_transcription_service() -> AzureTranscriptionClient:
-    """Factory to create a configured instance of the transcription client."""
+    """Get the process-wide transcription client, creating it on first use."""
+    settings = get_settings()
+
     return AzureTranscriptionClient(
-        speech_key=AZURE_SPEECH_KEY,
-        speech_region=AZURE_SPEECH_REGION,
-        storage_conn_str=AZURE_STORAGE_CONNECTION_STRING,
-        container_name="audio-blob"
-    )
\ No newline at end of file
+        speech_key=settings.azure_speech_key,
+        speech_region=settings.azure_speech_region,
+        storage_conn_str=settings.azure_storage_connection_string,
+        container_name=settings.azure_storage_container,
+        speech_endpoint=settings.azure_speech_endpoint,
+        upload_block_size=settings.azure_upload_block_size,
+        upload_max_concurrency=settings.azure_upload_max_concurrency,
+        max_connections=settings.azure_max_connections,
+    )
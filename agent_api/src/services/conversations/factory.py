@@ -0,0 +1,28 @@
+from functools import lru_cache
+from typing import Optional
+
+from src.config import Settings, get_settings
+from src.services.conversations.store import ConversationStore
+from src.services.llm.factory import get_llm_router
+
+
+def make_conversation_store(settings: Optional[Settings] = None) -> ConversationStore:
+    """Factory function to create the conversation store, summarizing through the shared LLM router"""
+    if settings is None:
+        settings = get_settings()
+
+    return ConversationStore(
+        llm_router=get_llm_router(),
+        history_token_budget=settings.conversation_history_token_budget,
+        summary_token_budget=settings.conversation_summary_token_budget,
+        summary_timeout=settings.conversation_summary_timeout,
+        max_pending_turns=settings.conversation_max_pending_turns,
+        idle_ttl=settings.conversation_idle_ttl,
+        max_sessions=settings.conversation_max_sessions,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_conversation_store() -> ConversationStore:
+    """Get the process-wide conversation store shared by the ask routes"""
+    return make_conversation_store()
@@ -0,0 +1,180 @@
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from src.services.embeddings.jina_client import estimate_tokens
+from src.services.llm.router import LLMRouter
+from src.services.prompts.templates import CONVERSATION_SUMMARY
+
+
+@dataclass(eq=False)
+class Turn:
+    question: str
+    answer: str
+    tokens: int
+
+
+@dataclass(eq=False)
+class Conversation:
+    """Chat history of one session about one event.
+
+    ``turns`` is the window of recent turns sent verbatim; turns pushed out of
+    it wait in ``pending`` until they are folded into ``summary``.
+    """
+
+    session_id: str
+    event_id: Optional[str]
+    summary: str = ""
+    turns: Deque[Turn] = field(default_factory=deque)
+    pending: List[Turn] = field(default_factory=list)
+    window_tokens: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    compaction: Optional[asyncio.Task] = None
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.turns or self.pending or self.summary)
+
+    def history(self) -> List[Dict[str, str]]:
+        """The summary and the recent turns as chat messages."""
+        messages = [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}] if self.summary else []
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn.question})
+            messages.append({"role": "assistant", "content": turn.answer})
+        return messages
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    """``text`` cut to about ``max_tokens`` tokens, with an ellipsis where it was cut."""
+    max_chars = max(max_tokens, 1) * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
+
+
+def _format_turns(turns: List[Turn]) -> str:
+    return "\n".join(f"USER: {turn.question}\nASSISTANT: {turn.answer}" for turn in turns)
+
+
+class ConversationStore:
+    """In-process conversations keyed by session id, with bounded history.
+
+    Each recorded turn goes into a rolling window of at most
+    ``history_token_budget`` tokens; a turn larger than the whole window is
+    clipped to fit it first, the question to at most half of it. Turns that fall out of the window are
+    summarized by the LLM in a background task, and the summary is capped at
+    ``summary_token_budget`` tokens, so the history sent with a question stays
+    the same size however long the chat runs. If summarizing keeps failing, only
+    the latest ``max_pending_turns`` waiting turns are kept.
+
+    Sessions idle for ``idle_ttl`` seconds, and the least recently used beyond
+    ``max_sessions``, are dropped. A session asked about a different event
+    starts over.
+    """
+
+    def __init__(
+            self,
+            llm_router: LLMRouter,
+            history_token_budget: int = 1000,
+            summary_token_budget: int = 250,
+            summary_timeout: float = 60.0,
+            max_pending_turns: int = 20,
+            idle_ttl: float = 1800.0,
+            max_sessions: int = 1000,
+    ):
+        self.llm_router = llm_router
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.summary_timeout = summary_timeout
+        self.max_pending_turns = max_pending_turns
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.evicted = 0
+
+    def get(self, session_id: str, event_id: Optional[Any] = None) -> Conversation:
+        """The session's conversation, started fresh if it is new, expired or about another event."""
+        event_id = str(event_id) if event_id else None
+        now = time.monotonic()
+        conversation = self._sessions.get(session_id)
+        if conversation is not None and (
+                conversation.event_id != event_id or now - conversation.last_used >= self.idle_ttl
+        ):
+            self._drop(session_id)
+            conversation = None
+        if conversation is None:
+            conversation = Conversation(session_id=session_id, event_id=event_id)
+            self._sessions[session_id] = conversation
+
+        conversation.last_used = now
+        self._sessions.move_to_end(session_id)
+        self._evict(now)
+        return conversation
+
+    def record(self, conversation: Conversation, question: str, answer: str) -> None:
+        """Append a finished turn and move whatever no longer fits the window out for summarizing."""
+        question = _clip(question, self.history_token_budget // 2 - 1)
+        answer = _clip(answer, self.history_token_budget - estimate_tokens(question) - 1)
+        turn = Turn(question=question, answer=answer, tokens=estimate_tokens(question) + estimate_tokens(answer))
+        conversation.turns.append(turn)
+        conversation.window_tokens += turn.tokens
+        while conversation.window_tokens > self.history_token_budget:
+            old = conversation.turns.popleft()
+            conversation.window_tokens -= old.tokens
+            conversation.pending.append(old)
+        del conversation.pending[:-self.max_pending_turns]
+
+        if conversation.pending and (conversation.compaction is None or conversation.compaction.done()):
+            conversation.compaction = asyncio.create_task(self._compact(conversation))
+
+    async def _compact(self, conversation: Conversation) -> None:
+        while conversation.pending:
+            turns = list(conversation.pending)
+            prompt = CONVERSATION_SUMMARY.render(summary=conversation.summary or "None yet.", turns=_format_turns(turns))
+            try:
+                async with asyncio.timeout(self.summary_timeout):
+                    response = await self.llm_router.generate(prompt)
+            except Exception as e:
+                # The turns stay pending and are retried after the next recorded turn.
+                logger.warning(f"Summarizing conversation {conversation.session_id} failed: {e!r}")
+                return
+
+            conversation.summary = response.text.strip()[:self.summary_token_budget * 4]
+            conversation.pending = [turn for turn in conversation.pending if turn not in turns]
+            logger.debug(f"Summarized {len(turns)} turns of conversation {conversation.session_id}")
+
+    def _drop(self, session_id: str) -> None:
+        conversation = self._sessions.pop(session_id)
+        if conversation.compaction is not None:
+            conversation.compaction.cancel()
+
+    def _evict(self, now: float) -> None:
+        # Sessions are kept in order of last use, so idle ones are at the front.
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - oldest.last_used < self.idle_ttl:
+                break
+            self._drop(session_id)
+            self.evicted += 1
+
+    async def close(self) -> None:
+        """Cancel any summaries still being generated."""
+        tasks = [c.compaction for c in self._sessions.values() if c.compaction is not None and not c.compaction.done()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._sessions.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "evicted": self.evicted,
+            "summarizing": sum(1 for c in self._sessions.values() if c.compaction is not None and not c.compaction.done()),
+        }
@@ -0,0 +1,125 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.database import get_async_db_session
+from src.models.embeddings import EmbeddingCacheEntry
+
+
+def make_cache_key(model: str, task: str, dimensions: int, text: str) -> str:
+    """Content address of an embedding: sha256 over everything that affects the vector."""
+    digest = hashlib.sha256()
+    for part in (model, task, str(dimensions), text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class PostgresEmbeddingStore:
+    """Persistent cache tier backed by the ``embedding_cache`` table.
+
+    Lookups and writes are split into statements of at most ``batch_size`` rows
+    so they stay under asyncpg's limit of 32767 bind parameters (one per key in
+    a lookup, five per row in a write).
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    async def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        async with get_async_db_session() as session:
+            for start in range(0, len(keys), self.batch_size):
+                batch = keys[start:start + self.batch_size]
+                stmt = select(EmbeddingCacheEntry.key, EmbeddingCacheEntry.embedding).where(EmbeddingCacheEntry.key.in_(batch))
+                for row in (await session.execute(stmt)).all():
+                    found[row.key] = row.embedding.tolist()
+        return found
+
+    async def set_many(self, entries: List[Tuple[str, str, str, int, List[float]]]) -> None:
+        async with get_async_db_session() as session:
+            for start in range(0, len(entries), self.batch_size):
+                stmt = insert(EmbeddingCacheEntry).values([
+                    {"key": key, "model": model, "task": task, "dimensions": dimensions, "embedding": embedding}
+                    for key, model, task, dimensions, embedding in entries[start:start + self.batch_size]
+                ]).on_conflict_do_nothing(index_elements=["key"])
+                await session.execute(stmt)
+            await session.commit()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: a bounded in-process LRU in front of an optional persistent store.
+
+    The LRU keeps vectors as ``array('f')`` (4 bytes per dimension instead of a
+    boxed float per dimension) and hands out lists.
+    """
+
+    def __init__(self, max_size: int = 10_000, store: Optional[PostgresEmbeddingStore] = None):
+        self.max_size = max_size
+        self.store = store
+        self._lru: "OrderedDict[str, array]" = OrderedDict()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        self._lru[key] = array("f", embedding)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the cached embeddings for ``keys``; missing keys are left out."""
+        found: Dict[str, List[float]] = {}
+        remaining = []
+        for key in dict.fromkeys(keys):
+            embedding = self._lru.get(key)
+            if embedding is not None:
+                self._lru.move_to_end(key)
+                found[key] = embedding.tolist()
+                self.memory_hits += 1
+            else:
+                remaining.append(key)
+
+        if remaining and self.store is not None:
+            try:
+                stored = await self.store.get_many(remaining)
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache lookup failed: {e}")
+                stored = {}
+            for key, embedding in stored.items():
+                self._remember(key, embedding)
+                found[key] = embedding
+            self.persistent_hits += len(stored)
+            remaining = [key for key in remaining if key not in stored]
+
+        self.misses += len(remaining)
+        return found
+
+    async def set_many(self, entries: List[Tuple[str, str, str, int, List[float]]]) -> None:
+        """Store ``(key, model, task, dimensions, embedding)`` entries in both tiers."""
+        if not entries:
+            return
+        for key, _, _, _, embedding in entries:
+            self._remember(key, embedding)
+
+        if self.store is not None:
+            try:
+                await self.store.set_many(entries)
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "size": len(self._lru),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.persistent_hits) / lookups if lookups else 0.0,
+        }
@@ -1,7 +1,9 @@
+from functools import lru_cache
 from typing import Optional
 
 from src.config import Settings,get_settings
 
+from src.services.embeddings.cache import EmbeddingCache, PostgresEmbeddingStore
 from src.services.embeddings.jina_client import JinaEmbeddingsClient
 
 def make_embeddings_client(settings: Optional[Settings] = None)-> JinaEmbeddingsClient:
@@ -11,4 +13,22 @@ def make_embeddings_client(settings: Optional[Settings] = None)-> JinaEmbeddings
 
     api_key = settings.jina_api_key
 
-    return JinaEmbeddingsClient(api_key=api_key)
\ No newline at end of file
+    cache = EmbeddingCache(
+        max_size=settings.embedding_cache_size,
+        store=PostgresEmbeddingStore() if settings.embedding_cache_persistent else None,
+    )
+
+    return JinaEmbeddingsClient(
+        api_key=api_key,
+        dimensions=settings.embedding_dimensions,
+        max_concurrency=settings.jina_max_concurrency,
+        max_batch_tokens=settings.jina_max_batch_tokens,
+        max_retries=settings.jina_max_retries,
+        cache=cache,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embeddings_client() -> JinaEmbeddingsClient:
+    """Get the process-wide embeddings client so its cache and connection pool are shared"""
+    return make_embeddings_client()
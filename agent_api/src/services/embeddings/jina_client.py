@@ -1,65 +1,165 @@
-from typing import List
+import asyncio
+import random
+from typing import List, Optional, Tuple
 from loguru import logger
 import httpx
 
 from src.schemas.embeddings.jina import JinaEmbeddingRequest,JinaEmbeddingResponse
+from src.services.embeddings.cache import EmbeddingCache, make_cache_key
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for batch packing."""
+    return len(text) // 4 + 1
+
 
 class JinaEmbeddingsClient:
-    def __init__(self,api_key:str,base_url:str = "https://api.jina.ai/v1"):
+    def __init__(
+            self,
+            api_key:str,
+            base_url:str = "https://api.jina.ai/v1",
+            dimensions: int = 1024,
+            max_concurrency: int = 4,
+            max_batch_tokens: int = 32_000,
+            max_retries: int = 5,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0,
+            cache: Optional[EmbeddingCache] = None,
+    ):
         self.api_key = api_key
         self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.model = "jina-embeddings-v3"
+        self.dimensions = dimensions
+        self.cache = cache
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         self.client = httpx.AsyncClient(timeout=30.0)
         logger.info("Jina Embeddings Client is initialized")
 
-    async def embed_passage(self,texts: List[str],batch_size: int = 600)->List[List[float]]:
-        """
-        Embed the passage using jina embeddings
-        :params texts: List of text passage to embed
-        :params batch_size: Number of texts to process for each API Call.
-        :returns: List of Embedding vectors
-        """
+    def _make_batches(self, texts: List[str], batch_size: int) -> List[Tuple[int, List[str]]]:
+        """Pack texts into batches bounded by both item count and estimated tokens.
 
-        embeddings = []
+        Returns ``(offset, batch)`` pairs so results can be written back in input order.
+        """
+        batches = []
+        start = 0
+        batch: List[str] = []
+        batch_tokens = 0
+
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append((start, batch))
+                start, batch, batch_tokens = i, [], 0
+            batch.append(text)
+            batch_tokens += tokens
+
+        if batch:
+            batches.append((start, batch))
+        return batches
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.replace(".", "", 1).isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter: spread retries of concurrent batches apart.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _post_embeddings(self, request_data: JinaEmbeddingRequest) -> JinaEmbeddingResponse:
+        """POST an embeddings request, retrying throttled and 5xx responses with jittered backoff."""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    response = await self.client.post(
+                        f"{self.base_url}/embeddings",
+                        headers = self.headers,
+                        json = request_data.model_dump()
+                    )
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return JinaEmbeddingResponse(**response.json())
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Embeddings request transport error: {e}")
+
+            delay = self._retry_delay(attempt, response)
+            logger.warning(
+                f"Embeddings request retry {attempt + 1}/{self.max_retries} in {delay:.2f}s "
+                f"(status={response.status_code if response is not None else 'n/a'})"
+            )
+            await asyncio.sleep(delay)
 
-        for i in range(0,len(texts),batch_size):
-            batch = texts[i:i+batch_size]
+    async def _embed_uncached(self, texts: List[str], task: str, batch_size: int) -> List[List[float]]:
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
 
+        async def embed_batch(offset: int, batch: List[str]):
             request_data = JinaEmbeddingRequest(
-                model = "jina-embeddings-v3",
-                task="retrieval.passage",
-                dimensions= 1024,
+                model = self.model,
+                task = task,
+                dimensions= self.dimensions,
                 input = batch
             )
+            result = await self._post_embeddings(request_data)
+            for item_index, item in enumerate(result.data):
+                embeddings[offset + item.get("index", item_index)] = item["embedding"]
+            logger.debug(f"Embedding batch of {len(batch)} passages")
+
+        await asyncio.gather(*(
+            embed_batch(offset, batch) for offset, batch in self._make_batches(texts, batch_size)
+        ))
+        return embeddings
 
-            try:
-                response = await self.client.post(
-                    f"{self.base_url}/embeddings",
-                    headers = self.headers,
-                    json = request_data.model_dump()
-                )
-
-                response.raise_for_status()
-                print(response)
-
-
-                result = JinaEmbeddingResponse(**response.json())
-                print(result)
-                batch_embeddings = [item["embedding"] for item in result.data]
-                embeddings.extend(batch_embeddings)
-
-                logger.debug(f"Embedding batch of {len(batch)} passages")
-            except httpx.HTTPError as e:
-                logger.error(f"Error Embedding passages: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error in embed_passages: {e}")
-                raise
-
-        logger.info(f"Successfullt embedded {len(texts)} passages")
+    async def _embed(self, texts: List[str], task: str, batch_size: int) -> List[List[float]]:
+        """Embed texts, serving repeats from the cache and only sending unseen texts upstream."""
+        if self.cache is None:
+            return await self._embed_uncached(texts, task, batch_size)
+
+        keys = [make_cache_key(self.model, task, self.dimensions, text) for text in texts]
+        cached = await self.cache.get_many(keys)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            fresh = await self._embed_uncached(list(missing.values()), task, batch_size)
+            entries = [
+                (key, self.model, task, self.dimensions, embedding)
+                for key, embedding in zip(missing.keys(), fresh)
+            ]
+            await self.cache.set_many(entries)
+            cached.update({key: embedding for key, _, _, _, embedding in entries})
+
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        return [cached[key] for key in keys]
+
+    async def embed_passage(self,texts: List[str],batch_size: int = 600)->List[List[float]]:
+        """
+        Embed the passage using jina embeddings
+        :params texts: List of text passage to embed
+        :params batch_size: Maximum number of texts to send in each API Call.
+        :returns: List of Embedding vectors, in the same order as ``texts``
+        """
+
+        try:
+            embeddings = await self._embed(texts, "retrieval.passage", batch_size)
+        except httpx.HTTPError as e:
+            logger.error(f"Error Embedding passages: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in embed_passages: {e}")
+            raise
+
+        logger.info(f"Successfully embedded {len(texts)} passages")
         return embeddings
     
     async def embed_query(self,query:str)-> List[float]:
@@ -70,19 +170,8 @@ class JinaEmbeddingsClient:
         :returns Embedding vector of the query
         """
 
-        request_data = JinaEmbeddingRequest(
-            model = "jina-embeddings-v3",
-            task = "retrieval.query",
-            dimensions= 1024,
-            input = [query]
-        )
-
         try:
-            response = await self.client.post(f"{self.base_url}/embeddings",headers = self.headers,json = request_data.model_dump())
-            response.raise_for_status()
-
-            result = JinaEmbeddingResponse(**response.json())
-            embedding = result.data[0]["embedding"]
+            embedding = (await self._embed([query], "retrieval.query", 1))[0]
 
             logger.debug(f"Embedded query: {query[:50]}")
             return embedding
@@ -96,13 +185,12 @@ class JinaEmbeddingsClient:
 
     async def close(self):
         """Close the HTTP Client"""
-        await self.client.sclose()
+        await self.client.aclose()
 
     async def __aenter__(self):
         """Async Context Manager entry"""
         return self
     
-    async def __aexit__(self):
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         await self.close()
-
@@ -1,42 +1,45 @@
+import httpx
 from groq import AsyncGroq
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Dict, List, Optional, Sequence
 
 
 class GroqClient:
-    def __init__(self, api_key: Optional[str] = None):
-        self.client = AsyncGroq(api_key=api_key)
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
+        self.client = AsyncGroq(api_key=api_key, http_client=http_client)
 
     async def health_check(self) -> dict:
         """
         Groq does not provide a native health endpoint.
-        Perform a minimal request to verify connectivity.
+        Listing models verifies connectivity and the API key without a billable completion.
+        Raises on failure.
         """
-        try:
-            await self.client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                messages=[{"role": "user", "content": "ping"}],
-                max_tokens=1,
-            )
-            return {"status": "ok"}
-        except Exception as e:
-            return {"status": "error", "detail": str(e)}
+        models = await self.client.models.list()
+        return {"status": "ok", "models": len(models.data)}
+
+    @staticmethod
+    def _messages(
+        prompt: str,
+        system: Optional[str],
+        history: Sequence[Dict[str, str]] = (),
+    ) -> List[Dict[str, str]]:
+        """The system prompt goes in its own leading message so the provider can cache it as a prefix."""
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.extend(history)
+        messages.append({"role": "user", "content": prompt})
+        return messages
 
     async def generate_text(
         self,
         model: str,
         prompt: str,
+        system: Optional[str] = None,
     ) -> str:
         """
         Non-streaming text generation.
         """
         response = await self.client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
+            messages=self._messages(prompt, system),
             stream=False,
         )
 
@@ -46,6 +49,8 @@ class GroqClient:
         self,
         model: str,
         prompt: str,
+        system: Optional[str] = None,
+        history: Sequence[Dict[str, str]] = (),
     ) -> AsyncGenerator[str, None]:
         """
         Streaming text generation.
@@ -53,16 +58,19 @@ class GroqClient:
         """
         stream = await self.client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
+            messages=self._messages(prompt, system, history),
             stream=True,
         )
 
-        async for chunk in stream:
-            content = chunk.choices[0].delta.content
-            if content:
-                yield content
+        try:
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            # Closing the response aborts the completion upstream when the caller stops early.
+            await stream.close()
+
+    async def close(self):
+        """Close the underlying HTTP connection pool."""
+        await self.client.close()
@@ -1,5 +1,15 @@
+from functools import lru_cache
+
+import httpx
+
+from src.config import get_settings
 from src.services.groq.client import GroqClient
+from src.services.http_pool import make_async_http_client
 
 
+@lru_cache(maxsize=1)
 def get_groq_client() -> GroqClient:
-    return GroqClient()
+    """Get the process-wide Groq client so its connection pool is shared"""
+    settings = get_settings()
+    timeout = httpx.Timeout(settings.groq_timeout, connect=settings.groq_connect_timeout)
+    return GroqClient(http_client=make_async_http_client(settings, timeout=timeout))
@@ -0,0 +1,36 @@
+import importlib.util
+from typing import Optional, Union
+
+import httpx
+from loguru import logger
+
+from src.config import Settings, get_settings
+
+
+def make_async_http_client(
+        settings: Optional[Settings] = None,
+        timeout: Union[float, httpx.Timeout, None] = None,
+        base_url: str = "",
+) -> httpx.AsyncClient:
+    """Pooled keep-alive client for the LLM services, sized from the settings.
+
+    HTTP/2 is negotiated over TLS when ``llm_http2`` is set and the ``h2``
+    package is installed; plain-http hosts such as a local Ollama stay on HTTP/1.1.
+    """
+    if settings is None:
+        settings = get_settings()
+
+    http2 = settings.llm_http2 and importlib.util.find_spec("h2") is not None
+    if settings.llm_http2 and not http2:
+        logger.warning("llm_http2 is enabled but the h2 package is not installed, using HTTP/1.1")
+
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        ),
+    )
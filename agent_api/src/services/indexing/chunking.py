@@ -1,4 +1,6 @@
-import re
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate
 from typing import List, Union
 from uuid import UUID
 
@@ -22,6 +24,44 @@ class TextChunk(BaseModel):
     metadata: ChunkMetadata 
 
 
+@dataclass(slots=True)
+class ChunkRecord:
+    """A chunk as produced by the chunker: plain fields, validated only when read as models.
+
+    ``metadata`` builds (and validates) the :class:`ChunkMetadata` on access and
+    :meth:`to_text_chunk` the full :class:`TextChunk`, so chunking a long
+    transcript allocates no Pydantic models.
+    """
+
+    event_id: Union[str, UUID]
+    text: str
+    raw_content: str
+    chunk_index: int
+    word_count: int
+    event_name: str
+    chief_guest: str
+    event_organizer: str
+    event_venue: str
+    overlap_prev: int
+    overlap_next: int
+
+    @property
+    def metadata(self) -> ChunkMetadata:
+        return ChunkMetadata(
+            chunk_index=self.chunk_index,
+            word_count=self.word_count,
+            event_name=self.event_name,
+            chief_guest=self.chief_guest,
+            event_organizer=self.event_organizer,
+            event_venue=self.event_venue,
+            overlap_prev=self.overlap_prev,
+            overlap_next=self.overlap_next,
+        )
+
+    def to_text_chunk(self) -> TextChunk:
+        return TextChunk(event_id=self.event_id, text=self.text, raw_content=self.raw_content, metadata=self.metadata)
+
+
 class EventTextChunker:
     """Service for chunking Event transcriptions into searchable segments."""
 
@@ -33,8 +73,18 @@ class EventTextChunker:
         if overlap_size >= chunk_size:
             raise ValueError("Overlap size must be less than chunk size")
 
-    def _split_into_words(self, text: str) -> List[str]:
-        return re.findall(r"\S+", text)
+    @staticmethod
+    def _normalize(text: str):
+        """Join the words with single spaces and record where each one starts.
+
+        Returns the normalized text and an array of ``n + 1`` word start offsets,
+        the last one just past the end of the text, so words ``i`` to ``j`` are
+        ``normalized[starts[i]:starts[j] - 1]``.
+        """
+        words = text.split()
+        starts = array("I", [0])
+        starts.extend(accumulate(len(word) + 1 for word in words))
+        return " ".join(words), starts
     
     def _create_context_header(self,name: str, guest: str, venue:str)-> str:
         """Creates a string of metadata to prepend to the chunk"""
@@ -48,10 +98,13 @@ class EventTextChunker:
             event_chief_guest: str,
             event_venue: str,
             transcription :str
-        ) -> List[TextChunk]:
+        ) -> List[ChunkRecord]:
         """
-        Processes an Event database record into a list of TextChunks.
+        Processes an Event database record into a list of ChunkRecords.
         Injects event-specific context (Guest, Venue, Organizer) into every chunk.
+
+        Word boundaries are found once; each chunk is then a single slice of the
+        whitespace-normalized transcript.
         """
         text = transcription
         if not text or not text.strip():
@@ -59,58 +112,48 @@ class EventTextChunker:
             return []
 
 
-        words = self._split_into_words(text)
+        normalized, starts = self._normalize(text)
+        word_total = len(starts) - 1
         context_header = self._create_context_header(event_name,event_chief_guest,event_venue)
         
-        if len(words) < self.min_chunk_size:
-            full_text =  " ".join(words)
-            return [TextChunk(
-                text=f"{context_header}{full_text}",
+        if word_total < self.min_chunk_size:
+            return [ChunkRecord(
                 event_id=event_id,
-                raw_content = full_text,
-                metadata=ChunkMetadata(
-                    chunk_index=0,
-                    word_count=len(words),
-                    event_name=event_name,
-                    chief_guest = event_chief_guest,
-                    event_organizer = event_organizer,
-                    event_venue = event_venue,
-                    overlap_prev=0,
-                    overlap_next=0
-                )
+                text=f"{context_header}{normalized}",
+                raw_content=normalized,
+                chunk_index=0,
+                word_count=word_total,
+                event_name=event_name,
+                chief_guest=event_chief_guest,
+                event_organizer=event_organizer,
+                event_venue=event_venue,
+                overlap_prev=0,
+                overlap_next=0,
             )]
 
         chunks = []
-        chunk_index = 0
-        current_pos = 0
+        prefix = f"{context_header} "
+        stride = self.chunk_size - self.overlap_size
 
-        while current_pos < len(words):
-            start = current_pos
-            end = min(current_pos + self.chunk_size, len(words))
-            
-            segment_text = " ".join(words[start:end])
+        for chunk_index, start in enumerate(range(0, word_total, stride)):
+            end = min(start + self.chunk_size, word_total)
+            segment_text = normalized[starts[start]:starts[end] - 1]
 
-            chunk = TextChunk(
+            chunks.append(ChunkRecord(
                 event_id=event_id,
-                text=f"{context_header} {segment_text}",
-                raw_content= segment_text,
-                metadata=ChunkMetadata(
-                    chunk_index=chunk_index,
-                    word_count=len(words[start:end]),
-                    event_name=event_name,
-                    chief_guest = event_chief_guest,
-                    event_organizer = event_organizer,
-                    event_venue = event_venue,
-                    overlap_prev=self.overlap_size if start > 0 else 0,
-                    overlap_next=self.overlap_size if end < len(words) else 0
-                )
-            )
-            chunks.append(chunk)
-
-            current_pos += (self.chunk_size - self.overlap_size)
-            chunk_index += 1
-            
-            if end >= len(words):
+                text=prefix + segment_text,
+                raw_content=segment_text,
+                chunk_index=chunk_index,
+                word_count=end - start,
+                event_name=event_name,
+                chief_guest=event_chief_guest,
+                event_organizer=event_organizer,
+                event_venue=event_venue,
+                overlap_prev=self.overlap_size if start > 0 else 0,
+                overlap_next=self.overlap_size if end < word_total else 0,
+            ))
+
+            if end >= word_total:
                 break
 
         return chunks
@@ -1,101 +1,396 @@
+import asyncio
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from loguru import logger
-from typing import Dict,List
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
+from src.services.embeddings.factory import get_embeddings_client
 from src.services.embeddings.jina_client import JinaEmbeddingsClient
-from src.services.indexing.chunking import EventTextChunker
-from src.database import get_db_session
-from sqlalchemy.orm import Session
+from src.services.indexing.chunking import ChunkRecord, EventTextChunker
+from src.services.rag.factory import get_answer_cache
+from src.database import get_async_db_session
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.events import Event, EventChunk
+from src.models.indexing import IndexingCheckpoint
+
+
+def chunk_content_hash(text: str) -> str:
+    """Hash of the exact text that gets embedded for a chunk."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Event columns that end up in the indexed chunk text; changing any other column needs no re-index.
+INDEXED_EVENT_FIELDS = frozenset({"event_name", "organizer", "chief_guest_name", "venue", "transcription"})
+
+
+def event_to_index_data(event: Event) -> Dict:
+    """Build the ``event_data`` dict expected by ``HybridIndexingService.index_events``."""
+    return {
+        "event_id": str(event.id),
+        "event_name": event.event_name,
+        "event_organizer": event.organizer,
+        "chief_guest": event.chief_guest_name,
+        "venue": event.venue or "",
+        "transcription": event.transcription or "",
+    }
+
+
+def chunk_event_data(chunker: EventTextChunker, event_data: Dict) -> List[ChunkRecord]:
+    """Chunk one ``event_data`` dict; module level so it can run in a worker process."""
+    return chunker.chunk_event(
+        event_name=event_data.get("event_name", ""),
+        event_id=event_data.get("event_id"),
+        event_organizer=event_data.get("event_organizer", ""),
+        event_chief_guest=event_data.get("chief_guest", ""),
+        event_venue=event_data.get("venue", ""),
+        transcription=event_data.get("transcription", "")
+    )
+
+
+def _invalidate_answers(plans: List["ChunkPlan"]) -> None:
+    """Drop cached answers built from events whose chunks just changed."""
+    answer_cache = get_answer_cache()
+    if answer_cache is None:
+        return
+    for plan in plans:
+        if plan.new_chunks or plan.stale_ids:
+            answer_cache.invalidate(plan.event_id)
+
+
+def event_lock_key(event_id: UUID) -> int:
+    """Advisory lock key of an event: the first 8 bytes of its id as a signed bigint."""
+    return int.from_bytes(event_id.bytes[:8], "big", signed=True)
+
+
+async def lock_events_for_indexing(session: AsyncSession, event_ids: List[UUID]) -> None:
+    """Serialize indexing of the same event across tasks and workers.
+
+    Takes a transaction-scoped advisory lock per event, in id order so packs of
+    events cannot deadlock; the locks are released on commit or rollback. Unlike
+    locking the event row, this does not hold up updates to the event itself.
+    """
+    for event_id in sorted(set(event_ids)):
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": event_lock_key(event_id)})
+
+
+def _empty_stats(errors: int = 0) -> Dict[str,int]:
+    return {
+        "chunks_created": 0,
+        "chunks_indexed": 0,
+        "chunks_unchanged": 0,
+        "chunks_deleted": 0,
+        "embeddings_generated": 0,
+        "errors": errors
+    }
+
+
+@dataclass
+class ChunkPlan:
+    """What has to change in ``event_chunk`` to bring one event up to date."""
+
+    event_id: UUID
+    chunks_created: int = 0
+    new_chunks: List[Tuple[ChunkRecord, str, Dict]] = field(default_factory=list)
+    metadata_updates: List[Dict] = field(default_factory=list)
+    stale_ids: List[UUID] = field(default_factory=list)
+    unchanged: int = 0
+
 
-from src.models.events import EventChunk
 class HybridIndexingService:
     """Service for indexing event details with chuning and embeddings for hybrid search"""
 
-    def __init__(self,chunker: EventTextChunker,embeddings_client: JinaEmbeddingsClient,session: Session):
+    def __init__(self,chunker: EventTextChunker,embeddings_client: JinaEmbeddingsClient,session: AsyncSession):
         """Initialize Hybrid Indexing Service
-        
+
         :param chunker: Text Chunking Service
         :param embeddings_client: Embeddings Client for embedding the event
+        :param session: Async database session the chunks are written with
         """
         self.chunker = chunker
         self.embedding_service = embeddings_client
         self.session = session
         logger.info("Indexing service is initialized")
 
+    async def _bulk_insert_chunks(self, rows: List[Dict]) -> None:
+        """Write chunk rows with one executemany instead of one ORM object per row.
+
+        SQLAlchemy batches the executemany into multi-row INSERT ... VALUES
+        statements (insertmanyvalues), so 10k chunks cost a handful of round trips.
+        """
+        if rows:
+            await self.session.execute(insert(EventChunk), rows)
+
+    async def _plan(self, chunks_by_event: Dict[UUID, List[ChunkRecord]]) -> List[ChunkPlan]:
+        """Diff new chunks against the stored ones by content hash, for several events at once."""
+        existing_rows = (await self.session.execute(
+            select(EventChunk.id, EventChunk.event_id, EventChunk.content_hash, EventChunk.chunk_metadata)
+            .where(EventChunk.event_id.in_(list(chunks_by_event)))
+        )).all()
+
+        existing: Dict[UUID, Dict[str, List]] = defaultdict(lambda: defaultdict(list))
+        for row in existing_rows:
+            existing[row.event_id][row.content_hash].append(row)
+
+        plans = []
+        for event_id, chunks in chunks_by_event.items():
+            existing_by_hash = existing[event_id]
+            plan = ChunkPlan(event_id=event_id, chunks_created=len(chunks))
+            for chunk in chunks:
+                content_hash = chunk_content_hash(chunk.text)
+                metadata = chunk.metadata.model_dump()
+                if existing_by_hash.get(content_hash):
+                    row = existing_by_hash[content_hash].pop()
+                    plan.unchanged += 1
+                    if row.chunk_metadata != metadata:
+                        plan.metadata_updates.append({"id": row.id, "chunk_metadata": metadata})
+                else:
+                    plan.new_chunks.append((chunk, content_hash, metadata))
+
+            plan.stale_ids = [row.id for rows in existing_by_hash.values() for row in rows]
+            plans.append(plan)
+        return plans
+
+    async def _embed_plans(self, plans: List[ChunkPlan]) -> List[List[float]]:
+        """Embed the new chunks of all plans together so batches are packed across events."""
+        texts = [chunk.text for plan in plans for chunk, _, _ in plan.new_chunks]
+        if not texts:
+            return []
+
+        embeddings = await self.embedding_service.embed_passage(texts = texts, batch_size= 50)
+        if len(embeddings)!=len(texts):
+            raise ValueError(f"Embeddings Count Mismatch : {len(embeddings)} != {len(texts)}")
+        return embeddings
+
+    async def _apply(self, plans: List[ChunkPlan], embeddings: List[List[float]]) -> None:
+        """Stage deletes, metadata updates and inserts for the plans; the caller commits."""
+        stale_ids = [chunk_id for plan in plans for chunk_id in plan.stale_ids]
+        if stale_ids:
+            await self.session.execute(delete(EventChunk).where(EventChunk.id.in_(stale_ids)))
+
+        metadata_updates = [item for plan in plans for item in plan.metadata_updates]
+        if metadata_updates:
+            await self.session.execute(update(EventChunk), metadata_updates)
+
+        new_chunks = [(plan.event_id, *new_chunk) for plan in plans for new_chunk in plan.new_chunks]
+        rows = [
+            {
+                "event_id": event_id,
+                "search_text": chunk.text,
+                "raw_text": chunk.raw_content,
+                "content_hash": content_hash,
+                "embedding": embedding,
+                "chunk_metadata": metadata,
+            }
+            for (event_id, chunk, content_hash, metadata), embedding in zip(new_chunks, embeddings)
+        ]
+        await self._bulk_insert_chunks(rows)
+
     async def index_events(self,event_data:Dict)->Dict[str,int]:
-        """Index a single events with indexing and embeddings"""
+        """Index a single event incrementally.
+
+        The new chunks are diffed against the stored ones by content hash: unchanged
+        chunks are kept (only their metadata is refreshed), new chunks are embedded
+        and inserted, and chunks that no longer exist are deleted.
+        """
         event_id_str = event_data.get("event_id")
         if not event_id_str:
             logger.error("Missing Event ID")
-            return {
-                "chunks_created":0,
-                "chunks_indexed":0,
-                "embeddings_generated": 0,
-                "errors":1
-            }
+            return _empty_stats(errors=1)
 
         try:
-            chunks = self.chunker.chunk_event(
-                event_name=event_data.get("event_name", ""),
-                event_id=event_id_str,
-                event_organizer=event_data.get("event_organizer", ""),
-                event_chief_guest=event_data.get("chief_guest", ""),
-                event_venue=event_data.get("venue", ""),
-                transcription=event_data.get("transcription", "")
-            )
-
+            chunks = chunk_event_data(self.chunker, event_data)
             if not chunks:
                 logger.warning(f"No chunks created for event :{event_data.get("event_name")}")
-                return {
-                    "chunks_created": 0,
-                    "chunks_indexed": 0,
-                    "embeddings_generated": 0,
-                    "errors":0
-                }
-            
-            logger.info(f"Created {len(chunks)} chunks for event {event_data.get("event_name")}")
-
-            chunk_texts = [chunk.text for chunk in chunks]
-            embeddings = await self.embedding_service.embed_passage(
-                texts = chunk_texts,
-                batch_size= 50
+
+            event_id = UUID(str(event_id_str))
+            # Plan against the stored chunks only once no other index of this event can change them.
+            await lock_events_for_indexing(self.session, [event_id])
+            [plan] = await self._plan({event_id: chunks})
+            logger.info(
+                f"Created {len(chunks)} chunks for event {event_data.get("event_name")}: "
+                f"{len(plan.new_chunks)} new, {plan.unchanged} unchanged, {len(plan.stale_ids)} stale"
             )
 
-            if len(embeddings)!=len(chunks):
-                logger.error(f"Embeddings Count Mismatch : {len(embeddings)} != {len(chunks)}")
-                return {
-                    "chunks_created": len(chunks),
-                    "chunks_indexed": 0,
-                    "embeddings_generated": len(embeddings),
-                    "errors": 1
-                }
-            
-            for chunk, embedding in zip(chunks, embeddings):
-                
-                db_chunk = EventChunk(
-                    event_id=UUID(str(event_id_str)), 
-                    search_text=chunk.text,  
-                    raw_text=chunk.raw_content,
-                    embedding=embedding,                    
-                    chunk_metadata=chunk.metadata.model_dump() 
-                )
-                self.session.add(db_chunk)
-
-            self.session.commit()
-            
+            embeddings = await self._embed_plans([plan])
+            await self._apply([plan], embeddings)
+            await self.session.commit()
+            _invalidate_answers([plan])
+
             return {
                 "chunks_created": len(chunks),
-                "chunks_indexed": len(chunks),
+                "chunks_indexed": len(plan.new_chunks),
+                "chunks_unchanged": plan.unchanged,
+                "chunks_deleted": len(plan.stale_ids),
                 "embeddings_generated": len(embeddings),
                 "errors": 0
             }
 
         except Exception as e:
-            self.session.rollback() 
+            await self.session.rollback()
             logger.error(f"Error Indexing event {event_data.get('event_name', '')} (ID: {event_id_str}): {str(e)}")
-            return {
-                "chunks_created": 0,
-                "chunks_indexed": 0,
-                "embeddings_generated": 0,
-                "errors": 1
-            }
\ No newline at end of file
+            return _empty_stats(errors=1)
+
+    async def _load_checkpoint(self, name: str) -> IndexingCheckpoint:
+        checkpoint = await self.session.get(IndexingCheckpoint, name)
+        if checkpoint is None:
+            checkpoint = IndexingCheckpoint(name=name, events_indexed=0, chunks_indexed=0)
+            self.session.add(checkpoint)
+            await self.session.commit()
+        return checkpoint
+
+    async def _write_pack(
+            self,
+            pack: List[Tuple[Dict, List[ChunkRecord]]],
+            checkpoint: IndexingCheckpoint,
+            totals: Dict[str,int],
+    ) -> None:
+        """Plan, embed and write one pack of events, advancing the checkpoint in the same transaction."""
+        chunks_by_event = {UUID(event_data["event_id"]): chunks for event_data, chunks in pack}
+        await lock_events_for_indexing(self.session, list(chunks_by_event))
+        plans = await self._plan(chunks_by_event)
+        embeddings = await self._embed_plans(plans)
+        await self._apply(plans, embeddings)
+
+        # Events are streamed in id order, so the last id of a pack marks everything before it as done.
+        checkpoint.last_event_id = UUID(pack[-1][0]["event_id"])
+        checkpoint.events_indexed += len(pack)
+        checkpoint.chunks_indexed += len(embeddings)
+        await self.session.commit()
+        _invalidate_answers(plans)
+
+        totals["events_indexed"] += len(pack)
+        totals["chunks_created"] += sum(plan.chunks_created for plan in plans)
+        totals["chunks_indexed"] += len(embeddings)
+        totals["chunks_unchanged"] += sum(plan.unchanged for plan in plans)
+        totals["chunks_deleted"] += sum(len(plan.stale_ids) for plan in plans)
+        totals["embeddings_generated"] += len(embeddings)
+
+    async def index_many(
+            self,
+            checkpoint_name: str = "backfill",
+            resume: bool = True,
+            fetch_size: int = 100,
+            pack_size: int = 500,
+            max_workers: Optional[int] = None,
+            progress_callback: Optional[Callable[[Dict[str,int]], None]] = None,
+    ) -> Dict[str,int]:
+        """Index every event with a transcription as a streaming backfill.
+
+        Events are streamed from the ``event`` table with a server-side cursor,
+        chunked in a process pool, packed so that embedding requests carry chunks
+        from many events, and bulk written. After each pack the position is saved
+        under ``checkpoint_name``; with ``resume=True`` an interrupted backfill
+        continues after the last written event.
+
+        :param fetch_size: Events fetched per round trip from the server-side cursor
+        :param pack_size: Chunks accumulated before a pack is embedded and written
+        :param max_workers: Chunking processes (``None`` lets the executor decide)
+        :param progress_callback: Called with running totals after every pack
+        """
+        checkpoint = await self._load_checkpoint(checkpoint_name)
+        if not resume:
+            checkpoint.last_event_id = None
+            checkpoint.events_indexed = 0
+            checkpoint.chunks_indexed = 0
+            await self.session.commit()
+        elif checkpoint.last_event_id is not None:
+            logger.info(f"Resuming backfill '{checkpoint_name}' after event {checkpoint.last_event_id}")
+
+        totals = {"events_indexed": 0, **_empty_stats()}
+        loop = asyncio.get_running_loop()
+        pack: List[Tuple[Dict, List[ChunkRecord]]] = []
+        pack_chunks = 0
+        write_task: Optional[asyncio.Task] = None
+
+        async def flush(current_pack):
+            await self._write_pack(current_pack, checkpoint, totals)
+            logger.info(
+                f"Backfill '{checkpoint_name}': {totals['events_indexed']} events, "
+                f"{totals['chunks_indexed']} chunks indexed"
+            )
+            if progress_callback is not None:
+                progress_callback(dict(totals))
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                async with get_async_db_session() as read_session:
+                    stmt = (
+                        select(Event)
+                        .where(Event.transcription.isnot(None))
+                        .order_by(Event.id)
+                        .execution_options(yield_per=fetch_size)
+                    )
+                    if resume and checkpoint.last_event_id is not None:
+                        stmt = stmt.where(Event.id > checkpoint.last_event_id)
+
+                    result = await read_session.stream_scalars(stmt)
+                    async for events in result.partitions():
+                        event_datas = [event_to_index_data(event) for event in events]
+                        chunk_lists = await asyncio.gather(*(
+                            loop.run_in_executor(pool, chunk_event_data, self.chunker, event_data)
+                            for event_data in event_datas
+                        ))
+
+                        for event_data, chunks in zip(event_datas, chunk_lists):
+                            pack.append((event_data, chunks))
+                            pack_chunks += len(chunks)
+
+                            if pack_chunks >= pack_size:
+                                # Keep one pack in flight so chunking overlaps with embedding.
+                                if write_task is not None:
+                                    await write_task
+                                write_task = asyncio.create_task(flush(pack))
+                                pack, pack_chunks = [], 0
+
+                if write_task is not None:
+                    await write_task
+                    write_task = None
+                if pack:
+                    await flush(pack)
+
+        except Exception as e:
+            if write_task is not None:
+                write_task.cancel()
+                await asyncio.gather(write_task, return_exceptions=True)
+            await self.session.rollback()
+            logger.error(f"Backfill '{checkpoint_name}' stopped after {totals['events_indexed']} events: {e}")
+            totals["errors"] += 1
+
+        return totals
+
+
+async def reindex_event(event_id: UUID) -> Dict[str,int]:
+    """Re-index one event from its current database row.
+
+    The row is read after taking the event's indexing lock, so of two
+    overlapping re-indexes the later one indexes the newer row.
+    """
+    async with get_async_db_session() as session:
+        await lock_events_for_indexing(session, [event_id])
+        event = await session.get(Event, event_id)
+        if event is None:
+            logger.warning(f"Skipping re-index, event {event_id} no longer exists")
+            return _empty_stats(errors=1)
+
+        service = HybridIndexingService(
+            chunker=EventTextChunker(),
+            embeddings_client=get_embeddings_client(),
+            session=session,
+        )
+        return await service.index_events(event_to_index_data(event))
+
+
+async def backfill_events(resume: bool = True) -> Dict[str,int]:
+    """Run the ``index_many`` backfill over all events."""
+    async with get_async_db_session() as session:
+        service = HybridIndexingService(
+            chunker=EventTextChunker(),
+            embeddings_client=get_embeddings_client(),
+            session=session,
+        )
+        return await service.index_many(resume=resume)
@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.services.groq.client import GroqClient
+from src.services.ollama.client import OllamClient
+from src.services.prompts.templates import Prompt
+
+
+class BaseLLMBackend(ABC):
+    """One model on one provider, behind the interface used by :class:`LLMRouter`."""
+
+    def __init__(self, name: str, model: str):
+        self.name = name
+        self.model = model
+
+    @abstractmethod
+    def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        """Yield the answer for ``prompt`` as text chunks."""
+
+
+class OllamaBackend(BaseLLMBackend):
+    """Ollama generation that keeps the model loaded between requests.
+
+    The system prompt is sent as Ollama's ``system`` field and any conversation
+    history ahead of the question, so consecutive turns share a stable prefix
+    that Ollama can reuse from the KV cache it keeps while the model stays loaded.
+    """
+
+    def __init__(self, client: OllamClient, model: str, name: str = "ollama", keep_alive: Optional[str] = None):
+        super().__init__(name, model)
+        self.client = client
+        self.keep_alive = keep_alive
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        options: Dict[str, Any] = {}
+        if prompt.system:
+            options["system"] = prompt.system
+        if self.keep_alive is not None:
+            options["keep_alive"] = self.keep_alive
+        async for chunk in self.client.stream_generate_text(model=self.model, prompt=prompt.transcript(), **options):
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done", False):
+                break
+
+
+class GroqBackend(BaseLLMBackend):
+    def __init__(self, client: GroqClient, model: str, name: str = "groq"):
+        super().__init__(name, model)
+        self.client = client
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        async for chunk in self.client.stream_generate_text(
+                model=self.model, prompt=prompt.user, system=prompt.system, history=prompt.history
+        ):
+            yield chunk
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+def flight_key(**request: Any) -> str:
+    """Identity of a generation request: everything that can change its output."""
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One upstream generation and the text it has produced so far."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.backend: Optional[str] = None
+        self.model: Optional[str] = None
+        self.subscribers = 0
+        # Chunks each open subscriber has read; the producer stays within reach of the slowest.
+        self.positions: Dict["CoalescedStream", int] = {}
+        self.changed = asyncio.Event()
+        self.read = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        # Wake everyone waiting on the current event and hand out a fresh one for the next change.
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def advance(self, subscriber: "CoalescedStream", position: Optional[int]) -> None:
+        if position is None:
+            self.positions.pop(subscriber, None)
+        else:
+            self.positions[subscriber] = position
+        read, self.read = self.read, asyncio.Event()
+        read.set()
+
+    def lag(self) -> int:
+        """Chunks produced that the slowest open subscriber has not read yet."""
+        return len(self.chunks) - min(self.positions.values(), default=len(self.chunks))
+
+
+class CoalescedStream:
+    """A subscriber's view of a shared generation; same interface as ``LLMStream``.
+
+    Iteration replays the chunks produced before the subscriber joined and then
+    follows the live generation.
+    """
+
+    def __init__(self, flights: "SingleFlightStreams", key: str, flight: _Flight):
+        self._flights = flights
+        self._key = key
+        self._flight = flight
+        self._closed = False
+        flight.subscribers += 1
+        flight.positions[self] = 0
+
+    @property
+    def backend(self) -> Optional[str]:
+        return self._flight.backend
+
+    @property
+    def model(self) -> Optional[str]:
+        return self._flight.model
+
+    async def start(self) -> None:
+        """Wait for the first chunk; raises if the generation failed before producing any."""
+        flight = self._flight
+        while not flight.chunks and not flight.done:
+            await flight.changed.wait()
+        if flight.error is not None and not flight.chunks:
+            raise flight.error
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        flight = self._flight
+        position = 0
+        while True:
+            while position < len(flight.chunks):
+                position += 1
+                yield flight.chunks[position - 1]
+                flight.advance(self, position)
+            if flight.done:
+                if flight.error is not None:
+                    raise flight.error
+                return
+            await flight.changed.wait()
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._flight.advance(self, None)
+            self._flights.release(self._key, self._flight)
+
+
+class SingleFlightStreams:
+    """Shares one upstream generation between identical in-flight requests.
+
+    The first request for a key starts a producer task that pulls the upstream
+    stream into a buffer; later requests for the same key subscribe to it. The
+    producer reads at most ``max_ahead`` chunks past its slowest open
+    subscriber, so a slow client holds back the upstream generation just as it
+    would without coalescing. The producer is cancelled when its last subscriber leaves, and the key is freed
+    as soon as the generation ends, so a finished answer is never served from here.
+    """
+
+    def __init__(self, max_ahead: int = 64):
+        self._flights: Dict[str, _Flight] = {}
+        self.max_ahead = max_ahead
+        self.coalesced = 0
+
+    def subscribe(self, key: str, open_stream: Callable[[], Any]) -> CoalescedStream:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, open_stream))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight generation {key[:12]} with {flight.subscribers} subscribers")
+        return CoalescedStream(self, key, flight)
+
+    async def _produce(self, key: str, flight: _Flight, open_stream: Callable[[], Any]) -> None:
+        stream = open_stream()
+        try:
+            async for text in stream:
+                while flight.lag() >= self.max_ahead:
+                    await flight.read.wait()
+                if flight.backend is None:
+                    flight.backend, flight.model = stream.backend, stream.model
+                flight.chunks.append(text)
+                flight.notify()
+        except asyncio.CancelledError:
+            flight.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            await stream.aclose()
+            flight.done = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.notify()
+
+    def release(self, key: str, flight: _Flight) -> None:
+        flight.subscribers -= 1
+        if flight.subscribers <= 0 and not flight.done:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
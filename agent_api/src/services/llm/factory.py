@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import Optional
+
+from src.config import Settings, get_settings
+from src.services.groq.client import GroqClient
+from src.services.groq.factory import get_groq_client
+from src.services.llm.backends import GroqBackend, OllamaBackend
+from src.services.llm.health import LLMHealthMonitor
+from src.services.llm.router import LLMRouter
+from src.services.ollama.client import OllamClient
+from src.services.ollama.factory import get_ollama_client
+
+
+def make_llm_health_monitor(
+        ollama_client: OllamClient,
+        groq_client: GroqClient,
+        settings: Optional[Settings] = None,
+) -> LLMHealthMonitor:
+    """Factory function to create the background health monitor for the LLM backends"""
+    if settings is None:
+        settings = get_settings()
+
+    return LLMHealthMonitor(
+        probes={
+            "ollama": ollama_client.health_check,
+            "groq": groq_client.health_check,
+        },
+        interval=settings.llm_health_interval,
+        probe_timeout=settings.llm_health_probe_timeout,
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        reset_timeout=settings.llm_breaker_reset_timeout,
+    )
+
+
+def make_llm_router(
+        ollama_client: OllamClient,
+        groq_client: GroqClient,
+        health_monitor: Optional[LLMHealthMonitor] = None,
+        settings: Optional[Settings] = None,
+) -> LLMRouter:
+    """Factory function to create the LLM router over the configured backends"""
+    if settings is None:
+        settings = get_settings()
+
+    backends = {
+        "ollama": OllamaBackend(ollama_client, model=settings.ollama_model, keep_alive=settings.ollama_keep_alive),
+        "groq": GroqBackend(groq_client, model=settings.groq_model),
+    }
+
+    return LLMRouter(
+        backends=[backends[name] for name in settings.llm_backends],
+        health_monitor=health_monitor,
+        max_concurrency={
+            "ollama": settings.llm_ollama_max_concurrency,
+            "groq": settings.llm_groq_max_concurrency,
+        },
+        first_token_timeout=settings.llm_first_token_timeout,
+        queue_timeout=settings.llm_queue_timeout,
+        latency_smoothing=settings.llm_latency_smoothing,
+        coalesce=settings.llm_coalesce_streams,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_llm_health_monitor() -> LLMHealthMonitor:
+    """Get the process-wide LLM health monitor"""
+    return make_llm_health_monitor(get_ollama_client(), get_groq_client())
+
+
+@lru_cache(maxsize=1)
+def get_llm_router() -> LLMRouter:
+    """Get the process-wide LLM router so latency estimates and concurrency limits are shared"""
+    return make_llm_router(get_ollama_client(), get_groq_client(), health_monitor=get_llm_health_monitor())
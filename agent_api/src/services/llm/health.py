@@ -0,0 +1,180 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Per-backend circuit breaker.
+
+    ``failure_threshold`` consecutive failures open the breaker. After
+    ``reset_timeout`` seconds it goes half-open and lets a single probe request
+    through; everything else is still refused until that probe finishes. Its
+    success closes the breaker, its failure re-opens it. A probe that never
+    reports back (e.g. its caller went away) is replaced after another
+    ``reset_timeout``.
+
+    :meth:`available` only looks at the state; :meth:`allow_request` is called
+    right before a request is sent and claims the probe slot when half-open.
+    """
+
+    failure_threshold: int = 3
+    reset_timeout: float = 30.0
+    state: str = BREAKER_CLOSED
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    probe_started_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def available(self) -> bool:
+        now = time.monotonic()
+        if self.state == BREAKER_OPEN:
+            return now - self.opened_at >= self.reset_timeout
+        if self.state == BREAKER_HALF_OPEN:
+            return self.probe_started_at is None or now - self.probe_started_at >= self.reset_timeout
+        return True
+
+    def allow_request(self) -> bool:
+        if self.state == BREAKER_CLOSED:
+            return True
+        if not self.available():
+            return False
+        self.state = BREAKER_HALF_OPEN
+        self.probe_started_at = time.monotonic()
+        return True
+
+    def release_probe(self) -> None:
+        """Give up the probe slot without an outcome, so the next request can probe."""
+        self.probe_started_at = None
+
+    def record_success(self) -> None:
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+        self.last_error = None
+
+    def record_failure(self, error: str) -> None:
+        self.consecutive_failures += 1
+        self.last_error = error
+        self.probe_started_at = None
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+
+class LLMHealthMonitor:
+    """Probes every LLM backend in the background and keeps a circuit breaker per backend.
+
+    Request handlers only read :meth:`is_available` and claim a send with
+    :meth:`allow_request`, so no health round trip is made on the request path.
+    Handlers can also report the outcome of real calls with
+    :meth:`record_success` / :meth:`record_failure`, which moves the breaker
+    between probes, or :meth:`release_probe` when a call ends without one.
+    """
+
+    def __init__(
+            self,
+            probes: Dict[str, Callable[[], Awaitable[Any]]],
+            interval: float = 15.0,
+            probe_timeout: float = 5.0,
+            failure_threshold: int = 3,
+            reset_timeout: float = 30.0,
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.breakers = {
+            name: CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+            for name in probes
+        }
+        self.latency_ms: Dict[str, float] = {}
+        self.last_checked_at: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background probe loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"LLM health monitor started for {list(self.probes)}")
+
+    async def stop(self) -> None:
+        """Stop the background probe loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("LLM health monitor stopped")
+
+    async def _probe(self, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.probe_timeout):
+                await self.probes[name]()
+        except Exception as e:
+            self.record_failure(name, e)
+        else:
+            self.record_success(name)
+        finally:
+            self.latency_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+            self.last_checked_at[name] = time.time()
+
+    async def check_all(self) -> None:
+        """Probe every backend once, concurrently."""
+        await asyncio.gather(*(self._probe(name) for name in self.probes))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"LLM health check round failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def is_available(self, name: str) -> bool:
+        return self.breakers[name].available()
+
+    def allow_request(self, name: str) -> bool:
+        return self.breakers[name].allow_request()
+
+    def release_probe(self, name: str) -> None:
+        self.breakers[name].release_probe()
+
+    def record_success(self, name: str) -> None:
+        breaker = self.breakers[name]
+        if breaker.state != BREAKER_CLOSED:
+            logger.info(f"LLM backend {name} recovered")
+        breaker.record_success()
+
+    def record_failure(self, name: str, error: BaseException) -> None:
+        breaker = self.breakers[name]
+        was_open = breaker.state == BREAKER_OPEN
+        breaker.record_failure(f"{type(error).__name__}: {error}")
+        if breaker.state == BREAKER_OPEN and not was_open:
+            logger.warning(f"LLM backend {name} marked unavailable after {breaker.consecutive_failures} failures: {error!r}")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "available": breaker.available(),
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures,
+                "last_error": breaker.last_error,
+                "latency_ms": self.latency_ms.get(name),
+                "last_checked_at": self.last_checked_at.get(name),
+            }
+            for name, breaker in self.breakers.items()
+        }
@@ -0,0 +1,247 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+from loguru import logger
+
+from src.excetions import LLMUnavailableError
+from src.services.llm.backends import BaseLLMBackend
+from src.services.llm.coalescing import CoalescedStream, SingleFlightStreams, flight_key
+from src.services.llm.health import LLMHealthMonitor
+from src.services.prompts.templates import Prompt
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    backend: str
+    model: str
+
+
+class LLMStream:
+    """Text chunks of one routed generation.
+
+    ``backend`` and ``model`` are set once a backend has produced its first
+    token. Awaiting :meth:`start` does the routing up front, so a caller can turn
+    :class:`LLMUnavailableError` into an error response before it starts streaming.
+    """
+
+    def __init__(self, route: Callable[["LLMStream"], AsyncIterator[str]]):
+        self.backend: Optional[str] = None
+        self.model: Optional[str] = None
+        self._chunks = route(self)
+        self._iterator: Optional[AsyncIterator[str]] = None
+        self._first: Optional[str] = None
+        self._started = False
+        self._exhausted = False
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        try:
+            self._first = await anext(self._chunks)
+        except StopAsyncIteration:
+            self._exhausted = True
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        await self.start()
+        if self._exhausted:
+            return
+        if self._first is not None:
+            yield self._first
+        async for text in self._chunks:
+            yield text
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def aclose(self) -> None:
+        if self._iterator is not None:
+            await self._iterator.aclose()
+        await self._chunks.aclose()
+
+
+class LLMRouter:
+    """Routes generations across several LLM backends behind one interface.
+
+    Candidates are the backends whose circuit breaker is not open, ordered by:
+    backends with a free concurrency slot, then the caller's preferred backend,
+    then the lowest smoothed time to first token. A backend that fails or times
+    out before its first token is recorded as a failure and the next candidate
+    is tried; once tokens have been sent the generation is committed to that
+    backend. Each backend has its own concurrency limit. A saturated backend is
+    skipped, except the last candidate, which is waited on for at most
+    ``queue_timeout`` seconds. A generation whose consumer goes away is
+    cancelled upstream and counted in ``cancelled``.
+
+    With ``coalesce`` set, identical in-flight requests share one upstream
+    generation (see :class:`SingleFlightStreams`).
+    """
+
+    def __init__(
+            self,
+            backends: List[BaseLLMBackend],
+            health_monitor: Optional[LLMHealthMonitor] = None,
+            max_concurrency: Optional[Dict[str, int]] = None,
+            first_token_timeout: float = 10.0,
+            queue_timeout: float = 2.0,
+            latency_smoothing: float = 0.2,
+            coalesce: bool = True,
+    ):
+        self.backends = {backend.name: backend for backend in backends}
+        self.health_monitor = health_monitor
+        self.first_token_timeout = first_token_timeout
+        self.queue_timeout = queue_timeout
+        self.latency_smoothing = latency_smoothing
+        max_concurrency = max_concurrency or {}
+        self._semaphores = {name: asyncio.Semaphore(max_concurrency.get(name, 4)) for name in self.backends}
+        self.latency_ms: Dict[str, float] = {}
+        self.cancelled: Dict[str, int] = {name: 0 for name in self.backends}
+        self.single_flight = SingleFlightStreams() if coalesce else None
+
+    def available_backends(self) -> List[str]:
+        if self.health_monitor is None:
+            return list(self.backends)
+        return [name for name in self.backends if self.health_monitor.is_available(name)]
+
+    def _candidates(self, prefer: Optional[str]) -> List[BaseLLMBackend]:
+        order = list(self.backends)
+
+        def rank(name: str):
+            # Backends without a measurement yet sort first so they get sampled.
+            return (self._semaphores[name].locked(), name != prefer, self.latency_ms.get(name, 0.0), order.index(name))
+
+        return [self.backends[name] for name in sorted(self.available_backends(), key=rank)]
+
+    def _observe_latency(self, name: str, start: float) -> None:
+        elapsed = (time.perf_counter() - start) * 1000
+        previous = self.latency_ms.get(name)
+        self.latency_ms[name] = elapsed if previous is None else (
+            self.latency_smoothing * elapsed + (1 - self.latency_smoothing) * previous
+        )
+
+    def _record_success(self, name: str) -> None:
+        if self.health_monitor is not None:
+            self.health_monitor.record_success(name)
+
+    def _record_failure(self, name: str, error: BaseException) -> None:
+        if self.health_monitor is not None:
+            self.health_monitor.record_failure(name, error)
+
+    def _allow_request(self, name: str) -> bool:
+        return self.health_monitor is None or self.health_monitor.allow_request(name)
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, wait: bool) -> bool:
+        """Take a concurrency slot; a saturated backend is only waited on when ``wait`` is set, and never past ``queue_timeout``."""
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return True
+        if not wait:
+            return False
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await semaphore.acquire()
+        except TimeoutError:
+            return False
+        return True
+
+    def _record_cancelled(self, name: str, chunks: int) -> None:
+        if self.health_monitor is not None:
+            self.health_monitor.release_probe(name)
+        self.cancelled[name] += 1
+        logger.info(f"LLM generation on {name} cancelled by its consumer after {chunks} chunks")
+
+    async def _route(self, prompt: Prompt, prefer: Optional[str], stream: LLMStream) -> AsyncIterator[str]:
+        errors = []
+        candidates = self._candidates(prefer)
+        for index, backend in enumerate(candidates):
+            semaphore = self._semaphores[backend.name]
+            if not await self._acquire(semaphore, wait=index == len(candidates) - 1):
+                errors.append(f"{backend.name}: saturated")
+                logger.warning(f"LLM backend {backend.name} has no free slot, failing over")
+                continue
+            try:
+                # A half-open breaker admits one probe; the candidate is skipped while it runs.
+                if not self._allow_request(backend.name):
+                    continue
+                start = time.perf_counter()
+                chunks = backend.stream(prompt)
+                first: Optional[str] = None
+                try:
+                    async with asyncio.timeout(self.first_token_timeout):
+                        first = await anext(chunks)
+                except StopAsyncIteration:
+                    pass
+                except asyncio.CancelledError:
+                    await chunks.aclose()
+                    self._record_cancelled(backend.name, 0)
+                    raise
+                except Exception as e:
+                    await chunks.aclose()
+                    self._record_failure(backend.name, e)
+                    errors.append(f"{backend.name}: {e!r}")
+                    logger.warning(f"LLM backend {backend.name} failed before the first token, failing over: {e!r}")
+                    continue
+
+                self._observe_latency(backend.name, start)
+                stream.backend, stream.model = backend.name, backend.model
+                sent = 0
+                try:
+                    if first is not None:
+                        yield first
+                        sent += 1
+                    async for text in chunks:
+                        yield text
+                        sent += 1
+                except (asyncio.CancelledError, GeneratorExit):
+                    self._record_cancelled(backend.name, sent)
+                    raise
+                except Exception as e:
+                    self._record_failure(backend.name, e)
+                    raise
+                finally:
+                    await chunks.aclose()
+
+                self._record_success(backend.name)
+                return
+            finally:
+                semaphore.release()
+
+        raise LLMUnavailableError(f"No LLM backend could answer: {'; '.join(errors) or 'all backends unavailable'}")
+
+    def stream(self, prompt: Union[str, Prompt], prefer: Optional[str] = None) -> Union[LLMStream, CoalescedStream]:
+        """Stream the answer from the best available backend; a plain string is sent as a single user message."""
+        if isinstance(prompt, str):
+            prompt = Prompt.plain(prompt)
+
+        def open_stream() -> LLMStream:
+            return LLMStream(lambda stream: self._route(prompt, prefer, stream))
+
+        if self.single_flight is None:
+            return open_stream()
+        key = flight_key(system=prompt.system, history=prompt.history, user=prompt.user, prefer=prefer)
+        return self.single_flight.subscribe(key, open_stream)
+
+    async def generate(self, prompt: Union[str, Prompt], prefer: Optional[str] = None) -> LLMResponse:
+        """Generate the full answer from the best available backend."""
+        stream = self.stream(prompt, prefer)
+        try:
+            text = "".join([chunk async for chunk in stream])
+        finally:
+            await stream.aclose()
+        return LLMResponse(text=text, backend=stream.backend, model=stream.model)
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {
+                "model": backend.model,
+                "latency_ms": round(self.latency_ms[name], 2) if name in self.latency_ms else None,
+                "saturated": self._semaphores[name].locked(),
+                "cancelled": self.cancelled[name],
+            }
+            for name, backend in self.backends.items()
+        }
@@ -4,29 +4,31 @@ from loguru import logger
 import json
 from src.config import Settings
 from src.excetions import OllamaException,OllamaConnectionError,OllamaTimeoutError
+from src.services.http_pool import make_async_http_client
 
 class OllamClient:
     def __init__(self,settings:Settings):
         self.base_url = settings.ollama_host
         self.timeout = httpx.Timeout(float(settings.ollama_timeout))
+        # One pooled client per process; connections are kept alive between requests.
+        self.client = make_async_http_client(settings, timeout=self.timeout)
 
     
     async def health_check(self)->Dict[str, Any]:
         """Check if ollama service is healthy and running"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/api/version")
-
-                if response.status_code==200:
-                    version_info = response.json()
-                    return {
-                        "status": "Healthy",
-                        "message": "Ollama Service is running",
-                        "version": version_info.get("version","unknown")
-                    }
+            response = await self.client.get(f"{self.base_url}/api/version")
+
+            if response.status_code==200:
+                version_info = response.json()
+                return {
+                    "status": "Healthy",
+                    "message": "Ollama Service is running",
+                    "version": version_info.get("version","unknown")
+                }
                 
-                else:
-                    raise OllamaException(f"Ollama health check failed with status code {response.status_code}")
+            else:
+                raise OllamaException(f"Ollama health check failed with status code {response.status_code}")
         except httpx.ConnectError as e:
             raise OllamaException(f"Failed to connect to ollama service: {str(e)}")
         except httpx.TimeoutException as e:
@@ -39,14 +41,13 @@ class OllamClient:
         """Get the list of available models from ollama service"""
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("models",[])
-                else:
-                    raise OllamaConnectionError(f"Failed to list models: {response.status_code}")
+            response = await self.client.get(f"{self.base_url}/api/tags")
+
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("models",[])
+            else:
+                raise OllamaConnectionError(f"Failed to list models: {response.status_code}")
                 
         except httpx.ConnectError as e:
             raise OllamaConnectionError(f"Failed to connect to ollama service: {str(e)}")
@@ -66,53 +67,52 @@ class OllamClient:
         """
 
         try:
-            async with httpx.AsyncClient(timeout= self.timeout) as client:
-                data = {
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": stream,
-                    **kwargs
-                }
+            data = {
+                "model": model,
+                "prompt": prompt,
+                "stream": stream,
+                **kwargs
+            }
 
-                logger.info(f"Sending generation request to ollama: model = {model} , stream = {stream},  kwargs = {kwargs}")
+            logger.info(f"Sending generation request to ollama: model = {model} , stream = {stream},  kwargs = {kwargs}")
 
-                response = await client.post(f"{self.base_url}/api/generate",json=data)
+            response = await self.client.post(f"{self.base_url}/api/generate",json=data)
 
-                if response.status_code==200:
-                    result = response.json()
+            if response.status_code==200:
+                result = response.json()
 
 
-                    usage_metadata = {}
+                usage_metadata = {}
 
-                    if "prompt_eval_count" in result:
-                        usage_metadata["prompt_token"] = result["prompt_eval_count"]
-                    if "eval_count" in result:
-                        usage_metadata["completion_token"] = result["eval_count"]
+                if "prompt_eval_count" in result:
+                    usage_metadata["prompt_token"] = result["prompt_eval_count"]
+                if "eval_count" in result:
+                    usage_metadata["completion_token"] = result["eval_count"]
 
-                    if usage_metadata:
-                        usage_metadata["total_tokens"] = (
-                            usage_metadata.get("prompt_token",0) + usage_metadata.get("completion_token",0)
-                        )
+                if usage_metadata:
+                    usage_metadata["total_tokens"] = (
+                        usage_metadata.get("prompt_token",0) + usage_metadata.get("completion_token",0)
+                    )
 
                     
-                    if "total_duration" in result:
-                        usage_metadata["latency_ms"] = round(result["total_duration"]/1_000_000 ,2)
+                if "total_duration" in result:
+                    usage_metadata["latency_ms"] = round(result["total_duration"]/1_000_000 ,2)
 
-                    if "prompt_eval_duration" in result:
-                        usage_metadata["prompt_eval_duration_ms"] = round(result["prompt_eval_duration"] / 1_000_000, 2)
-                    if "eval_duration" in result:
-                        usage_metadata["eval_duration_ms"] = round(result["eval_duration"] / 1_000_000, 2)
+                if "prompt_eval_duration" in result:
+                    usage_metadata["prompt_eval_duration_ms"] = round(result["prompt_eval_duration"] / 1_000_000, 2)
+                if "eval_duration" in result:
+                    usage_metadata["eval_duration_ms"] = round(result["eval_duration"] / 1_000_000, 2)
                     
-                    result["usage_metadata"] = usage_metadata
+                result["usage_metadata"] = usage_metadata
 
-                    logger.debug(f"usage Metadata: {usage_metadata}")
+                logger.debug(f"usage Metadata: {usage_metadata}")
 
-                    return result
-                else:
-                    raise OllamaException(f"Generation failed with status code {response.status_code}")
-        except httpx.ConnectionError as e:
+                return result
+            else:
+                raise OllamaException(f"Generation failed with status code {response.status_code}")
+        except httpx.ConnectError as e:
             raise OllamaConnectionError(f"Failed to connect to ollama service: {str(e)}")
-        except httpx.TimeoutError as e:
+        except httpx.TimeoutException as e:
             raise OllamaTimeoutError(f"Ollama service timeout : {e}")
         except Exception as e:  
             raise OllamaException(f"Error Generating text from ollama: {str(e)}")
@@ -128,31 +128,33 @@ class OllamClient:
 
         Yields:
             JSON chunks from streaming response
+
+        Closing the generator early closes the HTTP response, which makes
+        Ollama abort the generation.
         """
 
         try:
-            async with httpx.AsyncClient(timeout = self.timeout) as client:
-                data = {
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": True,
-                    **kwargs
-                }
-
-                logger.info(f"Sending Streaming generation request to ollama model: {model}, kwargs: {kwargs}")
-
-                async with client.stream("POST",f"{self.base_url}/api/generate",json=data) as response:
-                    if response.status_code != 200:
-                        raise OllamaException(f"Streaming generation failed with status code {response.status_code}")
+            data = {
+                "model": model,
+                "prompt": prompt,
+                "stream": True,
+                **kwargs
+            }
+
+            logger.info(f"Sending Streaming generation request to ollama model: {model}, kwargs: {kwargs}")
+
+            async with self.client.stream("POST",f"{self.base_url}/api/generate",json=data) as response:
+                if response.status_code != 200:
+                    raise OllamaException(f"Streaming generation failed with status code {response.status_code}")
                     
-                    async for line in response.aiter_lines():
-                        if line.strip():
-                            try:
-                                chunk = json.loads(line)
-                                yield chunk
-                            except json.JSONDecodeError:
-                                logger.warning(f"Failed to decode JSON chunk: {line}")
-                                continue
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        try:
+                            chunk = json.loads(line)
+                            yield chunk
+                        except json.JSONDecodeError:
+                            logger.warning(f"Failed to decode JSON chunk: {line}")
+                            continue
 
         except httpx.ConnectError as e:
             raise OllamaConnectionError(f"Failed to connect to ollama service: {str(e)}")
@@ -160,8 +162,7 @@ class OllamClient:
             raise OllamaTimeoutError(f"Ollama service timeout: {e}")
         except Exception as e:
             raise OllamaException(f"Error in streaming generation from ollama: {str(e)}")
-    
-
-
-                
 
+    async def close(self):
+        """Close the pooled HTTP client"""
+        await self.client.aclose()
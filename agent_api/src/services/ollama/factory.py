@@ -4,8 +4,8 @@ from src.config import get_settings
 from src.services.ollama.client import OllamClient
 
 @lru_cache(maxsize=1)
-def get_ollama_client():
-    """Get ollam Client"""
+def get_ollama_client() -> OllamClient:
+    """Get the process-wide Ollama client so its connection pool is shared"""
 
     settings = get_settings()
     return OllamClient(settings)
\ No newline at end of file
@@ -1,5 +1,63 @@
-from src.services.pgvector.pgvector import PostgresVectorClient
-from src.database import get_db_session
-def get_pgvector_client():
-    session = get_db_session()
-    return PostgresVectorClient(session=session)
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import Settings, get_settings
+from src.database import get_async_db_session
+from src.services.pgvector.pgvector import AsyncPostgresVectorClient, PostgresVectorClient
+from src.services.pgvector.reranker import Reranker
+
+
+def make_reranker(settings: Optional[Settings] = None) -> Optional[Reranker]:
+    if settings is None:
+        settings = get_settings()
+    if not settings.rerank_enabled:
+        return None
+
+    return Reranker(
+        candidate_budget=settings.rerank_candidates,
+        latency_budget=settings.rerank_latency_budget,
+        batch_size=settings.rerank_batch_size,
+        cache_size=settings.rerank_cache_size,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[Reranker]:
+    """Get the process-wide reranker so its score cache is shared across requests"""
+    return make_reranker()
+
+
+def get_pgvector_client(session: Session, settings: Optional[Settings] = None) -> PostgresVectorClient:
+    if settings is None:
+        settings = get_settings()
+
+    return PostgresVectorClient(
+        session=session,
+        index_type=settings.vector_index_type,
+        ef_search=settings.vector_hnsw_ef_search,
+        probes=settings.vector_ivfflat_probes,
+        storage=settings.embedding_storage,
+        rerank_multiplier=settings.embedding_rerank_multiplier,
+        reranker=get_reranker(),
+        iterative_scan=settings.vector_iterative_scan,
+    )
+
+
+def get_async_pgvector_client(session: AsyncSession, settings: Optional[Settings] = None) -> AsyncPostgresVectorClient:
+    if settings is None:
+        settings = get_settings()
+
+    return AsyncPostgresVectorClient(
+        session=session,
+        index_type=settings.vector_index_type,
+        ef_search=settings.vector_hnsw_ef_search,
+        probes=settings.vector_ivfflat_probes,
+        storage=settings.embedding_storage,
+        rerank_multiplier=settings.embedding_rerank_multiplier,
+        reranker=get_reranker(),
+        iterative_scan=settings.vector_iterative_scan,
+        session_factory=get_async_db_session,
+    )
@@ -1,10 +1,14 @@
+import asyncio
 import uuid
-from typing import Optional, List,Dict,Any,TypedDict
+from typing import Optional, List,Dict,Any,Callable,Tuple,TypedDict
 from sqlalchemy.orm import Session
-from sqlalchemy import Select , func, text , desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Double, Select , cast, func, literal, text , desc, union_all
+from pgvector.sqlalchemy import BIT, Vector
 
 from loguru import logger
-from src.models.events import EventChunk
+from src.models.events import SEARCH_TS_CONFIG, EventChunk
+from src.services.pgvector.reranker import Reranker
 
 
 class SearchResult(TypedDict):
@@ -16,10 +20,285 @@ class SearchResult(TypedDict):
     metadata: Dict[str, Any]
 
 
+def _bm25_statement(ts_config: str, query: str, size: int, event_ids: Optional[List[uuid.UUID]]) -> Select:
+    ts_query = func.websearch_to_tsquery(ts_config,query)
+
+    match_vector = EventChunk.search_vector
+    rank_score = func.ts_rank_cd(match_vector,ts_query).label("score")
+
+    stmt = (
+        Select(EventChunk,rank_score)
+        .where(match_vector.op("@@")(ts_query))
+        .order_by(desc(rank_score), EventChunk.id)
+        .limit(size)
+    )
+
+    if event_ids:
+        stmt = stmt.where(EventChunk.event_id.in_(event_ids))
+    return stmt
+
+
+def _binary_shortlist(query_embedding: List[float], limit: int, event_ids: Optional[List[uuid.UUID]]) -> Select:
+    """Ids of the nearest chunks by Hamming distance over binary-quantized embeddings.
+
+    The expression matches the ``bit_hamming_ops`` index built by
+    ``ensure_vector_index`` for ``embedding_storage="binary"``.
+    """
+    bits = BIT(len(query_embedding))
+    chunk_bits = cast(func.binary_quantize(EventChunk.embedding), bits)
+    query_bits = cast(func.binary_quantize(cast(query_embedding, Vector(len(query_embedding)))), bits)
+    hamming = chunk_bits.op("<~>")(query_bits)
+
+    stmt = Select(EventChunk.id).order_by(hamming, EventChunk.id).limit(limit)
+    if event_ids:
+        stmt = stmt.where(EventChunk.event_id.in_(event_ids))
+    return stmt
+
+
+def _vector_statement(
+        query_embedding: List[float],
+        size: int,
+        event_ids: Optional[List[uuid.UUID]],
+        shortlist_size: Optional[int] = None,
+) -> Select:
+    """Nearest chunks by cosine distance.
+
+    With ``shortlist_size`` only that many binary-quantized nearest neighbours
+    are re-ranked at full precision.
+    """
+    distance = EventChunk.embedding.cosine_distance(query_embedding)
+    similarity = (1-distance).label("score")
+
+    stmt = (
+        Select(EventChunk,similarity)
+        .order_by(distance, EventChunk.id)
+        .limit(size)
+    )
+
+    if event_ids:
+        stmt = stmt.where(EventChunk.event_id.in_(event_ids))
+    if shortlist_size:
+        stmt = stmt.where(EventChunk.id.in_(_binary_shortlist(query_embedding,shortlist_size,event_ids)))
+    return stmt
+
+
+def _hybrid_statement(
+        ts_config: str,
+        query: str,
+        query_embedding: List[float],
+        size: int,
+        event_ids: Optional[List[uuid.UUID]],
+        k: int,
+        candidate_limit: int,
+        shortlist_size: Optional[int] = None,
+) -> Select:
+    """Both candidate sets and the RRF fusion as a single statement.
+
+    Mirrors ``_rrf_fuse``: ranks are 1-based row numbers of each leg, every
+    appearance adds ``1 / (k + rank)``, and ties keep the order in which a chunk
+    was first seen (BM25 hits first, then vector-only hits).
+    """
+    ts_query = func.websearch_to_tsquery(ts_config,query)
+    rank_score = func.ts_rank_cd(EventChunk.search_vector,ts_query)
+    distance = EventChunk.embedding.cosine_distance(query_embedding)
+
+    bm25_top = (
+        Select(EventChunk.id, rank_score.label("score"))
+        .where(EventChunk.search_vector.op("@@")(ts_query))
+        .order_by(desc(rank_score), EventChunk.id)
+        .limit(candidate_limit)
+    )
+    vector_top = (
+        Select(EventChunk.id, distance.label("distance"))
+        .order_by(distance, EventChunk.id)
+        .limit(candidate_limit)
+    )
+    if event_ids:
+        bm25_top = bm25_top.where(EventChunk.event_id.in_(event_ids))
+        vector_top = vector_top.where(EventChunk.event_id.in_(event_ids))
+    if shortlist_size:
+        vector_top = vector_top.where(EventChunk.id.in_(_binary_shortlist(query_embedding,shortlist_size,event_ids)))
+
+    # Number the rows outside the LIMITed scans so the ANN / GIN index can still be used.
+    bm25_top = bm25_top.subquery("bm25_top")
+    vector_top = vector_top.subquery("vector_top")
+    bm25 = Select(
+        bm25_top.c.id,
+        func.row_number().over(order_by=(desc(bm25_top.c.score), bm25_top.c.id)).label("rank"),
+    ).cte("bm25")
+    vector = Select(
+        vector_top.c.id,
+        func.row_number().over(order_by=(vector_top.c.distance, vector_top.c.id)).label("rank"),
+    ).cte("vector")
+
+    candidates = union_all(
+        Select(bm25.c.id, bm25.c.rank, bm25.c.rank.label("seen")),
+        Select(vector.c.id, vector.c.rank, (vector.c.rank + candidate_limit).label("seen")),
+    ).subquery("candidates")
+
+    fused = (
+        Select(
+            candidates.c.id,
+            func.sum(literal(1.0, Double) / cast(k + candidates.c.rank, Double)).label("score"),
+            func.min(candidates.c.seen).label("seen"),
+        )
+        .group_by(candidates.c.id)
+        .cte("fused")
+    )
+
+    return (
+        Select(EventChunk.id, EventChunk.event_id, EventChunk.raw_text, EventChunk.chunk_metadata, fused.c.score)
+        .join(fused, fused.c.id == EventChunk.id)
+        .order_by(desc(fused.c.score), fused.c.seen)
+        .limit(size)
+    )
+
+
+# Upper bound pgvector accepts for hnsw.ef_search.
+HNSW_MAX_EF_SEARCH = 1000
+
+
+def _vector_search_settings(
+        index_type: str,
+        ef_search: int,
+        probes: int,
+        exact: bool,
+        scan_limit: int = 0,
+        filtered: bool = False,
+        iterative_scan: bool = True,
+) -> List[Tuple[str, str]]:
+    """Transaction-local planner settings applied before a vector query.
+
+    An HNSW scan returns at most ``ef_search`` rows, so it is raised to the
+    query's ``scan_limit`` when that is larger. With an ``event_ids`` filter
+    the filter is applied after the index scan; iterative scans keep reading
+    the index until enough rows pass it instead of returning short. IVFFlat only
+    supports relaxed ordering, so ``search_vector`` re-sorts its rows and the
+    hybrid statement ranks them with ``row_number()`` over the distance.
+    ``iterative_scan=False`` leaves iterative scans off, for pgvector < 0.8.
+    """
+    if exact:
+        # Force the exact scan, e.g. as ground truth when measuring ANN recall.
+        return [("enable_indexscan", "off")]
+    if index_type == "hnsw":
+        settings = [("hnsw.ef_search", str(min(max(ef_search, scan_limit), HNSW_MAX_EF_SEARCH)))]
+        if filtered and iterative_scan:
+            settings.append(("hnsw.iterative_scan", "strict_order"))
+        return settings
+    if index_type == "ivfflat":
+        settings = [("ivfflat.probes", str(probes))]
+        if filtered and iterative_scan:
+            settings.append(("ivfflat.iterative_scan", "relaxed_order"))
+        return settings
+    return []
+
+
+_SET_CONFIG = text("SELECT set_config(:name, :value, true)")
+
+
+def _to_results(rows, source: str) -> List[SearchResult]:
+    return [
+        {
+            "chunk_id": str(row.EventChunk.id),
+            "event_id": str(row.EventChunk.event_id),
+            "text": row.EventChunk.raw_text,
+            "score": float(row.score),
+            "source": source,
+            "metadata": row.EventChunk.chunk_metadata
+        }
+        for row in rows
+    ]
+
+
+def _to_hybrid_results(rows) -> List[SearchResult]:
+    return [
+        {
+            "chunk_id": str(row.id),
+            "event_id": str(row.event_id),
+            "text": row.raw_text,
+            "score": float(row.score),
+            "source": "hybrid",
+            "metadata": row.chunk_metadata
+        }
+        for row in rows
+    ]
+
+
+def _rrf_fuse(bm25_hits: List[SearchResult], vector_hits: List[SearchResult], size: int, k: int) -> List[SearchResult]:
+    rrf_scores: Dict[str,float] = {}
+    result_map: Dict[str,SearchResult] = {}
+
+    def process_hits(hits: List[SearchResult]):
+        for rank,hit in enumerate(hits):
+            cid = hit["chunk_id"]
+
+            if cid not in result_map:
+                result_map[cid] = hit
+            
+            rrf_scores[cid] = rrf_scores.get(cid,0.0) + (1.0/(k+rank+1))
+
+    process_hits(bm25_hits)
+    process_hits(vector_hits)
+
+
+    sorted_ids = sorted(rrf_scores.items(), key = lambda item: item[1],reverse= True)
+
+    final_results : List[SearchResult] = []
+
+    for cid,score in sorted_ids[:size]:
+        item = result_map[cid]
+        final_results.append({
+            "chunk_id": cid,
+            "event_id": item["event_id"],
+            "text": item["text"],
+            "score": score,
+            "source": "hybrid",
+            "metadata":  item["metadata"],
+        })
+
+    return final_results
+
+
 class PostgresVectorClient:
-    def __init__(self,session:Session):
+    def __init__(
+            self,
+            session:Session,
+            index_type: str = "hnsw",
+            ef_search: int = 40,
+            probes: int = 10,
+            storage: str = "vector",
+            rerank_multiplier: int = 4,
+            reranker: Optional[Reranker] = None,
+            iterative_scan: bool = True,
+    ):
         self.session = session
-        self.ts_config = "english"
+        self.ts_config = SEARCH_TS_CONFIG
+        self.index_type = index_type
+        self.ef_search = ef_search
+        self.probes = probes
+        self.storage = storage
+        self.rerank_multiplier = rerank_multiplier
+        self.reranker = reranker
+        self.iterative_scan = iterative_scan
+
+    def _pool_size(self, size: int) -> int:
+        """Fused results to fetch: the re-ranking candidate pool, or just ``size`` without a reranker."""
+        return self.reranker.pool_size(size) if self.reranker else size
+
+    def _rerank(self, query: str, fused: List[SearchResult], size: int) -> List[SearchResult]:
+        if self.reranker is None:
+            return fused[:size]
+        try:
+            return self.reranker.rerank(query,fused,size)
+        except Exception as e:
+            logger.error(f"Re-ranking failed, using fused order: {e}")
+            return fused[:size]
+
+    def _shortlist_size(self, size: int, exact: bool = False) -> Optional[int]:
+        """Candidates taken from the binary index before full-precision re-ranking, if any."""
+        if self.storage != "binary" or exact:
+            return None
+        return size*self.rerank_multiplier
 
     def search_bm25(
             self,
@@ -29,34 +308,9 @@ class PostgresVectorClient:
     ):
         """Search the chunk using text search"""
         try:
-            ts_query = func.websearch_to_tsquery(self.ts_config,query)
-
-            match_vector = func.to_tsvector(self.ts_config,EventChunk.search_text)
-            rank_score = func.ts_rank_cd(match_vector,ts_query).label("score")
-
-            stmt = (
-                Select(EventChunk,rank_score)
-                .where(match_vector.op("@@")(ts_query))
-                .order_by(desc(rank_score))
-                .limit(size)
-            )
-
-            if event_ids:
-                stmt = stmt.where(EventChunk.event_id.in_(event_ids))
-            
+            stmt = _bm25_statement(self.ts_config,query,size,event_ids)
             rows = self.session.execute(stmt).all()
-
-            return [
-                {
-                    "chunk_id": str(row.EventChunk.id),
-                    "event_id": str(row.EventChunk.event_id),
-                    "text": row.EventChunk.raw_text,
-                    "score": float(row.score),
-                    "source": "bm25",
-                    "metadata": row.EventChunk.chunk_metadata
-                }
-                for row in rows
-            ]
+            return _to_results(rows,"bm25")
         
         except Exception as e:
             logger.error(f"BM25 search failed: {e}")
@@ -66,34 +320,20 @@ class PostgresVectorClient:
             self,
             query_embedding: List[float],
             size: int = 10,
-            event_ids: Optional[List[uuid.UUID]] = None
+            event_ids: Optional[List[uuid.UUID]] = None,
+            exact: bool = False
     ):
         try:
-            distance = EventChunk.embedding.cosine_distance(query_embedding)
-            similarity = (1-distance).label("score")
-
-            stmt = (
-                Select(EventChunk,similarity)
-                .order_by(distance)
-                .limit(size)
+            shortlist_size = self._shortlist_size(size,exact)
+            settings = _vector_search_settings(
+                self.index_type,self.ef_search,self.probes,exact,shortlist_size or size,bool(event_ids),self.iterative_scan,
             )
-
-            if event_ids:
-                stmt = stmt.where(EventChunk.event_id.in_(event_ids))
-
+            for name, value in settings:
+                self.session.execute(_SET_CONFIG,{"name": name, "value": value})
+            stmt = _vector_statement(query_embedding,size,event_ids,shortlist_size)
             rows = self.session.execute(stmt).all()
-
-            return [
-                {
-                    "chunk_id": str(row.EventChunk.id),
-                    "event_id": str(row.EventChunk.event_id),
-                    "text": row.EventChunk.raw_text,
-                    "score": float(row.score),
-                    "source": "vector",
-                    "metadata": row.EventChunk.chunk_metadata
-                }
-                for row in rows
-            ]
+            # Stable sort: a no-op for strictly ordered scans, fixes up relaxed ones.
+            return _to_results(sorted(rows,key=lambda row: -row.score),"vector")
         except Exception as e:
             logger.error(f"Vector Search failed: {e}")
             return []
@@ -107,46 +347,202 @@ class PostgresVectorClient:
             k: int = 60,
             candidate_multiplier: int = 3
     ):
-        candidate_limit = size*candidate_multiplier
+        pool = self._pool_size(size)
+        candidate_limit = pool*candidate_multiplier
 
         bm25_hits = self.search_bm25(query,size = candidate_limit,event_ids=event_ids)
         vector_hits = self.search_vector(query_embedding,size = candidate_limit,event_ids=event_ids)
 
-        rrf_scores: Dict[str,float] = {}
-        result_map: Dict[str,SearchResult] = {}
+        return self._rerank(query,_rrf_fuse(bm25_hits,vector_hits,pool,k),size)
 
-        def process_hits(hits: List[SearchResult]):
-            for rank,hit in enumerate(hits):
-                cid = hit["chunk_id"]
+    def search_hybrid_sql(
+            self,
+            query: str,
+            query_embedding: List[float],
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None,
+            k: int = 60,
+            candidate_multiplier: int = 3
+    ):
+        """Same results as ``search_hybrid``, computed in one SQL statement."""
+        pool = self._pool_size(size)
+        try:
+            candidate_limit = pool*candidate_multiplier
+            shortlist_size = self._shortlist_size(candidate_limit)
+            settings = _vector_search_settings(
+                self.index_type,self.ef_search,self.probes,False,shortlist_size or candidate_limit,bool(event_ids),self.iterative_scan,
+            )
+            for name, value in settings:
+                self.session.execute(_SET_CONFIG,{"name": name, "value": value})
+            stmt = _hybrid_statement(
+                self.ts_config,query,query_embedding,pool,event_ids,k,candidate_limit,shortlist_size,
+            )
+            fused = _to_hybrid_results(self.session.execute(stmt).all())
+        except Exception as e:
+            logger.error(f"Hybrid search failed: {e}")
+            return []
+        return self._rerank(query,fused,size)
 
-                if cid not in result_map:
-                    result_map[cid] = hit
-                
-                rrf_scores[cid] = rrf_scores.get(cid,0.0) + (1.0/(k+rank+1))
 
-        process_hits(bm25_hits)
-        process_hits(vector_hits)
+class AsyncPostgresVectorClient:
+    """Async counterpart of :class:`PostgresVectorClient` for use inside request handlers."""
 
+    def __init__(
+            self,
+            session:AsyncSession,
+            index_type: str = "hnsw",
+            ef_search: int = 40,
+            probes: int = 10,
+            storage: str = "vector",
+            rerank_multiplier: int = 4,
+            reranker: Optional[Reranker] = None,
+            session_factory: Optional[Callable[[], Any]] = None,
+            iterative_scan: bool = True,
+    ):
+        self.session = session
+        self.session_factory = session_factory
+        self.ts_config = SEARCH_TS_CONFIG
+        self.index_type = index_type
+        self.ef_search = ef_search
+        self.probes = probes
+        self.storage = storage
+        self.rerank_multiplier = rerank_multiplier
+        self.reranker = reranker
+        self.iterative_scan = iterative_scan
 
-        sorted_ids = sorted(rrf_scores.items(), key = lambda item: item[1],reverse= True)
+    def _pool_size(self, size: int) -> int:
+        """Fused results to fetch: the re-ranking candidate pool, or just ``size`` without a reranker."""
+        return self.reranker.pool_size(size) if self.reranker else size
 
-        final_results : List[SearchResult] = []
+    async def _rerank(self, query: str, fused: List[SearchResult], size: int) -> List[SearchResult]:
+        if self.reranker is None:
+            return fused[:size]
+        try:
+            return await self.reranker.arerank(query,fused,size)
+        except Exception as e:
+            logger.error(f"Re-ranking failed, using fused order: {e}")
+            return fused[:size]
 
-        for cid,score in sorted_ids[:size]:
-            item = result_map[cid]
-            final_results.append({
-                "chunk_id": cid,
-                "event_id": item["event_id"],
-                "text": item["text"],
-                "score": score,
-                "source": "hybrid",
-                "metadata":  item["metadata"],
-            })
+    def _shortlist_size(self, size: int, exact: bool = False) -> Optional[int]:
+        """Candidates taken from the binary index before full-precision re-ranking, if any."""
+        if self.storage != "binary" or exact:
+            return None
+        return size*self.rerank_multiplier
 
-        return final_results
-    
-        
+    async def search_bm25(
+            self,
+            query: str,
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None
+    ):
+        """Search the chunk using text search"""
+        try:
+            stmt = _bm25_statement(self.ts_config,query,size,event_ids)
+            rows = (await self.session.execute(stmt)).all()
+            return _to_results(rows,"bm25")
+
+        except Exception as e:
+            logger.error(f"BM25 search failed: {e}")
+            return []
+
+    async def search_vector(
+            self,
+            query_embedding: List[float],
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None,
+            exact: bool = False
+    ):
+        try:
+            shortlist_size = self._shortlist_size(size,exact)
+            settings = _vector_search_settings(
+                self.index_type,self.ef_search,self.probes,exact,shortlist_size or size,bool(event_ids),self.iterative_scan,
+            )
+            for name, value in settings:
+                await self.session.execute(_SET_CONFIG,{"name": name, "value": value})
+            stmt = _vector_statement(query_embedding,size,event_ids,shortlist_size)
+            rows = (await self.session.execute(stmt)).all()
+            # Stable sort: a no-op for strictly ordered scans, fixes up relaxed ones.
+            return _to_results(sorted(rows,key=lambda row: -row.score),"vector")
+        except Exception as e:
+            logger.error(f"Vector Search failed: {e}")
+            return []
+
+    async def search_hybrid(
+            self,
+            query: str,
+            query_embedding: List[float],
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None,
+            k: int = 60,
+            candidate_multiplier: int = 3
+    ):
+        pool = self._pool_size(size)
+        candidate_limit = pool*candidate_multiplier
+
+        bm25_hits = await self.search_bm25(query,size = candidate_limit,event_ids=event_ids)
+        vector_hits = await self.search_vector(query_embedding,size = candidate_limit,event_ids=event_ids)
+
+        return await self._rerank(query,_rrf_fuse(bm25_hits,vector_hits,pool,k),size)
+
+    async def search_hybrid_sql(
+            self,
+            query: str,
+            query_embedding: List[float],
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None,
+            k: int = 60,
+            candidate_multiplier: int = 3
+    ):
+        """Same results as ``search_hybrid``, computed in one SQL statement."""
+        pool = self._pool_size(size)
+        try:
+            candidate_limit = pool*candidate_multiplier
+            shortlist_size = self._shortlist_size(candidate_limit)
+            settings = _vector_search_settings(
+                self.index_type,self.ef_search,self.probes,False,shortlist_size or candidate_limit,bool(event_ids),self.iterative_scan,
+            )
+            for name, value in settings:
+                await self.session.execute(_SET_CONFIG,{"name": name, "value": value})
+            stmt = _hybrid_statement(
+                self.ts_config,query,query_embedding,pool,event_ids,k,candidate_limit,shortlist_size,
+            )
+            fused = _to_hybrid_results((await self.session.execute(stmt)).all())
+        except Exception as e:
+            logger.error(f"Hybrid search failed: {e}")
+            return []
+        return await self._rerank(query,fused,size)
+
+    async def search_hybrid_parallel(
+            self,
+            query: str,
+            query_embedding: List[float],
+            size: int = 10,
+            event_ids: Optional[List[uuid.UUID]] = None,
+            k: int = 60,
+            candidate_multiplier: int = 3
+    ):
+        """Same results as ``search_hybrid``, with the two legs running concurrently.
+
+        Each leg gets its own pooled connection from ``session_factory``, so hybrid
+        latency is the slower leg rather than the sum of both.
+        """
+        if self.session_factory is None:
+            raise RuntimeError("search_hybrid_parallel requires a session_factory")
 
+        pool = self._pool_size(size)
+        candidate_limit = pool*candidate_multiplier
 
+        async def run_leg(search):
+            async with self.session_factory() as session:
+                leg_client = AsyncPostgresVectorClient(
+                    session,index_type=self.index_type,ef_search=self.ef_search,probes=self.probes,
+                    storage=self.storage,rerank_multiplier=self.rerank_multiplier,iterative_scan=self.iterative_scan,
+                )
+                return await search(leg_client)
 
+        bm25_hits, vector_hits = await asyncio.gather(
+            run_leg(lambda client: client.search_bm25(query,size = candidate_limit,event_ids=event_ids)),
+            run_leg(lambda client: client.search_vector(query_embedding,size = candidate_limit,event_ids=event_ids)),
+        )
 
+        return await self._rerank(query,_rrf_fuse(bm25_hits,vector_hits,pool,k),size)
@@ -0,0 +1,152 @@
+import asyncio
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> List[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
+
+
+class BaseRerankScorer(ABC):
+    """Scores (query, passage) pairs; higher means more relevant."""
+
+    @abstractmethod
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        """Score every passage in ``texts`` against ``query``, in the same order."""
+
+
+class TermOverlapScorer(BaseRerankScorer):
+    """Cheap CPU-only scorer that looks at the query and passage together.
+
+    Rewards covering every query term, matching query bigrams in order (phrase
+    proximity) and, weakly, repeated query terms. It needs no model download, so
+    re-ranking works offline; a cross-encoder can be plugged in through
+    :class:`BaseRerankScorer`.
+    """
+
+    def __init__(self, bigram_weight: float = 0.5, frequency_weight: float = 0.1):
+        self.bigram_weight = bigram_weight
+        self.frequency_weight = frequency_weight
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        query_terms = _tokens(query)
+        if not query_terms:
+            return [0.0] * len(texts)
+        unique_terms = set(query_terms)
+        query_bigrams = set(zip(query_terms, query_terms[1:]))
+
+        scores = []
+        for text in texts:
+            terms = _tokens(text)
+            counts = Counter(terms)
+            coverage = sum(1 for term in unique_terms if term in counts) / len(unique_terms)
+            frequency = sum(math.log1p(counts[term]) for term in unique_terms) / len(unique_terms)
+            bigrams = len(query_bigrams & set(zip(terms, terms[1:]))) / len(query_bigrams) if query_bigrams else 0.0
+            scores.append(coverage + self.bigram_weight * bigrams + self.frequency_weight * frequency)
+        return scores
+
+
+class Reranker:
+    """Second retrieval stage run on the RRF-fused candidates.
+
+    At most ``candidate_budget`` candidates are scored, ``batch_size`` at a time.
+    Scores are cached per (query, chunk). Once ``latency_budget`` seconds have
+    been spent, the remaining candidates are not scored. Hits that were not
+    scored, including those beyond the budget, follow the re-ranked head in
+    their fused order. They keep their fused ``score`` and ``source``, so only
+    hits with ``source == "reranked"`` carry re-ranker scores.
+    """
+
+    def __init__(
+            self,
+            scorer: Optional[BaseRerankScorer] = None,
+            candidate_budget: int = 30,
+            latency_budget: float = 0.15,
+            batch_size: int = 16,
+            cache_size: int = 10_000,
+    ):
+        self.scorer = scorer or TermOverlapScorer()
+        self.candidate_budget = candidate_budget
+        self.latency_budget = latency_budget
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
+    def pool_size(self, size: int) -> int:
+        """Number of fused candidates to fetch so ``size`` results can be re-ranked."""
+        return max(size, self.candidate_budget)
+
+    def _remember(self, key: Tuple[str, str], score: float) -> None:
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cached_scores(self, query: str, candidates: List[Dict[str, Any]]) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+        scores: Dict[str, float] = {}
+        pending = []
+        for hit in candidates:
+            key = (query, hit["chunk_id"])
+            score = self._cache.get(key)
+            if score is None:
+                pending.append(hit)
+            else:
+                self._cache.move_to_end(key)
+                scores[hit["chunk_id"]] = score
+        return scores, pending
+
+    def _batches(self, pending: List[Dict[str, Any]]):
+        for start in range(0, len(pending), self.batch_size):
+            yield pending[start:start + self.batch_size]
+
+    def _record(self, query: str, batch: List[Dict[str, Any]], batch_scores: List[float], scores: Dict[str, float]) -> None:
+        for hit, score in zip(batch, batch_scores):
+            scores[hit["chunk_id"]] = score
+            self._remember((query, hit["chunk_id"]), score)
+
+    def _merge(self, hits: List[Dict[str, Any]], scores: Dict[str, float], size: int) -> List[Dict[str, Any]]:
+        scored = [hit for hit in hits if hit["chunk_id"] in scores]
+        unscored = [hit for hit in hits if hit["chunk_id"] not in scores]
+        skipped = len(unscored) - max(len(hits) - self.candidate_budget, 0)
+        if skipped:
+            logger.debug(f"Re-ranking latency budget exhausted, {skipped} candidates left in fused order")
+
+        # sorted() is stable, so equal scores keep their fused order.
+        scored.sort(key=lambda hit: scores[hit["chunk_id"]], reverse=True)
+        ranked = [{**hit, "score": scores[hit["chunk_id"]], "source": "reranked"} for hit in scored]
+        return (ranked + unscored)[:size]
+
+    def rerank(self, query: str, hits: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+        candidates = hits[:self.candidate_budget]
+        scores, pending = self._cached_scores(query, candidates)
+
+        deadline = time.monotonic() + self.latency_budget
+        for batch in self._batches(pending):
+            if time.monotonic() >= deadline:
+                break
+            self._record(query, batch, self.scorer.score(query, [hit["text"] for hit in batch]), scores)
+
+        return self._merge(hits, scores, size)
+
+    async def arerank(self, query: str, hits: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+        """Like :meth:`rerank`, scoring in a worker thread so the event loop is not blocked."""
+        candidates = hits[:self.candidate_budget]
+        scores, pending = self._cached_scores(query, candidates)
+
+        deadline = time.monotonic() + self.latency_budget
+        for batch in self._batches(pending):
+            if time.monotonic() >= deadline:
+                break
+            batch_scores = await asyncio.to_thread(self.scorer.score, query, [hit["text"] for hit in batch])
+            self._record(query, batch, batch_scores, scores)
+
+        return self._merge(hits, scores, size)
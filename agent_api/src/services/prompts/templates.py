@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from string import Formatter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.services.embeddings.jina_client import estimate_tokens
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A rendered prompt: a stable system message, prior conversation, and the per-request user message.
+
+    ``history`` holds chat messages (``role``/``content``) that go between the
+    system message and the user message.
+    """
+
+    system: Optional[str]
+    user: str
+    tokens: int
+    template: Optional[str] = None
+    history: Tuple[Dict[str, str], ...] = ()
+
+    @classmethod
+    def plain(cls, text: str) -> "Prompt":
+        return cls(system=None, user=text, tokens=estimate_tokens(text))
+
+    def transcript(self) -> str:
+        """The history and user message as one text prompt, for completion-style APIs."""
+        if not self.history:
+            return self.user
+        lines = "\n".join(f"{message['role'].upper()}: {message['content']}" for message in self.history)
+        return f"<CONVERSATION>\n{lines}\n</CONVERSATION>\n\n{self.user}"
+
+
+class PromptTemplate:
+    """A system message plus a ``str.format`` style user template, compiled once.
+
+    The user template is split into literal text and field names up front, so
+    rendering is a single join. The system message never changes between
+    requests, which lets the provider's prefix cache and Ollama's KV cache reuse
+    it; its token count, and that of the template's literal text, are computed
+    here once.
+    """
+
+    def __init__(self, name: str, system: Optional[str], user: str):
+        self.name = name
+        self.system = system
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(user)
+        ]
+        self.fields = tuple(field for _, field in self._parts if field is not None)
+        self.system_tokens = estimate_tokens(system) if system else 0
+        self.static_tokens = self.system_tokens + estimate_tokens("".join(literal for literal, _ in self._parts))
+
+    def render(self, history: Sequence[Dict[str, str]] = (), **values: str) -> Prompt:
+        missing = set(self.fields) - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template {self.name} is missing {sorted(missing)}")
+
+        pieces = []
+        tokens = self.static_tokens + sum(estimate_tokens(message["content"]) for message in history)
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                value = values[field]
+                pieces.append(value)
+                tokens += len(value) // 4
+        return Prompt(
+            system=self.system,
+            user="".join(pieces),
+            tokens=tokens,
+            template=self.name,
+            history=tuple(history),
+        )
+
+
+EVENT_ASSISTANT_SYSTEM_PROMPT = """<SYSTEM>
+Role:
+You are KeyNote AI, an intelligent event assistant.
+
+Identity:
+KeyNote AI is an AI assistant specialized in understanding, summarizing, 
+and explaining what happened during events. You maintain a friendly, helpful, 
+and professional tone in all interactions.
+
+Core Purpose:
+Your primary function is to analyze event-related information and provide 
+clear, structured answers about events. Help users understand event details, 
+summarize what happened, and answer questions about specific events.
+
+CRITICAL Behavior Guidelines:
+1. ALWAYS prioritize event-related questions and provide detailed, helpful answers.
+2. For COMPLETELY IRRELEVANT questions (e.g., math problems, coding help, general knowledge 
+   unrelated to events): DO NOT ANSWER. Instead, politely decline and redirect to event details.
+   Example: "I'm specifically designed to help with event-related questions. Is there 
+   anything about the event you'd like to know?"
+3. For FRIENDLY CONVERSATIONS or GREETINGS (e.g., "hi", "hello", "how are you"):
+   - Answer politely but VERY BRIEFLY (1-2 sentences max).
+   - IMMEDIATELY redirect to events.
+   Example: "Hey there! I'm doing great, thanks for asking! Now, let me help you 
+   understand more about the event. What would you like to know?"
+4. ALWAYS end every response by nudging users toward event-related questions.
+
+Tone:
+- Be conversational and friendly
+- Show genuine interest in helping users understand their events
+- Use a professional yet approachable tone
+- Never provide long answers to non-event questions
+- Always redirect focus back to event details
+
+Content Scope:
+✓ Answer: Event details, summaries, attendees, timeline, activities
+✗ Don't Answer: Unrelated topics, general knowledge, off-topic requests
+
+<REDIRECTION>
+Remember: Your ONLY expertise is in events. Politely decline irrelevant questions 
+and guide ALL conversations back to event-related topics. Be friendly but firm 
+about your scope.
+</REDIRECTION>
+
+</SYSTEM>"""
+
+
+RAG_SYSTEM_PROMPT = """<SYSTEM>
+Role:
+You are KeyNote AI, an intelligent event assistant.
+
+Answer the user's question using only the event context below. Cite the
+passages you used by their number, e.g. [2]. If the context does not contain
+the answer, say so briefly and ask the user about the event instead.
+</SYSTEM>"""
+
+
+EVENT_ASSISTANT = PromptTemplate(
+    "event_assistant",
+    system=EVENT_ASSISTANT_SYSTEM_PROMPT,
+    user="""<USER_INPUT>
+{question}
+</USER_INPUT>
+""",
+)
+
+RAG_ANSWER = PromptTemplate(
+    "rag_answer",
+    system=RAG_SYSTEM_PROMPT,
+    user="""<CONTEXT>
+{context}
+</CONTEXT>
+
+<USER_INPUT>
+{question}
+</USER_INPUT>
+""",
+)
+
+CONVERSATION_SUMMARY = PromptTemplate(
+    "conversation_summary",
+    system="""<SYSTEM>
+You compress chat history between a user and KeyNote AI, an event assistant.
+Merge the existing summary with the new turns into one short summary in plain
+prose. Keep the facts, names, numbers and open questions a follow-up question
+could refer to; drop greetings and repetition. Reply with the summary only.
+</SYSTEM>""",
+    user="""<SUMMARY>
+{summary}
+</SUMMARY>
+
+<TURNS>
+{turns}
+</TURNS>
+""",
+)
+
+TEMPLATES: Dict[str, PromptTemplate] = {
+    template.name: template for template in (EVENT_ASSISTANT, RAG_ANSWER, CONVERSATION_SUMMARY)
+}
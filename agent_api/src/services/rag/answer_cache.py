@@ -0,0 +1,133 @@
+import math
+import operator
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from loguru import logger
+
+
+def _normalize(embedding: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in embedding)) or 1.0
+    return [value / norm for value in embedding]
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    embedding: List[float]
+    answer: str
+    extra: Dict[str, Any]
+    # Events whose chunks the answer was built from; None means it may depend on any event.
+    depends_on: Optional[FrozenSet[str]]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SemanticAnswerCache:
+    """In-process cache of generated answers, looked up by query embedding similarity.
+
+    Entries are grouped by scope, ``(namespace, event_id)``. A lookup only
+    compares against entries of the same scope and returns the most similar
+    answer whose cosine similarity reaches ``similarity_threshold``. Entries
+    expire after ``ttl`` seconds and are dropped by :meth:`invalidate` when an
+    event they depend on is re-indexed.
+    """
+
+    def __init__(
+            self,
+            similarity_threshold: float = 0.95,
+            ttl: float = 3600.0,
+            max_entries_per_scope: int = 128,
+            max_scopes: int = 1024,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries_per_scope = max_entries_per_scope
+        self.max_scopes = max_scopes
+        self._scopes: "OrderedDict[Tuple[str, Optional[str]], List[CachedAnswer]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _scope(namespace: str, event_id: Optional[Any]) -> Tuple[str, Optional[str]]:
+        return namespace, str(event_id) if event_id else None
+
+    def lookup(self, namespace: str, event_id: Optional[Any], embedding: List[float]) -> Optional[CachedAnswer]:
+        scope = self._scope(namespace, event_id)
+        entries = self._scopes.get(scope)
+        if not entries:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        entries[:] = [entry for entry in entries if now - entry.created_at < self.ttl]
+        if not entries:
+            del self._scopes[scope]
+            self.misses += 1
+            return None
+        self._scopes.move_to_end(scope)
+
+        query = _normalize(embedding)
+        best, best_similarity = None, self.similarity_threshold
+        for entry in entries:
+            similarity = sum(map(operator.mul, query, entry.embedding))
+            if similarity >= best_similarity:
+                best, best_similarity = entry, similarity
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.debug(f"Answer cache hit in {scope} (similarity {best_similarity:.3f}): {best.query[:50]}")
+        return best
+
+    def store(
+            self,
+            namespace: str,
+            event_id: Optional[Any],
+            query: str,
+            embedding: List[float],
+            answer: str,
+            extra: Optional[Dict[str, Any]] = None,
+            depends_on: Optional[FrozenSet[str]] = frozenset(),
+    ) -> None:
+        scope = self._scope(namespace, event_id)
+        entries = self._scopes.setdefault(scope, [])
+        self._scopes.move_to_end(scope)
+        entries.append(CachedAnswer(
+            query=query,
+            embedding=_normalize(embedding),
+            answer=answer,
+            extra=extra or {},
+            depends_on=depends_on,
+        ))
+        del entries[:-self.max_entries_per_scope]
+        while len(self._scopes) > self.max_scopes:
+            self._scopes.popitem(last=False)
+
+    def invalidate(self, event_id: Any) -> int:
+        """Drop every answer that may depend on ``event_id``; returns how many were dropped."""
+        event_id = str(event_id)
+        dropped = 0
+        for scope, entries in list(self._scopes.items()):
+            kept = [
+                entry for entry in entries
+                if entry.depends_on is not None and event_id not in entry.depends_on
+            ]
+            dropped += len(entries) - len(kept)
+            if kept:
+                entries[:] = kept
+            else:
+                del self._scopes[scope]
+        if dropped:
+            logger.info(f"Invalidated {dropped} cached answers for event {event_id}")
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "scopes": len(self._scopes),
+            "entries": sum(len(entries) for entries in self._scopes.values()),
+        }
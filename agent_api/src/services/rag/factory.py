@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import Optional
+
+from src.config import Settings, get_settings
+from src.services.conversations.factory import get_conversation_store
+from src.services.embeddings.factory import get_embeddings_client
+from src.services.llm.factory import get_llm_router
+from src.services.rag.answer_cache import SemanticAnswerCache
+from src.services.rag.pipeline import RAGPipeline
+
+
+def make_answer_cache(settings: Optional[Settings] = None) -> Optional[SemanticAnswerCache]:
+    if settings is None:
+        settings = get_settings()
+    if not settings.answer_cache_enabled:
+        return None
+
+    return SemanticAnswerCache(
+        similarity_threshold=settings.answer_cache_similarity_threshold,
+        ttl=settings.answer_cache_ttl,
+        max_entries_per_scope=settings.answer_cache_max_entries_per_scope,
+        max_scopes=settings.answer_cache_max_scopes,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Get the process-wide answer cache shared by the ask routes and invalidated by re-indexing"""
+    return make_answer_cache()
+
+
+def make_rag_pipeline(settings: Optional[Settings] = None) -> RAGPipeline:
+    """Factory function to create the RAG pipeline on top of the shared clients"""
+    if settings is None:
+        settings = get_settings()
+
+    return RAGPipeline(
+        embeddings_client=get_embeddings_client(),
+        llm_router=get_llm_router(),
+        top_k=settings.rag_top_k,
+        context_token_budget=settings.rag_context_token_budget,
+        embed_timeout=settings.rag_embed_timeout,
+        search_timeout=settings.rag_search_timeout,
+        first_token_timeout=settings.rag_first_token_timeout,
+        generation_timeout=settings.rag_generation_timeout,
+        answer_cache=get_answer_cache(),
+        conversation_store=get_conversation_store(),
+        hybrid_search_mode=settings.hybrid_search_mode,
+    )
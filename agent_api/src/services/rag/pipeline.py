@@ -0,0 +1,246 @@
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from loguru import logger
+
+from src.database import get_async_db_session
+from src.excetions import RAGStageTimeoutError
+from src.services.conversations.store import Conversation, ConversationStore
+from src.services.embeddings.jina_client import JinaEmbeddingsClient, estimate_tokens
+from src.services.llm.router import LLMRouter
+from src.services.pgvector.factory import get_async_pgvector_client
+from src.services.pgvector.pgvector import SearchResult
+from src.services.prompts.templates import RAG_ANSWER
+from src.services.rag.answer_cache import CachedAnswer, SemanticAnswerCache
+from src.services.sse import TokenBuffer
+
+
+# ``AsyncPostgresVectorClient`` method behind each ``hybrid_search_mode``.
+HYBRID_SEARCH_METHODS = {
+    "sequential": "search_hybrid",
+    "parallel": "search_hybrid_parallel",
+    "sql": "search_hybrid_sql",
+}
+
+
+@dataclass
+class StageTimings:
+    """Wall-clock duration of each pipeline stage, in milliseconds."""
+
+    stages: Dict[str, float] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start)
+
+    def record(self, stage: str, start: float) -> None:
+        self.stages[stage] = round((time.perf_counter() - start) * 1000, 2)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**{f"{stage}_ms": ms for stage, ms in self.stages.items()},
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 2)}
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value for the stages measured so far."""
+        return ", ".join(f"{stage};dur={ms}" for stage, ms in self.stages.items())
+
+
+@dataclass
+class PackedContext:
+    text: str
+    sources: List[SearchResult]
+    tokens: int
+
+
+def pack_context(hits: List[SearchResult], token_budget: int) -> PackedContext:
+    """Number the best hits into a context block that fits ``token_budget``.
+
+    Hits are taken in score order; a passage that does not fit is skipped so a
+    shorter one further down can still use the remaining budget.
+    """
+    parts = []
+    sources: List[SearchResult] = []
+    seen_texts = set()
+    used = 0
+    for hit in hits:
+        text = hit["text"].strip()
+        if not text or text in seen_texts:
+            continue
+        passage = f"[{len(sources) + 1}] {text}"
+        tokens = estimate_tokens(passage)
+        if used + tokens > token_budget:
+            continue
+        seen_texts.add(text)
+        parts.append(passage)
+        sources.append(hit)
+        used += tokens
+    return PackedContext(text="\n\n".join(parts), sources=sources, tokens=used)
+
+
+class RAGPipeline:
+    """Embed -> hybrid search -> pack context -> stream answer, each stage under its own timeout."""
+
+    def __init__(
+            self,
+            embeddings_client: JinaEmbeddingsClient,
+            llm_router: LLMRouter,
+            top_k: int = 8,
+            context_token_budget: int = 2000,
+            embed_timeout: float = 2.0,
+            search_timeout: float = 3.0,
+            first_token_timeout: float = 20.0,
+            generation_timeout: float = 120.0,
+            answer_cache: Optional[SemanticAnswerCache] = None,
+            conversation_store: Optional[ConversationStore] = None,
+            hybrid_search_mode: str = "sql",
+    ):
+        self.embeddings_client = embeddings_client
+        self.llm_router = llm_router
+        self.top_k = top_k
+        self.context_token_budget = context_token_budget
+        self.embed_timeout = embed_timeout
+        self.search_timeout = search_timeout
+        self.first_token_timeout = first_token_timeout
+        self.generation_timeout = generation_timeout
+        self.answer_cache = answer_cache
+        self.conversation_store = conversation_store
+        if hybrid_search_mode not in HYBRID_SEARCH_METHODS:
+            raise ValueError(f"Unknown hybrid search mode: {hybrid_search_mode}")
+        self.hybrid_search_mode = hybrid_search_mode
+
+    async def embed_query(self, query: str, timings: StageTimings) -> Optional[List[float]]:
+        """Embed the query; None (keyword-only search, no answer cache) if the embeddings service is slow or down."""
+        with timings.measure("embed"):
+            try:
+                async with asyncio.timeout(self.embed_timeout):
+                    return await self.embeddings_client.embed_query(query)
+            except TimeoutError:
+                logger.warning(f"Query embedding exceeded {self.embed_timeout}s, falling back to BM25 search")
+            except Exception as e:
+                logger.warning(f"Query embedding failed, falling back to BM25 search: {e}")
+        return None
+
+    def cached_answer(
+            self,
+            event_id: Optional[uuid.UUID],
+            query_embedding: Optional[List[float]],
+            timings: StageTimings,
+    ) -> Optional[CachedAnswer]:
+        if self.answer_cache is None or query_embedding is None:
+            return None
+        with timings.measure("cache"):
+            return self.answer_cache.lookup("rag", event_id, query_embedding)
+
+    async def _search(
+            self,
+            query: str,
+            query_embedding: Optional[List[float]],
+            event_id: Optional[uuid.UUID],
+    ) -> List[SearchResult]:
+        event_ids = [event_id] if event_id else None
+        try:
+            async with asyncio.timeout(self.search_timeout):
+                async with get_async_db_session() as session:
+                    client = get_async_pgvector_client(session)
+                    if query_embedding is None:
+                        return await client.search_bm25(query, size=self.top_k, event_ids=event_ids)
+                    search_hybrid = getattr(client, HYBRID_SEARCH_METHODS[self.hybrid_search_mode])
+                    return await search_hybrid(query, query_embedding, size=self.top_k, event_ids=event_ids)
+        except TimeoutError:
+            raise RAGStageTimeoutError(f"Hybrid search exceeded {self.search_timeout}s")
+
+    async def retrieve(
+            self,
+            query: str,
+            query_embedding: Optional[List[float]],
+            event_id: Optional[uuid.UUID],
+            timings: StageTimings,
+    ) -> PackedContext:
+        """Run hybrid search and context packing for an embedded query."""
+        with timings.measure("search"):
+            hits = await self._search(query, query_embedding, event_id)
+        with timings.measure("pack"):
+            context = pack_context(hits, self.context_token_budget)
+
+        logger.info(
+            f"Retrieved {len(context.sources)}/{len(hits)} chunks ({context.tokens} tokens) "
+            f"for event={event_id}: {timings.as_dict()}"
+        )
+        return context
+
+    async def stream_answer(
+            self,
+            query: str,
+            context: PackedContext,
+            timings: StageTimings,
+            event_id: Optional[uuid.UUID] = None,
+            query_embedding: Optional[List[float]] = None,
+            conversation: Optional[Conversation] = None,
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Yield the answer tokens, then a final event with the backend and all stage timings.
+
+        The first token must arrive within ``first_token_timeout`` and the whole
+        answer within ``generation_timeout`` of the request to the model. The
+        prompt carries the ``conversation`` history, and a complete answer is
+        recorded in it; only answers to a first question are stored in the
+        answer cache under ``query_embedding``, since follow-ups depend on history.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        first_token_deadline = loop.time() + min(self.first_token_timeout, self.generation_timeout)
+        generation_deadline = loop.time() + self.generation_timeout
+        answer = TokenBuffer()
+        follow_up = conversation is not None and conversation.has_history
+        history = conversation.history() if conversation is not None else []
+        prompt = RAG_ANSWER.render(history=history, context=context.text or "No event context was found.", question=query)
+        stream = self.llm_router.stream(prompt)
+        chunk_iterator = aiter(stream)
+
+        try:
+            while True:
+                # Only the wait for the next chunk is timed; yielding happens outside the timeout scope.
+                try:
+                    async with asyncio.timeout_at(generation_deadline if answer else first_token_deadline):
+                        text = await anext(chunk_iterator)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    stage = "generate" if answer else "first_token"
+                    logger.warning(f"RAG answer timed out waiting for {stage}")
+                    timings.record("generate", start)
+                    yield {"error": f"Timed out waiting for {stage}", "done": True, "timings": timings.as_dict()}
+                    return
+
+                if not answer:
+                    timings.record("first_token", start)
+                answer.append(text)
+                yield text
+        finally:
+            await stream.aclose()
+
+        timings.record("generate", start)
+        if conversation is not None and self.conversation_store is not None and answer:
+            self.conversation_store.record(conversation, query, answer.text())
+        if self.answer_cache is not None and query_embedding is not None and answer and not follow_up:
+            self.answer_cache.store(
+                "rag", event_id, query, query_embedding, answer.text(),
+                extra={"sources": context.sources, "context_tokens": context.tokens},
+                # An unscoped answer may change when any event is re-indexed.
+                depends_on=frozenset([str(event_id)]) if event_id else None,
+            )
+        yield {
+            "done": True,
+            "backend": stream.backend,
+            "model": stream.model,
+            "prompt_tokens": prompt.tokens,
+            "timings": timings.as_dict(),
+        }
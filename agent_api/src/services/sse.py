@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import anyio
+from fastapi import Request
+from loguru import logger
+
+
+_END = object()
+
+
+def sse_event(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + json.dumps(payload, separators=(",", ":")).encode("utf-8") + b"\n\n"
+
+
+class TokenBuffer:
+    """Answer text collected token by token and joined only when it is read."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+
+    def append(self, text: str) -> None:
+        self._parts.append(text)
+        self._length += len(text)
+
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def __len__(self) -> int:
+        return self._length
+
+
+async def stream_events(
+        events: AsyncIterator[Union[str, Dict[str, Any]]],
+        request: Optional[Request] = None,
+        flush_interval: float = 0.025,
+        max_frame_chars: int = 2048,
+        queue_size: int = 64,
+        cancel_timeout: float = 2.0,
+) -> AsyncIterator[bytes]:
+    """Encode a token stream as server-sent events.
+
+    ``events`` yields answer tokens (``str``) and control events (``dict``).
+    Tokens that arrive within ``flush_interval`` of each other are sent as one
+    ``{"chunk": ...}`` frame, so JSON encoding and socket writes happen per frame
+    rather than per token; the first frame is flushed immediately to keep time to
+    first token low. Control events are sent as they are, after any pending
+    tokens. An exception from ``events`` becomes a final ``{"error": ...}`` event.
+
+    The upstream is read by a pump task into a bounded queue: when the client
+    reads slowly the queue fills and the pump stops pulling tokens from the
+    model; a coalesced generation is held back by its slowest subscriber (see
+    :class:`SingleFlightStreams`). Once the client disconnects, or this generator is closed or cancelled,
+    the pump is cancelled and ``events`` is closed, which aborts the upstream
+    generation. That cleanup is shielded from the cancellation of the request
+    itself and given at most ``cancel_timeout`` seconds.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def pump() -> None:
+        try:
+            async for item in events:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_END)
+
+    pump_task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+    first_frame = True
+    try:
+        while True:
+            item = await queue.get()
+            tokens: List[str] = []
+            if isinstance(item, str):
+                tokens.append(item)
+                size = len(item)
+                deadline = loop.time() + (0 if first_frame else flush_interval)
+                item = None
+                while size < max_frame_chars:
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            next_item = await queue.get()
+                    except TimeoutError:
+                        break
+                    if not isinstance(next_item, str):
+                        item = next_item
+                        break
+                    tokens.append(next_item)
+                    size += len(next_item)
+
+            frame = sse_event({"chunk": "".join(tokens)}) if tokens else b""
+            first_frame = first_frame and not tokens
+
+            if item is _END:
+                if frame:
+                    yield frame
+                return
+            if isinstance(item, BaseException):
+                logger.error(f"Streaming response failed: {item!r}")
+                yield frame + sse_event({"error": str(item), "done": True})
+                return
+            yield frame + sse_event(item) if item is not None else frame
+
+            if request is not None and await request.is_disconnected():
+                logger.info("Client disconnected, stopping stream")
+                return
+    finally:
+        pump_task.cancel()
+        with anyio.move_on_after(cancel_timeout, shield=True) as cleanup:
+            with contextlib.suppress(asyncio.CancelledError):
+                await pump_task
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        if cleanup.cancelled_caught:
+            logger.warning(f"Upstream stream did not close within {cancel_timeout}s")
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from src.config import Settings, get_settings
+from src.services.azure.client import AzureTranscriptionClient
+from src.services.transcription.scheduler import TranscriptionJobScheduler
+
+
+def make_transcription_scheduler(
+        transcription_client: AzureTranscriptionClient,
+        settings: Optional[Settings] = None
+) -> TranscriptionJobScheduler:
+    """Factory function to create the transcription job scheduler"""
+    if settings is None:
+        settings = get_settings()
+
+    return TranscriptionJobScheduler(
+        transcription_client=transcription_client,
+        poll_interval=settings.transcription_poll_interval,
+        max_poll_interval=settings.transcription_max_poll_interval,
+        backoff_factor=settings.transcription_backoff_factor,
+        job_timeout=settings.transcription_job_timeout,
+        max_concurrency=settings.transcription_max_concurrency,
+        tick_interval=settings.transcription_scheduler_tick,
+    )
@@ -0,0 +1,232 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import httpx
+from loguru import logger
+from sqlalchemy import select, update
+
+from src.database import get_async_db_session
+from src.excetions import TranscriptionException
+from src.models.events import Event
+from src.models.transcription import (
+    ACTIVE_JOB_STATUSES,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    TranscriptionJob,
+)
+from src.services.azure.client import AzureTranscriptionClient
+from src.services.indexing.hybrid_indexing import reindex_event
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TranscriptionJobScheduler:
+    """Drives Azure batch transcription jobs stored in the ``transcription_job`` table.
+
+    Jobs are claimed with ``FOR UPDATE SKIP LOCKED`` and leased by pushing their
+    ``next_poll_at`` forward, so several workers can share the table and jobs left
+    behind by a restart are picked up again on the next tick.
+
+    Re-indexing a finished event is handed to a separate worker through a queue
+    once the job is committed, so a slow re-index never holds a job's session or
+    delays the next tick.
+    """
+
+    def __init__(
+            self,
+            transcription_client: AzureTranscriptionClient,
+            poll_interval: float = 10.0,
+            max_poll_interval: float = 120.0,
+            backoff_factor: float = 1.5,
+            job_timeout: int = 7200,
+            max_concurrency: int = 4,
+            tick_interval: float = 2.0,
+    ):
+        self.client = transcription_client
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+        self.job_timeout = timedelta(seconds=job_timeout)
+        self.max_concurrency = max_concurrency
+        self.tick_interval = tick_interval
+        self._wakeup = asyncio.Event()
+        self._reindex_queue: "asyncio.Queue[uuid.UUID]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._reindex_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background polling loop and the re-index worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._reindex_task = asyncio.create_task(self._run_reindexes())
+            logger.info("Transcription job scheduler started")
+
+    async def stop(self) -> None:
+        """Stop the background polling loop and the re-index worker."""
+        if self._task is not None:
+            for task in (self._task, self._reindex_task):
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+            self._reindex_task = None
+            if not self._reindex_queue.empty():
+                logger.warning(f"{self._reindex_queue.qsize()} event re-indexes dropped on shutdown")
+            logger.info("Transcription job scheduler stopped")
+
+    async def create_job(self, event_id: uuid.UUID, blob_name: str) -> TranscriptionJob:
+        """Persist a new job for an uploaded blob and wake the scheduler."""
+        async with get_async_db_session() as session:
+            job = TranscriptionJob(
+                event_id=event_id,
+                blob_name=blob_name,
+                status=JOB_PENDING,
+                next_poll_at=_utc_now(),
+            )
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+
+        self._wakeup.set()
+        return job
+
+    async def run_once(self) -> int:
+        """Claim the jobs that are due and advance each of them by one step."""
+        job_ids = await self._claim_due_jobs()
+        if job_ids:
+            await asyncio.gather(*(self._process_job(job_id) for job_id in job_ids))
+        return len(job_ids)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcription scheduler tick failed: {e}", exc_info=True)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.tick_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_due_jobs(self) -> List[uuid.UUID]:
+        now = _utc_now()
+        lease_until = now + timedelta(seconds=self.max_poll_interval)
+
+        async with get_async_db_session() as session:
+            due = (
+                select(TranscriptionJob.id)
+                .where(
+                    TranscriptionJob.status.in_(ACTIVE_JOB_STATUSES),
+                    TranscriptionJob.next_poll_at <= now,
+                )
+                .order_by(TranscriptionJob.next_poll_at)
+                .limit(self.max_concurrency)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = (
+                update(TranscriptionJob)
+                .where(TranscriptionJob.id.in_(due.scalar_subquery()))
+                .values(next_poll_at=lease_until)
+                .returning(TranscriptionJob.id)
+            )
+            job_ids = list((await session.execute(stmt)).scalars().all())
+            await session.commit()
+        return job_ids
+
+    async def _run_reindexes(self) -> None:
+        while True:
+            await self._reindex_next()
+
+    async def _reindex_next(self) -> None:
+        event_id = await self._reindex_queue.get()
+        try:
+            await reindex_event(event_id)
+        except Exception as e:
+            logger.error(f"Re-indexing event {event_id} after transcription failed: {e}", exc_info=True)
+        finally:
+            self._reindex_queue.task_done()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = self.poll_interval * (self.backoff_factor ** attempts)
+        return timedelta(seconds=min(delay, self.max_poll_interval))
+
+    async def _process_job(self, job_id: uuid.UUID) -> None:
+        async with get_async_db_session() as session:
+            job = await session.get(TranscriptionJob, job_id)
+            if job is None or job.status not in ACTIVE_JOB_STATUSES:
+                return
+
+            try:
+                if _utc_now() - job.created_at > self.job_timeout:
+                    await self._fail(job, "Transcription job timed out")
+                elif job.azure_job_url is None:
+                    job.azure_job_url = await self.client.submit_transcription(job.blob_name)
+                    job.status = JOB_RUNNING
+                    job.next_poll_at = _utc_now() + self._backoff(0)
+                    logger.info(f"Transcription job {job.id} submitted to Azure")
+                else:
+                    await self._poll(session, job)
+
+            except TranscriptionException as e:
+                await self._fail(job, str(e))
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                job.attempts += 1
+                job.error = str(e)
+                job.next_poll_at = _utc_now() + self._backoff(job.attempts)
+                logger.warning(f"Transcription job {job.id} poll error, retrying: {e}")
+
+            await session.commit()
+
+        if job.status == JOB_SUCCEEDED:
+            self._reindex_queue.put_nowait(job.event_id)
+
+    async def _poll(self, session, job: TranscriptionJob) -> None:
+        status_data = await self.client.get_transcription_status(job.azure_job_url)
+        status = status_data['status']
+        logger.info(f"Transcription job {job.id} status: {status}")
+
+        if status == "Succeeded":
+            transcription = await self.client.fetch_transcription_text(status_data)
+            if not transcription:
+                await self._fail(job, "Transcription failed. No text extracted.")
+                return
+
+            event = await session.get(Event, job.event_id)
+            if event is None:
+                await self._fail(job, "Event no longer exists")
+                return
+
+            event.transcription = transcription
+            job.status = JOB_SUCCEEDED
+            job.error = None
+            job.transcription_length = len(transcription)
+            job.completed_at = _utc_now()
+            await self.client.delete_blob(job.blob_name)
+            logger.info(f"Event {job.event_id} transcription stored successfully")
+
+        elif status == "Failed":
+            err = status_data.get('properties', {}).get('error', 'Unknown error')
+            await self._fail(job, str(err))
+
+        else:
+            job.attempts += 1
+            job.next_poll_at = _utc_now() + self._backoff(job.attempts)
+
+    async def _fail(self, job: TranscriptionJob, error: str) -> None:
+        logger.error(f"Transcription job {job.id} failed: {error}")
+        job.status = JOB_FAILED
+        job.error = error
+        job.completed_at = _utc_now()
+        await self.client.delete_blob(job.blob_name)
@@ -0,0 +1,145 @@
+"""Local stand-ins for the Azure services used by the transcription pipeline."""
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+
+# Azurite's well-known development account; SAS tokens are signed locally, nothing is contacted.
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
+
+class FakeAzureSpeech:
+    """In-process fake of the Azure batch transcription REST API (v3.2).
+
+    Each job walks through ``statuses`` one poll at a time and then keeps the
+    last one. ``fail_next`` makes the next requests answer 503, to exercise
+    retries.
+    """
+
+    base_url = "https://fake-speech.test/speechtotext/v3.2"
+    results_url = "https://fake-results.test"
+
+    def __init__(self, key: str = "test-key", statuses: Optional[List[str]] = None, text: str = "hello from the keynote"):
+        self.key = key
+        self.statuses = statuses or ["NotStarted", "Running", "Succeeded"]
+        self.text = text
+        self.fail_next = 0
+        self.jobs: Dict[str, Dict] = {}
+        self.requests: List[httpx.Request] = []
+        self._ids = itertools.count(1)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail_next:
+            self.fail_next -= 1
+            return httpx.Response(503, json={"error": "try again"})
+
+        url = str(request.url)
+        if url.startswith(self.results_url):
+            return httpx.Response(200, json={"combinedRecognizedPhrases": [{"display": self.text}]})
+        if request.headers.get("Ocp-Apim-Subscription-Key") != self.key:
+            return httpx.Response(401, json={"error": "bad key"})
+
+        path = url[len(self.base_url):]
+        if request.method == "POST" and path == "/transcriptions":
+            body = json.loads(request.content)
+            if not body.get("contentUrls"):
+                return httpx.Response(400, json={"error": "contentUrls is required"})
+            job_id = str(next(self._ids))
+            self.jobs[job_id] = {"polls": 0, "contentUrls": body["contentUrls"]}
+            return httpx.Response(201, json={"self": f"{self.base_url}/transcriptions/{job_id}", "status": "NotStarted"})
+
+        parts = path.strip("/").split("/")
+        if request.method == "GET" and parts[0] == "transcriptions" and parts[1] in self.jobs:
+            job_id = parts[1]
+            if len(parts) == 3 and parts[2] == "files":
+                return httpx.Response(200, json={"values": [
+                    {"kind": "TranscriptionReport", "links": {"contentUrl": f"{self.results_url}/{job_id}/report.json"}},
+                    {"kind": "Transcription", "links": {"contentUrl": f"{self.results_url}/{job_id}/0.json"}},
+                ]})
+            job = self.jobs[job_id]
+            status = self.statuses[min(job["polls"], len(self.statuses) - 1)]
+            job["polls"] += 1
+            document = {"self": f"{self.base_url}/transcriptions/{job_id}", "status": status}
+            if status == "Succeeded":
+                document["links"] = {"files": f"{self.base_url}/transcriptions/{job_id}/files"}
+            if status == "Failed":
+                document["properties"] = {"error": {"code": "InvalidData", "message": "audio could not be decoded"}}
+            return httpx.Response(200, json=document)
+
+        return httpx.Response(404, json={"error": "not found"})
+
+
+class FakeBlobStorage:
+    """Azurite-style blob endpoint on a local port that accepts block uploads.
+
+    Request bodies are read in small pieces and thrown away, only their sizes
+    are kept, so the server itself adds next to nothing to the process's memory.
+    Use as a context manager; ``connection_string`` points the Azure SDK at it.
+    """
+
+    def __init__(self):
+        self.staged: Dict[str, int] = {}
+        self.committed: Dict[str, List[str]] = {}
+        storage = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_PUT(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                length = int(self.headers.get("Content-Length", 0))
+                if query.get("comp") == ["blocklist"]:
+                    body = self.rfile.read(length)
+                    storage.committed[url.path] = [block.decode() for block in re.findall(rb"<Latest>([^<]+)</Latest>", body)]
+                else:
+                    remaining = length
+                    while remaining:
+                        piece = self.rfile.read(min(remaining, 1 << 16))
+                        if not piece:
+                            break
+                        remaining -= len(piece)
+                    if query.get("comp") == ["block"]:
+                        storage.staged[f"{url.path}:{query['blockid'][0]}"] = length
+                self.send_response(201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_DELETE(self):
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def connection_string(self) -> str:
+        port = self.server.server_address[1]
+        return AZURITE_CONNECTION_STRING.replace("127.0.0.1:10000", f"127.0.0.1:{port}")
+
+    def __enter__(self) -> "FakeBlobStorage":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
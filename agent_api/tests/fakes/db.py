@@ -0,0 +1,32 @@
+"""A minimal stand-in for ``AsyncSession`` holding rows in a dict keyed by (model, id)."""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+
+
+class FakeAsyncSession:
+    def __init__(self):
+        self.rows: Dict[Tuple[type, Any], Any] = {}
+        self.commits = 0
+
+    def put(self, model: type, row: Any) -> Any:
+        self.rows[(model, row.id)] = row
+        return row
+
+    async def get(self, model: type, ident: Any) -> Any:
+        return self.rows.get((model, ident))
+
+    def add(self, row: Any) -> None:
+        self.rows[(type(row), row.id)] = row
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def refresh(self, row: Any) -> None:
+        pass
+
+    def factory(self):
+        """A drop-in for ``get_async_db_session`` that always yields this session."""
+        @asynccontextmanager
+        async def session_scope():
+            yield self
+        return session_scope
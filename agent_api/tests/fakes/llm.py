@@ -0,0 +1,117 @@
+"""In-process fakes of the Ollama and Groq HTTP APIs, with injectable latency and errors."""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, List
+
+import httpx
+
+
+class FakeLLMServer:
+    """Streams ``chunks`` for every generation request.
+
+    ``first_token_delay`` and ``chunk_delay`` add latency before the first and
+    every later chunk; ``fail_next`` makes the next requests answer
+    ``error_status``. Tracks the requests in flight and whether their streams
+    were closed early.
+    """
+
+    def __init__(
+            self,
+            chunks: List[str] = ("Hello", " world"),
+            first_token_delay: float = 0.0,
+            chunk_delay: float = 0.0,
+            error_status: int = 500,
+    ):
+        self.chunks = list(chunks)
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.error_status = error_status
+        self.fail_next = 0
+        self.requests: List[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.aborted = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport())
+
+    def encode(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    def end(self) -> bytes:
+        return b""
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        finished = False
+        try:
+            for index, text in enumerate(self.chunks):
+                await asyncio.sleep(self.first_token_delay if index == 0 else self.chunk_delay)
+                yield self.encode(text)
+            yield self.end()
+            finished = True
+        finally:
+            self.in_flight -= 1
+            if finished:
+                self.completed += 1
+            else:
+                self.aborted += 1
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append({"url": str(request.url), "body": json.loads(request.content or b"{}"), "at": time.perf_counter()})
+        if self.fail_next:
+            self.fail_next -= 1
+            return httpx.Response(self.error_status, json={"error": "injected failure"})
+        return self.respond(request)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        raise NotImplementedError
+
+
+class FakeOllama(FakeLLMServer):
+    """``POST /api/generate`` streaming newline-delimited JSON, and ``GET /api/version``."""
+
+    base_url = "http://fake-ollama.test"
+
+    def encode(self, text: str) -> bytes:
+        return json.dumps({"response": text, "done": False}).encode() + b"\n"
+
+    def end(self) -> bytes:
+        return json.dumps({"response": "", "done": True}).encode() + b"\n"
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/version":
+            return httpx.Response(200, json={"version": "0.0.0-fake"})
+        if request.method == "POST" and request.url.path == "/api/generate":
+            return httpx.Response(200, content=self._body(), headers={"Content-Type": "application/x-ndjson"})
+        return httpx.Response(404, json={"error": "not found"})
+
+
+class FakeGroq(FakeLLMServer):
+    """OpenAI-style ``POST /openai/v1/chat/completions`` streaming server-sent events."""
+
+    def encode(self, text: str) -> bytes:
+        chunk = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n".encode()
+
+    def end(self) -> bytes:
+        return b"data: [DONE]\n\n"
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and request.url.path.endswith("/chat/completions"):
+            return httpx.Response(200, content=self._body(), headers={"Content-Type": "text/event-stream"})
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"object": "list", "data": []})
+        return httpx.Response(404, json={"error": "not found"})
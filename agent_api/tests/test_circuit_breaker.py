@@ -0,0 +1,96 @@
+import asyncio
+
+from src.services.llm.backends import BaseLLMBackend
+from src.services.llm.health import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, CircuitBreaker, LLMHealthMonitor
+from src.services.llm.router import LLMRouter
+
+
+def rewind(breaker: CircuitBreaker, seconds: float) -> None:
+    """Move the breaker's timestamps ``seconds`` into the past."""
+    if breaker.opened_at is not None:
+        breaker.opened_at -= seconds
+    if breaker.probe_started_at is not None:
+        breaker.probe_started_at -= seconds
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("boom")
+    assert breaker.state == BREAKER_OPEN
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+    assert not breaker.allow_request()
+
+    rewind(breaker, 30)
+    assert breaker.available()
+    assert breaker.allow_request()
+    assert breaker.state == BREAKER_HALF_OPEN
+    assert not breaker.available()
+    assert [breaker.allow_request() for _ in range(5)] == [False] * 5
+
+
+def test_probe_outcome_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+    rewind(breaker, 30)
+    assert breaker.allow_request()
+    breaker.record_failure("still down")
+    assert breaker.state == BREAKER_OPEN
+    assert not breaker.allow_request()
+
+    rewind(breaker, 30)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert all(breaker.allow_request() for _ in range(5))
+
+
+def test_released_or_stale_probe_is_replaced():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    rewind(breaker, 30)
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+    rewind(breaker, 29)
+    assert not breaker.allow_request()
+    rewind(breaker, 1)
+    assert breaker.allow_request()
+
+
+class SlowBackend(BaseLLMBackend):
+    def __init__(self, name: str, gate: asyncio.Event):
+        super().__init__(name, model=f"{name}-model")
+        self.gate = gate
+        self.calls = 0
+
+    async def stream(self, prompt):
+        self.calls += 1
+        await self.gate.wait()
+        yield f"answer from {self.name}"
+
+
+def test_router_sends_one_request_to_a_half_open_backend():
+    async def scenario():
+        gate = asyncio.Event()
+        recovering, standby = SlowBackend("recovering", gate), SlowBackend("standby", gate)
+        monitor = LLMHealthMonitor({"recovering": None, "standby": None}, failure_threshold=1, reset_timeout=30)
+        monitor.record_failure("recovering", RuntimeError("down"))
+        rewind(monitor.breakers["recovering"], 30)
+        router = LLMRouter([recovering, standby], health_monitor=monitor, coalesce=False)
+
+        requests = [asyncio.create_task(router.generate(f"question {i}", prefer="recovering")) for i in range(4)]
+        await asyncio.sleep(0.01)
+        assert (recovering.calls, standby.calls) == (1, 3)
+        assert monitor.status()["recovering"]["available"] is False
+
+        gate.set()
+        responses = await asyncio.gather(*requests)
+        assert sorted(response.backend for response in responses) == ["recovering", "standby", "standby", "standby"]
+        assert monitor.breakers["recovering"].state == BREAKER_CLOSED
+
+    asyncio.run(scenario())
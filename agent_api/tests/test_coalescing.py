@@ -0,0 +1,75 @@
+import asyncio
+
+from src.services.llm.coalescing import SingleFlightStreams
+
+
+class CountingStream:
+    """Upstream generation of ``count`` tokens that records how many were pulled."""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.pulled = 0
+        self.backend, self.model = "fake", "fake-model"
+        self.closed = False
+
+    async def _tokens(self):
+        for index in range(self.count):
+            self.pulled += 1
+            yield f"t{index} "
+            await asyncio.sleep(0)
+
+    def __aiter__(self):
+        return self._tokens()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_subscribers_share_one_generation():
+    async def scenario():
+        flights = SingleFlightStreams()
+        upstreams = []
+
+        def open_stream():
+            upstreams.append(CountingStream(20))
+            return upstreams[-1]
+
+        async def read(stream):
+            try:
+                return "".join([text async for text in stream])
+            finally:
+                await stream.aclose()
+
+        answers = await asyncio.gather(*(read(flights.subscribe("key", open_stream)) for _ in range(3)))
+        return answers, upstreams
+
+    answers, upstreams = asyncio.run(scenario())
+    assert len(upstreams) == 1
+    assert answers[0] == answers[1] == answers[2] == "".join(f"t{i} " for i in range(20))
+
+
+def test_producer_waits_for_the_slowest_subscriber():
+    async def scenario():
+        flights = SingleFlightStreams(max_ahead=8)
+        upstream = CountingStream(1000)
+        fast = flights.subscribe("key", lambda: upstream)
+        slow = flights.subscribe("key", lambda: upstream)
+
+        slow_reader = aiter(slow)
+        await anext(slow_reader)
+        fast_reader = aiter(fast)
+        read_fast = [await anext(fast_reader) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        stalled_at = upstream.pulled
+
+        # Once the slow subscriber leaves, the producer follows the fast one again.
+        await slow_reader.aclose()
+        await slow.aclose()
+        rest = [text async for text in fast_reader]
+        await fast.aclose()
+        return stalled_at, len(read_fast) + len(rest), upstream
+
+    stalled_at, read, upstream = asyncio.run(scenario())
+    assert stalled_at <= 8 + 2
+    assert read == 1000
+    assert upstream.closed
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routers import ask
+from src.services.conversations.store import ConversationStore
+from src.services.embeddings.jina_client import estimate_tokens
+from src.services.llm.backends import BaseLLMBackend
+from src.services.llm.router import LLMRouter
+
+
+class EchoBackend(BaseLLMBackend):
+    def __init__(self):
+        super().__init__("groq", "fake-model")
+        self.prompts = []
+
+    async def stream(self, prompt):
+        self.prompts.append(prompt)
+        yield "the answer"
+
+
+def test_oversized_turns_are_clipped_to_the_window():
+    async def scenario():
+        store = ConversationStore(llm_router=LLMRouter([EchoBackend()]), history_token_budget=100)
+        conversation = store.get("session")
+        store.record(conversation, "why? " * 500, "because " * 500)
+        return conversation
+
+    conversation = asyncio.run(scenario())
+
+    [turn] = conversation.turns
+    assert conversation.pending == []
+    assert turn.tokens <= 100
+    assert estimate_tokens(turn.question) <= 50
+    assert turn.question.endswith("…") and turn.answer.endswith("…")
+
+
+def test_short_turns_are_kept_verbatim():
+    async def scenario():
+        store = ConversationStore(llm_router=LLMRouter([EchoBackend()]), history_token_budget=100)
+        conversation = store.get("session")
+        store.record(conversation, "who spoke?", "Ada did.")
+        return conversation
+
+    [turn] = asyncio.run(scenario()).turns
+    assert (turn.question, turn.answer) == ("who spoke?", "Ada did.")
+
+
+def test_stream_groq_records_the_question_in_an_event_session(monkeypatch):
+    backend = EchoBackend()
+    router = LLMRouter([backend], coalesce=False)
+    store = ConversationStore(llm_router=router)
+
+    async def no_cache(question):
+        return None
+
+    monkeypatch.setattr(ask, "get_llm_router", lambda: router)
+    monkeypatch.setattr(ask, "get_conversation_store", lambda: store)
+    monkeypatch.setattr(ask, "embed_for_answer_cache", no_cache)
+    app = FastAPI()
+    app.include_router(ask.router)
+    event_id = uuid.uuid4()
+    prompt = "Context: Transcription: " + "a very long transcript " * 200 + "\n\nQuestion: who spoke?"
+
+    with TestClient(app) as client:
+        response = client.post("/stream/groq", params={
+            "prompt": prompt, "conversation_id": "chat-1", "event_id": str(event_id), "question": "who spoke?",
+        })
+
+    assert response.status_code == 200
+    conversation = store._sessions["chat-1"]
+    assert conversation.event_id == str(event_id)
+    [turn] = conversation.turns
+    assert (turn.question, turn.answer) == ("who spoke?", "the answer")
@@ -0,0 +1,91 @@
+import asyncio
+from array import array
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.services.embeddings import cache as cache_module
+from src.services.embeddings.cache import EmbeddingCache, PostgresEmbeddingStore
+
+ASYNCPG_MAX_PARAMS = 32767
+
+
+class RecordingSession:
+    """Compiles every statement for PostgreSQL and answers lookups from ``rows``."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.param_counts = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        params = stmt.compile(dialect=postgresql.asyncpg.dialect()).params
+        # An expanding IN parameter becomes one bind parameter per element.
+        self.param_counts.append(sum(len(value) if isinstance(value, list) else 1 for value in params.values()))
+        keys = next((value for value in params.values() if isinstance(value, list)), [])
+        rows = [SimpleNamespace(key=key, embedding=self.rows[key]) for key in keys if key in self.rows]
+        return SimpleNamespace(all=lambda: rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = RecordingSession()
+
+    @asynccontextmanager
+    async def session_scope():
+        yield session
+
+    monkeypatch.setattr(cache_module, "get_async_db_session", session_scope)
+    return session
+
+
+def test_large_writes_stay_under_the_bind_parameter_limit(session):
+    entries = [(f"{i:064d}", "jina", "retrieval.passage", 3, [0.1, 0.2, 0.3]) for i in range(10_000)]
+
+    asyncio.run(PostgresEmbeddingStore().set_many(entries))
+
+    assert len(session.param_counts) == 10
+    assert max(session.param_counts) < ASYNCPG_MAX_PARAMS
+    assert session.commits == 1
+
+
+def test_large_lookups_are_batched_and_return_lists(session):
+    keys = [f"{i:064d}" for i in range(40_000)]
+    session.rows = {keys[0]: array("f", [0.5, 0.25]), keys[-1]: array("f", [1.0, 2.0])}
+
+    found = asyncio.run(PostgresEmbeddingStore(batch_size=5000).get_many(keys))
+
+    assert len(session.param_counts) == 8
+    assert max(session.param_counts) <= 5000
+    assert found == {keys[0]: [0.5, 0.25], keys[-1]: [1.0, 2.0]}
+
+
+def test_memory_tier_stores_float32_and_hands_out_lists():
+    cache = EmbeddingCache(max_size=2)
+    asyncio.run(cache.set_many([(key, "jina", "retrieval.query", 2, [0.5, 0.25]) for key in ("a", "b", "c")]))
+
+    assert all(isinstance(vector, array) and vector.typecode == "f" for vector in cache._lru.values())
+    found = asyncio.run(cache.get_many(["a", "c"]))
+    assert found == {"c": [0.5, 0.25]}
+    assert cache.stats()["misses"] == 1
+
+
+def test_health_route_reports_embedding_cache_hit_rates(monkeypatch):
+    from src.routers import ask
+
+    cache = EmbeddingCache(max_size=10)
+    asyncio.run(cache.set_many([("k1", "jina", "retrieval.query", 2, [0.5, 0.25])]))
+    asyncio.run(cache.get_many(["k1", "k2"]))
+    monitor = SimpleNamespace(status=lambda: {})
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(llm_health_monitor=monitor, llm_router=monitor)))
+    monkeypatch.setattr(ask, "get_embeddings_client", lambda: SimpleNamespace(cache=cache))
+    monkeypatch.setattr(ask, "get_conversation_store", lambda: SimpleNamespace(stats=lambda: {}))
+
+    health = asyncio.run(ask.llm_health(request))
+
+    assert health["embedding_cache"] == {"size": 1, "memory_hits": 1, "persistent_hits": 0, "misses": 1, "hit_rate": 0.5}
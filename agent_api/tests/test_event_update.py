@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import BackgroundTasks
+
+from src.models.events import Event
+from src.routers import events as events_router
+from src.services.rag.answer_cache import SemanticAnswerCache
+from tests.fakes.db import FakeAsyncSession
+
+START = datetime(2026, 3, 14, 9, 0, tzinfo=timezone.utc)
+END = datetime(2026, 3, 14, 11, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeAsyncSession()
+    monkeypatch.setattr(events_router, "get_async_db_session", session.factory())
+    return session
+
+
+@pytest.fixture
+def event(session):
+    return session.put(Event, Event(
+        id=uuid.uuid4(),
+        event_name="Keynote",
+        organizer="ACM",
+        chief_guest_name="Ada",
+        venue="Hall A",
+        start_time=START,
+        end_time=END,
+        transcription="hello",
+    ))
+
+
+def update(event: Event, **changes) -> BackgroundTasks:
+    values = dict(event_name="Keynote", organizer="ACM", chief_guest_name="Ada", venue="Hall A",
+                  start_time=START, end_time=END, transcription="hello")
+    values.update(changes)
+    tasks = BackgroundTasks()
+    asyncio.run(events_router.update_event(event.id, events_router.EventCreate(**values), tasks))
+    return tasks
+
+
+def test_naive_times_equal_to_the_stored_ones_change_nothing(event):
+    tasks = update(event, start_time=START.replace(tzinfo=None), end_time=END.replace(tzinfo=None))
+
+    assert event.start_time == START and event.start_time.tzinfo is not None
+    assert tasks.tasks == []
+
+
+def test_rescheduling_does_not_reindex(event):
+    later = datetime(2026, 3, 15, 9, 0)
+    tasks = update(event, start_time=later)
+
+    assert event.start_time == later.replace(tzinfo=timezone.utc)
+    assert tasks.tasks == []
+
+
+def test_text_change_reindexes(event):
+    tasks = update(event, venue="Hall B")
+
+    assert event.venue == "Hall B"
+    assert [(task.func, task.args) for task in tasks.tasks] == [(events_router.reindex_event, (event.id,))]
+
+
+def test_any_change_drops_cached_answers(event, monkeypatch):
+    cache = SemanticAnswerCache()
+    cache.store("groq", event.id, "When does it start?", [1.0, 0.0], "At 9.", depends_on=frozenset({str(event.id)}))
+    monkeypatch.setattr(events_router, "get_answer_cache", lambda: cache)
+
+    update(event, start_time=datetime(2026, 3, 15, 9, 0, tzinfo=timezone.utc))
+
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.routers import ask
+from src.services.rag.answer_cache import SemanticAnswerCache
+
+CONTEXT = "Context: Event: Keynote\nTranscription: " + "welcome everyone " * 200
+
+
+def fake_embedding(text: str):
+    # Distinct texts get unrelated vectors; equal texts get equal ones.
+    digest = hashlib.sha256(text.encode()).digest()
+    return [byte - 127.5 for byte in digest]
+
+
+class FakeRouter:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt, prefer=None):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=f"answer {len(self.prompts)}", backend="groq", model="fake")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SemanticAnswerCache()
+    monkeypatch.setattr(ask, "get_answer_cache", lambda: cache)
+
+    async def embed(text):
+        return fake_embedding(text)
+
+    monkeypatch.setattr(ask, "embed_for_answer_cache", embed)
+    return cache
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    router = FakeRouter()
+    monkeypatch.setattr(ask, "get_llm_router", lambda: router)
+    return router
+
+
+def ask_groq(question, event_id=None, keyed=True):
+    prompt = f"{CONTEXT}\n\nQuestion: {question}"
+    return asyncio.run(ask.ask_groq(prompt, event_id=event_id, question=question if keyed else None))
+
+
+def test_questions_about_one_event_do_not_share_answers(cache, llm):
+    event_id = uuid.uuid4()
+
+    first = ask_groq("Who spoke first?", event_id)
+    second = ask_groq("When did it end?", event_id)
+    again = ask_groq("Who spoke first?", event_id)
+
+    assert first["answer"] != second["answer"]
+    assert again == {"answer": first["answer"], "cached": True}
+    assert len(llm.prompts) == 2
+
+
+def test_prompts_without_event_and_question_bypass_the_cache(cache, llm):
+    ask_groq("Who spoke first?", keyed=False)
+    ask_groq("Who spoke first?", keyed=False)
+
+    assert len(llm.prompts) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_answers_are_dropped_with_their_event(cache, llm):
+    event_id, other_id = uuid.uuid4(), uuid.uuid4()
+    ask_groq("Who spoke first?", event_id)
+    ask_groq("Who spoke first?", other_id)
+
+    assert cache.invalidate(event_id) == 1
+    ask_groq("Who spoke first?", event_id)
+    assert ask_groq("Who spoke first?", other_id)["cached"] is True
+    assert len(llm.prompts) == 3
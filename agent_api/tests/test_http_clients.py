@@ -0,0 +1,16 @@
+import httpx
+
+from src.config import get_settings
+from src.services.groq.factory import get_groq_client
+
+
+def test_groq_client_keeps_a_bounded_timeout(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    get_groq_client.cache_clear()
+    try:
+        settings = get_settings()
+        timeout = get_groq_client().client.timeout
+    finally:
+        get_groq_client.cache_clear()
+
+    assert timeout == httpx.Timeout(settings.groq_timeout, connect=settings.groq_connect_timeout)
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import random
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import delete, insert
+
+from src.services.pgvector.pgvector import AsyncPostgresVectorClient
+from src.services.pgvector.reranker import Reranker
+from src.services.rag import pipeline as pipeline_module
+from src.services.rag.pipeline import HYBRID_SEARCH_METHODS, RAGPipeline
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+MODES = list(HYBRID_SEARCH_METHODS)
+
+
+def hit(chunk_id: str, score: float, source: str) -> dict:
+    return {"chunk_id": chunk_id, "event_id": "e1", "text": f"text of {chunk_id}", "score": score, "source": source, "metadata": {}}
+
+
+def test_pipeline_searches_with_the_configured_mode(monkeypatch):
+    called = []
+
+    class RecordingClient:
+        def __getattr__(self, name):
+            async def search(*args, **kwargs):
+                called.append(name)
+                return []
+            return search
+
+    @asynccontextmanager
+    async def session_scope():
+        yield None
+
+    monkeypatch.setattr(pipeline_module, "get_async_db_session", session_scope)
+    monkeypatch.setattr(pipeline_module, "get_async_pgvector_client", lambda session: RecordingClient())
+
+    for mode in MODES:
+        pipeline = RAGPipeline(embeddings_client=None, llm_router=None, hybrid_search_mode=mode)
+        asyncio.run(pipeline._search("question", [0.1, 0.2], None))
+    assert called == [HYBRID_SEARCH_METHODS[mode] for mode in MODES]
+
+    with pytest.raises(ValueError):
+        RAGPipeline(embeddings_client=None, llm_router=None, hybrid_search_mode="fastest")
+
+
+def test_sequential_and_parallel_fuse_the_same_legs(monkeypatch):
+    # Ties in both legs, chunks found by one leg only, and chunks found by both.
+    bm25 = [hit("a", 0.9, "bm25"), hit("b", 0.9, "bm25"), hit("c", 0.5, "bm25"), hit("d", 0.1, "bm25")]
+    vector = [hit("c", 0.8, "vector"), hit("e", 0.8, "vector"), hit("a", 0.7, "vector"), hit("f", 0.2, "vector")]
+
+    async def search_bm25(self, query, size=10, event_ids=None):
+        return bm25[:size]
+
+    async def search_vector(self, query_embedding, size=10, event_ids=None, exact=False):
+        return vector[:size]
+
+    monkeypatch.setattr(AsyncPostgresVectorClient, "search_bm25", search_bm25)
+    monkeypatch.setattr(AsyncPostgresVectorClient, "search_vector", search_vector)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    async def run(mode, reranker):
+        client = AsyncPostgresVectorClient(None, reranker=reranker, session_factory=session_factory)
+        return await getattr(client, HYBRID_SEARCH_METHODS[mode])("text of", [0.0], size=4)
+
+    for reranker in (None, Reranker()):
+        sequential = asyncio.run(run("sequential", reranker))
+        assert asyncio.run(run("parallel", reranker)) == sequential
+    assert [result["chunk_id"] for result in asyncio.run(run("sequential", None))] == ["a", "c", "b", "e"]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="set TEST_DATABASE_URL to a scratch PostgreSQL database with pgvector")
+def test_all_modes_return_identical_results_from_postgres():
+    from benchmarks.common import bootstrap_database, database_config, random_unit_vector, scratch_event, start_async_database
+    from src.models.events import Event, EventChunk
+    from src.services.indexing.hybrid_indexing import chunk_content_hash
+
+    async def scenario():
+        # An exact scan keeps both vector legs deterministic.
+        config = database_config(TEST_DATABASE_URL, vector_index_type="none")
+        bootstrap_database(config).teardown()
+        database = await start_async_database(config)
+        rng = random.Random(3)
+        words = ["keynote", "speaker", "research", "award", "panel", "students", "robotics", "climate"]
+        events = [scratch_event(event_name=f"modes {i}") for i in range(3)]
+        try:
+            async with database.get_session() as session:
+                session.add_all(events)
+                await session.commit()
+                rows = []
+                for i in range(300):
+                    chunk_text = " ".join(rng.choice(words) for _ in range(12)) + f" chunk {i}"
+                    rows.append({
+                        "event_id": events[i % len(events)].id,
+                        "search_text": chunk_text,
+                        "raw_text": chunk_text,
+                        "content_hash": chunk_content_hash(chunk_text),
+                        "embedding": random_unit_vector(rng, config.embedding_dimensions),
+                        "chunk_metadata": {"chunk_index": i},
+                    })
+                await session.execute(insert(EventChunk), rows)
+                await session.commit()
+
+            mismatches = []
+            for trial in range(10):
+                query = " ".join(rng.sample(words, 2))
+                embedding = random_unit_vector(rng, config.embedding_dimensions)
+                event_ids = [events[trial % len(events)].id] if trial % 2 else None
+                for reranker in (None, Reranker(latency_budget=60)):
+                    results = {}
+                    for mode in MODES:
+                        async with database.get_session() as session:
+                            client = AsyncPostgresVectorClient(
+                                session, index_type="none", reranker=reranker, session_factory=database.get_session,
+                            )
+                            search = getattr(client, HYBRID_SEARCH_METHODS[mode])
+                            results[mode] = await search(query, embedding, size=8, event_ids=event_ids)
+                    expected = results["sequential"]
+                    assert expected
+                    for mode in MODES:
+                        got = results[mode]
+                        if [r["chunk_id"] for r in got] != [r["chunk_id"] for r in expected] or \
+                                [r["score"] for r in got] != pytest.approx([r["score"] for r in expected]):
+                            mismatches.append((trial, mode, reranker is not None))
+            return mismatches
+        finally:
+            async with database.get_session() as session:
+                await session.execute(delete(Event).where(Event.id.in_([event.id for event in events])))
+                await session.commit()
+            await database.teardown()
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config import get_settings
+from src.excetions import LLMUnavailableError
+from src.services.groq.client import GroqClient
+from src.services.llm.backends import GroqBackend, OllamaBackend
+from src.services.llm.health import BREAKER_OPEN, LLMHealthMonitor
+from src.services.llm.router import LLMRouter
+from src.services.ollama.client import OllamClient
+from tests.fakes.llm import FakeGroq, FakeOllama
+
+
+def make_router(ollama_server: FakeOllama, groq_server: FakeGroq, **options) -> LLMRouter:
+    ollama = OllamClient(get_settings().model_copy(update={"ollama_host": FakeOllama.base_url}))
+    ollama.client = ollama_server.http_client()
+    groq = GroqClient(api_key="test-key", http_client=groq_server.http_client())
+    monitor = LLMHealthMonitor(
+        {"ollama": ollama.health_check, "groq": groq.health_check}, failure_threshold=1, reset_timeout=60,
+    )
+    return LLMRouter(
+        [OllamaBackend(ollama, model="fake-ollama"), GroqBackend(groq, model="fake-groq")],
+        health_monitor=monitor,
+        coalesce=False,
+        **options,
+    )
+
+
+@pytest.fixture
+def servers():
+    return FakeOllama(chunks=["from", " ollama"]), FakeGroq(chunks=["from", " groq"])
+
+
+def test_streams_from_the_preferred_backend(servers):
+    ollama, groq = servers
+    router = make_router(ollama, groq)
+
+    response = asyncio.run(router.generate("hi", prefer="groq"))
+
+    assert (response.text, response.backend, response.model) == ("from groq", "groq", "fake-groq")
+    assert (len(ollama.requests), groq.completed) == (0, 1)
+
+
+def test_fails_over_when_a_backend_errors_before_the_first_token(servers):
+    ollama, groq = servers
+    ollama.fail_next = 1
+    router = make_router(ollama, groq)
+
+    response = asyncio.run(router.generate("hi", prefer="ollama"))
+
+    assert (response.text, response.backend) == ("from groq", "groq")
+    assert len(ollama.requests) == 1
+    assert router.health_monitor.breakers["ollama"].state == BREAKER_OPEN
+    assert router.available_backends() == ["groq"]
+
+
+def test_fails_over_when_the_first_token_is_late(servers):
+    ollama, groq = servers
+    ollama.first_token_delay = 5.0
+    router = make_router(ollama, groq, first_token_timeout=0.1)
+
+    started = time.perf_counter()
+    response = asyncio.run(router.generate("hi", prefer="ollama"))
+
+    assert response.backend == "groq"
+    assert time.perf_counter() - started < 2.0
+    # The slow upstream response was closed rather than left running.
+    assert (ollama.aborted, ollama.in_flight) == (1, 0)
+
+
+def test_a_slow_backend_after_the_first_token_is_not_abandoned(servers):
+    ollama, groq = servers
+    ollama.chunk_delay = 0.3
+    router = make_router(ollama, groq, first_token_timeout=0.1)
+
+    response = asyncio.run(router.generate("hi", prefer="ollama"))
+
+    assert (response.text, response.backend) == ("from ollama", "ollama")
+    assert len(groq.requests) == 0
+
+
+def test_every_backend_failing_raises_unavailable(servers):
+    ollama, groq = servers
+    ollama.fail_next = 1
+    groq.fail_next, groq.error_status = 1, 400
+    router = make_router(ollama, groq)
+
+    with pytest.raises(LLMUnavailableError, match="ollama.*groq"):
+        asyncio.run(router.generate("hi"))
+
+
+def test_a_saturated_preferred_backend_spills_over(servers):
+    ollama, groq = servers
+    ollama.chunk_delay = 0.2
+    router = make_router(ollama, groq, max_concurrency={"ollama": 1, "groq": 4})
+
+    async def scenario():
+        return await asyncio.gather(*(router.generate(f"question {i}", prefer="ollama") for i in range(3)))
+
+    responses = asyncio.run(scenario())
+
+    assert sorted(response.backend for response in responses) == ["groq", "groq", "ollama"]
+    assert ollama.max_in_flight == 1
+
+
+def test_waiting_for_a_saturated_backend_is_bounded(servers):
+    ollama, groq = servers
+    ollama.chunk_delay = 1.0
+    router = make_router(ollama, groq, max_concurrency={"ollama": 1}, queue_timeout=0.1)
+    router.backends.pop("groq")
+
+    async def scenario():
+        first = asyncio.create_task(router.generate("first"))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        with pytest.raises(LLMUnavailableError, match="saturated"):
+            await router.generate("second")
+        waited = time.perf_counter() - started
+        first.cancel()
+        return waited
+
+    assert asyncio.run(scenario()) < 0.5
+    assert len(ollama.requests) == 1
+
+
+def test_unpreferred_requests_go_to_the_fastest_backend(servers):
+    ollama, groq = servers
+    ollama.first_token_delay = 0.2
+    router = make_router(ollama, groq)
+
+    async def scenario():
+        return [(await router.generate(f"question {i}")).backend for i in range(4)]
+
+    # Both backends are sampled once, then the faster one takes the traffic.
+    assert asyncio.run(scenario()) == ["ollama", "groq", "groq", "groq"]
+    assert router.latency_ms["ollama"] > router.latency_ms["groq"]
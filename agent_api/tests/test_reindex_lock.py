@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import TextClause
+
+from src.services.indexing import hybrid_indexing
+from src.services.indexing.hybrid_indexing import event_lock_key, reindex_event
+
+
+class ChunkDatabase:
+    """Stored chunks, event rows and advisory locks shared by every session, like one PostgreSQL database."""
+
+    def __init__(self):
+        self.events = {}
+        self.chunks = {}
+        self.locks = defaultdict(asyncio.Lock)
+        self.ids = itertools.count(1)
+
+    @asynccontextmanager
+    async def session(self):
+        session = ChunkSession(self)
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
+class ChunkSession:
+    """Transaction on a :class:`ChunkDatabase`: writes apply on commit, locks are held until then."""
+
+    def __init__(self, database: ChunkDatabase):
+        self.database = database
+        self.held = []
+        self.inserts = []
+        self.deletes = []
+
+    async def execute(self, stmt, params=None):
+        if isinstance(stmt, TextClause):
+            assert "pg_advisory_xact_lock" in stmt.text
+            lock = self.database.locks[params["key"]]
+            if lock not in self.held:
+                await lock.acquire()
+                self.held.append(lock)
+            return None
+        if stmt.is_select:
+            rows = [SimpleNamespace(id=chunk_id, **chunk) for chunk_id, chunk in self.database.chunks.items()]
+            return SimpleNamespace(all=lambda: rows)
+        if stmt.is_insert:
+            self.inserts.extend(params)
+        elif stmt.is_delete:
+            compiled = stmt.compile(dialect=postgresql.asyncpg.dialect()).params
+            self.deletes.extend(next(value for value in compiled.values() if isinstance(value, list)))
+        return None
+
+    async def get(self, model, ident):
+        return self.database.events.get(ident)
+
+    async def commit(self):
+        for chunk_id in self.deletes:
+            self.database.chunks.pop(chunk_id, None)
+        for row in self.inserts:
+            self.database.chunks[next(self.database.ids)] = {
+                "event_id": row["event_id"], "content_hash": row["content_hash"], "chunk_metadata": row["chunk_metadata"],
+            }
+        self.inserts, self.deletes = [], []
+        self._release()
+
+    async def rollback(self):
+        self.inserts, self.deletes = [], []
+        self._release()
+
+    def _release(self):
+        for lock in self.held:
+            lock.release()
+        self.held = []
+
+
+class SlowEmbeddings:
+    async def embed_passage(self, texts, batch_size):
+        await asyncio.sleep(0.05)
+        return [[0.0] for _ in texts]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = ChunkDatabase()
+    monkeypatch.setattr(hybrid_indexing, "get_async_db_session", database.session)
+    monkeypatch.setattr(hybrid_indexing, "get_embeddings_client", SlowEmbeddings)
+    monkeypatch.setattr(hybrid_indexing, "get_answer_cache", lambda: None)
+    return database
+
+
+def make_event(transcription: str):
+    return SimpleNamespace(
+        id=uuid.uuid4(), event_name="Keynote", organizer="CS", chief_guest_name="Ada", venue="Hall",
+        transcription=transcription,
+    )
+
+
+def test_overlapping_reindexes_of_one_event_do_not_duplicate_chunks(database):
+    event = make_event("the keynote covered retrieval " * 30)
+    database.events[event.id] = event
+
+    async def scenario():
+        return await asyncio.gather(reindex_event(event.id), reindex_event(event.id))
+
+    first, second = asyncio.run(scenario())
+
+    assert len(database.chunks) == first["chunks_created"] == 1
+    assert (first["chunks_indexed"], second["chunks_indexed"]) == (1, 0)
+
+
+def test_the_later_reindex_indexes_the_newer_row(database):
+    event = make_event("original talk " * 40)
+    database.events[event.id] = event
+
+    async def scenario():
+        first = asyncio.create_task(reindex_event(event.id))
+        await asyncio.sleep(0.01)
+        event.transcription = "edited talk " * 40
+        second = asyncio.create_task(reindex_event(event.id))
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+
+    [chunk] = database.chunks.values()
+    assert chunk["content_hash"] == hybrid_indexing.chunk_content_hash(
+        hybrid_indexing.chunk_event_data(
+            hybrid_indexing.EventTextChunker(), hybrid_indexing.event_to_index_data(event)
+        )[0].text
+    )
+
+
+def test_lock_keys_fit_a_bigint():
+    keys = {event_lock_key(uuid.uuid4()) for _ in range(1000)}
+    assert len(keys) == 1000
+    assert all(-2 ** 63 <= key < 2 ** 63 for key in keys)
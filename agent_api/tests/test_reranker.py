@@ -0,0 +1,38 @@
+import asyncio
+
+from src.services.pgvector.reranker import Reranker
+
+
+def fused_hits(count: int):
+    # Later hits mention the query more, so re-ranking reverses the fused order.
+    return [
+        {"chunk_id": f"c{i}", "event_id": "e", "text": "keynote " * i, "score": 1.0 / (60 + i), "source": "hybrid", "metadata": {}}
+        for i in range(count)
+    ]
+
+
+def test_hits_beyond_the_budget_follow_the_reranked_head():
+    hits = fused_hits(8)
+    reranker = Reranker(candidate_budget=3)
+
+    results = reranker.rerank("keynote", hits, size=6)
+
+    assert [hit["chunk_id"] for hit in results] == ["c2", "c1", "c0", "c3", "c4", "c5"]
+    assert [hit["source"] for hit in results] == ["reranked"] * 3 + ["hybrid"] * 3
+    assert results[3]["score"] == hits[3]["score"]
+
+
+def test_async_rerank_matches_sync():
+    reranker = Reranker(candidate_budget=3)
+    hits = fused_hits(8)
+
+    assert asyncio.run(reranker.arerank("keynote", hits, size=8)) == Reranker(candidate_budget=3).rerank("keynote", hits, size=8)
+
+
+def test_exhausted_latency_budget_keeps_fused_order():
+    reranker = Reranker(candidate_budget=5, latency_budget=0)
+
+    results = reranker.rerank("keynote", fused_hits(5), size=5)
+
+    assert [hit["chunk_id"] for hit in results] == ["c0", "c1", "c2", "c3", "c4"]
+    assert all(hit["source"] == "hybrid" for hit in results)
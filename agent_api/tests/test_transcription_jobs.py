@@ -0,0 +1,197 @@
+import asyncio
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.models.events import Event
+from src.models.transcription import JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, TranscriptionJob
+from src.services.azure.client import AzureTranscriptionClient
+from src.services.transcription import scheduler as scheduler_module
+from src.services.transcription.scheduler import TranscriptionJobScheduler, _utc_now
+from tests.fakes.azure import AZURITE_CONNECTION_STRING, FakeAzureSpeech
+from tests.fakes.db import FakeAsyncSession
+
+
+def make_client(speech: FakeAzureSpeech) -> AzureTranscriptionClient:
+    client = AzureTranscriptionClient(
+        speech_key=speech.key,
+        speech_region="eastus",
+        storage_conn_str=AZURITE_CONNECTION_STRING,
+        speech_endpoint=speech.base_url,
+    )
+    client.http_client = httpx.AsyncClient(transport=speech.transport())
+    client.deleted_blobs = []
+
+    async def delete_blob(blob_name):
+        client.deleted_blobs.append(blob_name)
+
+    client.delete_blob = delete_blob
+    return client
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeAsyncSession()
+    monkeypatch.setattr(scheduler_module, "get_async_db_session", session.factory())
+    return session
+
+
+@pytest.fixture
+def reindexed(monkeypatch):
+    calls = []
+
+    async def reindex_event(event_id):
+        calls.append(event_id)
+
+    monkeypatch.setattr(scheduler_module, "reindex_event", reindex_event)
+    return calls
+
+
+def add_job(session: FakeAsyncSession, **overrides) -> TranscriptionJob:
+    event = session.put(Event, SimpleNamespace(id=uuid.uuid4(), transcription=None))
+    values = dict(
+        id=uuid.uuid4(),
+        event_id=event.id,
+        blob_name="keynote.wav",
+        status=JOB_PENDING,
+        attempts=0,
+        created_at=_utc_now(),
+        next_poll_at=_utc_now(),
+    )
+    values.update(overrides)
+    return session.put(TranscriptionJob, TranscriptionJob(**values))
+
+
+def run_job(scheduler: TranscriptionJobScheduler, job: TranscriptionJob, steps: int) -> None:
+    async def drive():
+        for _ in range(steps):
+            await scheduler._process_job(job.id)
+        while not scheduler._reindex_queue.empty():
+            await scheduler._reindex_next()
+
+    asyncio.run(drive())
+
+
+def test_submit_sends_a_signed_blob_url():
+    speech = FakeAzureSpeech()
+    client = make_client(speech)
+
+    job_url = asyncio.run(client.submit_transcription("keynote.wav"))
+
+    assert job_url == f"{speech.base_url}/transcriptions/1"
+    content_url = speech.jobs["1"]["contentUrls"][0]
+    assert content_url.startswith("http://127.0.0.1:10000/devstoreaccount1/audio-blob/keynote.wav?")
+    assert "sig=" in content_url
+
+
+def test_job_is_submitted_polled_and_stored(session, reindexed):
+    speech = FakeAzureSpeech(text="welcome to the keynote")
+    scheduler = TranscriptionJobScheduler(make_client(speech), poll_interval=0)
+    job = add_job(session)
+
+    run_job(scheduler, job, steps=1)
+    assert job.status == JOB_RUNNING
+    assert job.azure_job_url == f"{speech.base_url}/transcriptions/1"
+
+    # NotStarted and Running only push the next poll back.
+    run_job(scheduler, job, steps=2)
+    assert job.status == JOB_RUNNING
+    assert job.attempts == 2
+
+    run_job(scheduler, job, steps=1)
+    event = session.rows[(Event, job.event_id)]
+    assert job.status == JOB_SUCCEEDED
+    assert event.transcription == "welcome to the keynote"
+    assert job.transcription_length == len("welcome to the keynote")
+    assert scheduler.client.deleted_blobs == ["keynote.wav"]
+    assert reindexed == [job.event_id]
+
+    # A finished job is left alone.
+    run_job(scheduler, job, steps=1)
+    assert reindexed == [job.event_id]
+
+
+def test_azure_failure_fails_the_job(session, reindexed):
+    speech = FakeAzureSpeech(statuses=["Running", "Failed"])
+    scheduler = TranscriptionJobScheduler(make_client(speech), poll_interval=0)
+    job = add_job(session)
+
+    run_job(scheduler, job, steps=3)
+
+    assert job.status == JOB_FAILED
+    assert "audio could not be decoded" in job.error
+    assert scheduler.client.deleted_blobs == ["keynote.wav"]
+    assert reindexed == []
+
+
+def test_transient_errors_are_retried_with_backoff(session, reindexed):
+    speech = FakeAzureSpeech(statuses=["Succeeded"])
+    scheduler = TranscriptionJobScheduler(make_client(speech), poll_interval=10, max_poll_interval=60)
+    job = add_job(session)
+
+    run_job(scheduler, job, steps=1)
+    speech.fail_next = 2
+    run_job(scheduler, job, steps=1)
+    assert job.status == JOB_RUNNING
+    assert job.attempts == 1
+    assert "503" in job.error
+    assert job.next_poll_at - _utc_now() > timedelta(seconds=10)
+
+    run_job(scheduler, job, steps=2)
+    assert job.status == JOB_SUCCEEDED
+    assert job.error is None
+    assert job.attempts == 2
+
+
+def test_rejected_submission_fails_the_job(session, reindexed):
+    speech = FakeAzureSpeech(key="another-key")
+    client = make_client(speech)
+    client.speech_key = "wrong-key"
+    scheduler = TranscriptionJobScheduler(client, poll_interval=0)
+    job = add_job(session)
+
+    run_job(scheduler, job, steps=1)
+
+    assert job.status == JOB_FAILED
+    assert "Job submission failed" in job.error
+
+
+def test_expired_job_times_out(session, reindexed):
+    scheduler = TranscriptionJobScheduler(make_client(FakeAzureSpeech()), job_timeout=60)
+    job = add_job(session, created_at=_utc_now() - timedelta(hours=1))
+
+    run_job(scheduler, job, steps=1)
+
+    assert job.status == JOB_FAILED
+    assert job.error == "Transcription job timed out"
+
+
+def test_reindex_runs_after_the_job_is_committed(session, monkeypatch):
+    speech = FakeAzureSpeech(statuses=["Succeeded"])
+    scheduler = TranscriptionJobScheduler(make_client(speech), poll_interval=0)
+    job = add_job(session)
+    run_job(scheduler, job, steps=1)
+    commits = []
+
+    async def slow_reindex(event_id):
+        commits.append(session.commits)
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(scheduler_module, "reindex_event", slow_reindex)
+
+    async def drive():
+        worker = asyncio.create_task(scheduler._run_reindexes())
+        # The poll that completes the job returns without waiting for the re-index.
+        await asyncio.wait_for(scheduler._process_job(job.id), timeout=1)
+        committed = session.commits
+        await asyncio.sleep(0)
+        worker.cancel()
+        return committed
+
+    committed = asyncio.run(drive())
+
+    assert job.status == JOB_SUCCEEDED
+    assert commits == [committed]
@@ -0,0 +1,95 @@
+"""Peak RSS of ``upload_stream`` must not grow with the size of the upload.
+
+Each size is uploaded in a fresh interpreter (``python -m tests.test_upload_memory
+<bytes>``) so the peak RSS reported by ``getrusage`` belongs to that upload alone.
+"""
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.excetions import AudioUploadTooLargeError
+from src.services.azure.client import AzureTranscriptionClient
+from tests.fakes.azure import FakeBlobStorage
+
+MiB = 1024 * 1024
+AGENT_API_DIR = Path(__file__).resolve().parent.parent
+
+
+class SyntheticUpload:
+    """An async file object of ``size`` bytes that never holds more than one read."""
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    async def read(self, n: int = -1) -> bytes:
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        return bytes(n)
+
+
+async def upload(storage: FakeBlobStorage, size: int, max_size=None) -> int:
+    client = AzureTranscriptionClient(
+        speech_key="unused",
+        speech_region="eastus",
+        storage_conn_str=storage.connection_string,
+    )
+    try:
+        return await client.upload_stream(SyntheticUpload(size), "recording.wav", max_size=max_size)
+    finally:
+        await client.close()
+
+
+def measure(size: int) -> dict:
+    with FakeBlobStorage() as storage:
+        uploaded = asyncio.run(upload(storage, size))
+        staged = sum(storage.staged.values())
+    # ru_maxrss is in KiB on Linux.
+    return {"uploaded": uploaded, "staged": staged, "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+
+def measure_in_subprocess(size: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "tests.test_upload_memory", str(size)],
+        cwd=AGENT_API_DIR, capture_output=True, text=True, timeout=600, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_blocks_are_staged_and_committed_in_order():
+    with FakeBlobStorage() as storage:
+        uploaded = asyncio.run(upload(storage, 20 * MiB + 1))
+
+    assert uploaded == 20 * MiB + 1
+    assert sorted(storage.staged.values()) == [4 * MiB + 1, 8 * MiB, 8 * MiB]
+    (blocks,) = storage.committed.values()
+    assert len(blocks) == 3
+
+
+def test_oversized_upload_is_never_committed():
+    with FakeBlobStorage() as storage:
+        with pytest.raises(AudioUploadTooLargeError):
+            asyncio.run(upload(storage, 40 * MiB, max_size=20 * MiB))
+
+    assert storage.committed == {}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="ru_maxrss units differ outside Linux")
+@pytest.mark.skipif(os.environ.get("SKIP_SLOW_TESTS") == "1", reason="uploads 2 GiB through a local socket")
+def test_peak_rss_does_not_grow_with_upload_size():
+    small = measure_in_subprocess(10 * MiB)
+    large = measure_in_subprocess(2048 * MiB)
+
+    assert large["staged"] == large["uploaded"] == 2048 * MiB
+    # In flight are at most upload_max_concurrency blocks of upload_block_size
+    # (4 x 8 MiB), each of which the SDK may copy once while sending it.
+    assert large["max_rss"] - small["max_rss"] < 96 * MiB
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure(int(sys.argv[1]))))
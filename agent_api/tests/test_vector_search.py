@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.bootstrap import check_pgvector_features, pgvector_version
+from src.services.pgvector.pgvector import AsyncPostgresVectorClient, _vector_search_settings
+
+
+class SettingsRecorder:
+    """Session that records the set_config calls and returns no rows."""
+
+    def __init__(self):
+        self.settings = {}
+
+    async def execute(self, stmt, params=None):
+        if params is not None:
+            self.settings[params["name"]] = params["value"]
+        return SimpleNamespace(all=lambda: [])
+
+
+def test_ef_search_covers_the_query_limit():
+    assert _vector_search_settings("hnsw", 40, 10, False, scan_limit=10) == [("hnsw.ef_search", "40")]
+    assert _vector_search_settings("hnsw", 40, 10, False, scan_limit=360) == [("hnsw.ef_search", "360")]
+    assert _vector_search_settings("hnsw", 40, 10, False, scan_limit=5000) == [("hnsw.ef_search", "1000")]
+
+
+def test_filtered_queries_scan_iteratively():
+    assert ("hnsw.iterative_scan", "strict_order") in _vector_search_settings("hnsw", 40, 10, False, 90, filtered=True)
+    assert ("ivfflat.iterative_scan", "relaxed_order") in _vector_search_settings("ivfflat", 40, 10, False, 90, filtered=True)
+    assert _vector_search_settings("hnsw", 40, 10, True, 90, filtered=True) == [("enable_indexscan", "off")]
+
+
+def test_iterative_scans_can_be_turned_off():
+    assert _vector_search_settings("hnsw", 40, 10, False, 90, filtered=True, iterative_scan=False) == [("hnsw.ef_search", "90")]
+    assert _vector_search_settings("ivfflat", 40, 10, False, 90, filtered=True, iterative_scan=False) == [("ivfflat.probes", "10")]
+
+    session = SettingsRecorder()
+    client = AsyncPostgresVectorClient(session, index_type="hnsw", ef_search=40, iterative_scan=False)
+    asyncio.run(client.search_vector([0.1] * 8, size=10, event_ids=[uuid.uuid4()]))
+    assert session.settings == {"hnsw.ef_search": "40"}
+
+
+class ExtensionConnection:
+    def __init__(self, version):
+        self.version = version
+
+    def execute(self, stmt):
+        return SimpleNamespace(scalar=lambda: self.version)
+
+
+def test_startup_refuses_iterative_scans_on_old_pgvector():
+    assert pgvector_version(ExtensionConnection("0.8.0")) == (0, 8, 0)
+    assert pgvector_version(ExtensionConnection(None)) is None
+
+    check_pgvector_features(ExtensionConnection("0.8.1"))
+    check_pgvector_features(ExtensionConnection("0.7.4"), iterative_scan=False)
+    for version in ("0.7.4", None):
+        with pytest.raises(RuntimeError, match="VECTOR_ITERATIVE_SCAN=false"):
+            check_pgvector_features(ExtensionConnection(version))
+
+
+def test_clients_apply_the_settings_for_their_scan():
+    session = SettingsRecorder()
+    client = AsyncPostgresVectorClient(session, index_type="hnsw", ef_search=40)
+    asyncio.run(client.search_vector([0.1] * 8, size=90, event_ids=[uuid.uuid4()]))
+    assert session.settings == {"hnsw.ef_search": "90", "hnsw.iterative_scan": "strict_order"}
+
+    # Binary storage scans the index for the shortlist, not the final size.
+    session = SettingsRecorder()
+    client = AsyncPostgresVectorClient(session, index_type="hnsw", ef_search=40, storage="binary", rerank_multiplier=4)
+    asyncio.run(client.search_hybrid_sql("keynote", [0.1] * 8, size=10, candidate_multiplier=3))
+    assert session.settings == {"hnsw.ef_search": "120"}
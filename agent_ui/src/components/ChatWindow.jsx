@@ -48,7 +48,9 @@ ${event.transcription ? `Transcription: ${event.transcription}` : ""}
       // ---------------------------------------------------------
       // Append prompt to URL because backend expects Query Param
       // ---------------------------------------------------------
-      const url = `http://localhost:8000/stream/groq?prompt=${encodeURIComponent(fullPrompt)}`;
+      // event_id and question let the backend cache answers per event and question
+      const url = `http://localhost:8000/stream/groq?prompt=${encodeURIComponent(fullPrompt)}` +
+        `&event_id=${encodeURIComponent(event.id)}&question=${encodeURIComponent(userPrompt)}`;
 
       const response = await fetch(url, {
         method: "POST",